@@ -1,6 +1,49 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backend.api'
+
+    def ready(self):
+        from backend.server_handler.warmup import configure_numba_cache, start_warm_up
+        from backend.server_handler.worker_pool import configure_pool, start_process_pool, pool_size, \
+            DEFAULT_TASK_TIMEOUT
+        from backend.server_handler.column_store import configure_store, default_store_directory, DEFAULT_MAX_BYTES
+        from backend.server_handler.single_flight import configure_single_flight
+        from backend.server_handler.scheduler import configure_scheduler, DEFAULT_MAX_QUEUE, DEFAULT_MAX_WAIT
+        from backend.server_handler.cancellation import configure_cancellation, DEFAULT_KILL_AFTER
+
+        warm_up = getattr(settings, "WARMUP_ON_STARTUP", False)
+        warmup_tasks = getattr(settings, "WARMUP_TASKS", None)
+        if warm_up:
+            # Must run before numba is first imported, which the lazy backend imports guarantee
+            configure_numba_cache(getattr(settings, "NUMBA_CACHE_DIR", None))
+        store_dir = getattr(settings, "COLUMN_STORE_DIR", None)
+        configure_store(
+            default_store_directory() if store_dir is None else (store_dir or None),
+            getattr(settings, "COLUMN_STORE_MAX_BYTES", DEFAULT_MAX_BYTES)
+        )
+        flight_dir = getattr(settings, "SINGLE_FLIGHT_DIR", None)
+        configure_single_flight(default_store_directory("flights") if flight_dir is None else (flight_dir or None))
+        cancellation_dir = getattr(settings, "CANCELLATION_DIR", None)
+        configure_cancellation(
+            default_store_directory("cancel") if cancellation_dir is None else (cancellation_dir or None),
+            getattr(settings, "ENGINE_KILL_AFTER", DEFAULT_KILL_AFTER)
+        )
+        configure_pool(
+            size=getattr(settings, "ENGINE_POOL_SIZE", None),
+            task_timeout=getattr(settings, "ENGINE_TASK_TIMEOUT", DEFAULT_TASK_TIMEOUT),
+            warmup_tasks=warmup_tasks if warm_up else None
+        )
+        memory_budget_mb = getattr(settings, "SCHEDULER_MEMORY_BUDGET_MB", None)
+        configure_scheduler(
+            memory_budget=int(memory_budget_mb * (1 << 20)) if memory_budget_mb else None,
+            batch_slots=getattr(settings, "SCHEDULER_BATCH_SLOTS", None) or max(pool_size(), 1),
+            max_queue=getattr(settings, "SCHEDULER_MAX_QUEUE", DEFAULT_MAX_QUEUE),
+            max_wait=getattr(settings, "SCHEDULER_MAX_WAIT", DEFAULT_MAX_WAIT)
+        )
+        if warm_up:
+            start_warm_up(warmup_tasks)
+            start_process_pool()  # Workers warm up as they start
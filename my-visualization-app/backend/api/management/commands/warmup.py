@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from backend.server_handler.warmup import WARMUP_TASKS, warm_up, configure_numba_cache
+
+
+class Command(BaseCommand):
+    help = "Import the scientific backends and compile the UMAP/pynndescent numba kernels into the on-disk cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", nargs="+", choices=list(WARMUP_TASKS), default=getattr(settings, "WARMUP_TASKS", None),
+                            help="Warm-up tasks to run (default: settings.WARMUP_TASKS)")
+
+    def handle(self, *args, **options):
+        cache_dir = configure_numba_cache(getattr(settings, "NUMBA_CACHE_DIR", None))
+        timings = warm_up(options["tasks"])
+        for task, seconds in timings.items():
+            self.stdout.write(f"{task}: {seconds:.2f} s")
+        self.stdout.write(self.style.SUCCESS(f"Warm-up finished in {sum(timings.values()):.2f} s (numba cache: {cache_dir or 'default'})"))
@@ -1,6 +1,7 @@
 from django.utils.deprecation import MiddlewareMixin
 from django.db import connection
 from django.http import JsonResponse
+from backend.server_handler.column_store import clear_store
 
 class ClearDatabaseMiddleware(MiddlewareMixin):
     """Clear database only when a specific request is made"""
@@ -14,6 +15,7 @@ class ClearDatabaseMiddleware(MiddlewareMixin):
                 for table in tables_to_clear:
                     cursor.execute(f"DELETE FROM {table};")  # Empty table data
                     cursor.execute(f"DELETE FROM sqlite_sequence WHERE name='{table}';")  # Reset self-incrementing ID
+            clear_store()
 
             # Returns a success response directly, preventing Django from continuing to look for the view and causing a 404 error.
             return JsonResponse({"message": "Database cleared successfully"}, status=200)
@@ -0,0 +1,69 @@
+import json
+import logging
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from backend.server_handler.timing import recording
+
+logger = logging.getLogger("backend.timing")
+
+
+class ServerTimingMiddleware:
+    """
+    Report where the time of a sampled request went, e.g. the database, the Engine or serialisation.
+
+    A share SERVER_TIMING_SAMPLE_RATE of the requests (0: none, 1: all) records
+    the spans of the views, helpers and Engine (see server_handler.timing); the
+    response then carries them in a Server-Timing header, and a JSON line is
+    logged to the "backend.timing" logger. Requests not sampled only pay for the
+    sampling decision.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "SERVER_TIMING_SAMPLE_RATE", 0)
+        self.allowed_origins = set(getattr(settings, "CORS_ALLOWED_ORIGINS", []))
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        with recording() as timings:
+            start = time.perf_counter()
+            response = self.get_response(request)
+        return self.report(request, response, timings, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        with recording() as timings:
+            start = time.perf_counter()
+            response = await self.get_response(request)
+        return self.report(request, response, timings, time.perf_counter() - start)
+
+    def sampled(self) -> bool:
+        return self.sample_rate > 0 and (self.sample_rate >= 1 or random.random() < self.sample_rate)
+
+    def report(self, request, response, timings, seconds):
+        timings.add("total", seconds)
+        response["Server-Timing"] = timings.header()
+        origin = request.headers.get("Origin")
+        if origin in self.allowed_origins:
+            response["Timing-Allow-Origin"] = origin  # Lets the frontend read the header
+        logger.info(json.dumps({
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "spans_ms": timings.milliseconds(),
+        }))
+        return response
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:10
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_rename_upload_time_uploadedfile_uploaded_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='version',
+            field=models.UUIDField(default=uuid.uuid4, editable=False),
+        ),
+    ]
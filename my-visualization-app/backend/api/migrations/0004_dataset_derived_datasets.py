@@ -0,0 +1,19 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_dataset_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dataset',
+            name='last_dataset',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='derived_datasets', to='api.dataset'),
+        ),
+    ]
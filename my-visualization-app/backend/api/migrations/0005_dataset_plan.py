@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_dataset_derived_datasets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='plan',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
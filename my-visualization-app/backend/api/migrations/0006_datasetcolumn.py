@@ -0,0 +1,27 @@
+# Generated by Django 5.1.4 on 2026-10-19 11:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_dataset_plan'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetColumn',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('expression', models.TextField(blank=True, default='')),
+                ('values', models.JSONField(default=list)),
+                ('dataset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='extra_columns', to='api.dataset')),
+            ],
+            options={
+                'unique_together': {('dataset', 'name')},
+            },
+        ),
+    ]
@@ -1,6 +1,23 @@
 from django.db import models
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+import uuid
+import numpy as np
 import pandas as pd
 
+from backend.server_handler.lazy import LazyFrame, normalize_plan, plan_features
+from backend.server_handler.column_store import shared_frame, store_enabled, retire
+from backend.server_handler.timing import span
+
+CONTENT_FIELDS = {"features", "records", "plan"}
+LAZY_SOURCE_MISSING = "The dataset this lazy dataset is computed from no longer exists."
+
+
+class InvalidRecords(ValueError):
+    """
+    Raised while building the DataFrame of a dataset whose records are not a list of dicts.
+    """
+
 
 ### **Stores uploaded file information (only the file path is recorded, no data is stored)**
 class UploadedFile(models.Model):
@@ -19,10 +36,12 @@ class Dataset(models.Model):
     uploaded_file = models.OneToOneField(UploadedFile, on_delete=models.CASCADE, null=True, blank=True, related_name="dataset")  # Associated Upload Files
     features = models.JSONField(default=list)  # Column names, e.g. [‘age’, ‘salary’, ‘city’]
     records = models.JSONField(default=list)  # Data, e.g. [{‘age’: 25, ‘salary’: 50000}]
+    version = models.UUIDField(default=uuid.uuid4, editable=False)  # Changes whenever features or records change
+    plan = models.JSONField(null=True, blank=True)  # Lazy operations on last_dataset; records are then computed on request
 
-    last_dataset = models.OneToOneField(
-        "self", on_delete=models.SET_NULL, null=True, blank=True, related_name="next"
-    )
+    last_dataset = models.ForeignKey(
+        "self", on_delete=models.SET_NULL, null=True, blank=True, related_name="derived_datasets"
+    )  # A dataset can have several derived datasets (interpolations, reductions, ...)
     next_dataset = models.OneToOneField(
         "self", on_delete=models.SET_NULL, null=True, blank=True, related_name="prev"
     )
@@ -30,21 +49,160 @@ class Dataset(models.Model):
     def __str__(self):
         return self.name
 
-    def get_dataframe(self):
+    def save(self, *args, **kwargs):
+        """
+        Issue a new version whenever the content of an existing dataset is saved,
+        so caches keyed by cache_key never serve stale data.
+        """
+        update_fields = kwargs.get("update_fields")
+        retired_key = None
+        if self.pk is not None and (update_fields is None or CONTENT_FIELDS & set(update_fields)):
+            retired_key = f"{self.pk}:{self.version}"
+            self.version = uuid.uuid4()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "version"}
+        super().save(*args, **kwargs)
+        if retired_key is not None:
+            retire(retired_key)
+
+    @classmethod
+    def without_records(cls):
+        """
+        Datasets fetched without their records, for callers that only read them through get_dataframe:
+        the records are then loaded and decoded only if the column store has no file of the version.
+        """
+        return cls.objects.defer("records")
+
+    @property
+    def cache_key(self):
+        """
+        Identifies this exact content of the dataset in process-level caches.
+        """
+        source = self.source_dataset() if self.is_lazy else None
+        if source is not None:
+            return f"{self.pk}:{self.version}/{source.cache_key}"
+        return f"{self.pk}:{self.version}"
+
+    def source_dataset(self):
+        """
+        last_dataset, which a lazy dataset is computed from, fetched without its records.
+        """
+        field = Dataset._meta.get_field("last_dataset")
+        if self.last_dataset_id is not None and not field.is_cached(self):
+            field.set_cached_value(self, Dataset.without_records().filter(pk=self.last_dataset_id).first())
+        return self.last_dataset
+
+    @property
+    def is_lazy(self):
+        """
+        Whether the records are computed from last_dataset on request instead of stored.
+        """
+        return self.plan is not None
+
+    def lazy_frame(self):
+        """
+        The plans of this dataset and its lazy ancestors, combined over the nearest stored dataset.
+        """
+        plan = []
+        source = self
+        while source.is_lazy:
+            plan = source.plan + plan
+            source = source.source_dataset()
+            if source is None:
+                raise ValueError(LAZY_SOURCE_MISSING)
+        return LazyFrame(source.get_dataframe, source.features, plan)
+
+    def get_dataframe(self, columns=None):
         """
         Securely convert records to Pandas DataFrame
+
+        :param columns: list, optional subset of the features to load
         """
-        if not isinstance(self.records, list) or not all(isinstance(row, dict) for row in self.records):
+        if self.is_lazy:
+            return self.lazy_frame().collect(columns)
+
+        try:
+            if store_enabled() and self.pk is not None:
+                # One copy per host, shared by all server processes (see column_store); the records
+                # are only loaded and decoded by the first process to ask for this version
+                return shared_frame(self.cache_key, self._build_dataframe, columns)
+            return self._build_dataframe(columns)
+        except InvalidRecords:
             print("Error: Invalid records format!")
             return pd.DataFrame()  # Avoid reporting errors by returning an empty DataFrame
 
-        df = pd.DataFrame(self.records)
+    def _build_dataframe(self, columns=None):
+        if "records" in self.get_deferred_fields():
+            with span("decode"):  # Fetching and decoding the records left out by without_records
+                self.refresh_from_db(fields=["records"])
+        if not isinstance(self.records, list) or not all(isinstance(row, dict) for row in self.records):
+            raise InvalidRecords()
+
+        extra_columns = self.get_extra_columns(columns)
+        if columns is not None:
+            df = pd.DataFrame(self.records, columns=[col for col in columns if col not in extra_columns])
+            return self._append_columns(df, extra_columns)[list(columns)]
+
+        df = self._append_columns(pd.DataFrame(self.records), extra_columns)
 
         # Ensure that the DataFrame contains the fields from features.
         if self.features and all(col in df.columns for col in self.features):
             return df[self.features]
         return df
 
+    def get_extra_columns(self, columns=None):
+        """
+        Columns stored next to the records (see DatasetColumn), by name.
+
+        :param columns: list, optional subset of the features to load
+        """
+        if self.pk is None:
+            return {}
+        names = self.features if columns is None else [col for col in columns if col in self.features]
+        return {column.name: column.values for column in self.extra_columns.filter(name__in=names)}
+
+    @staticmethod
+    def _append_columns(df, extra_columns):
+        for name, values in extra_columns.items():
+            df[name] = pd.Series(values, index=df.index, dtype=None if values else float)
+        return df
+
+    def get_records(self):
+        """
+        The records of the dataset, computed from the plan for a lazy dataset
+        and merged with the separately stored columns otherwise.
+        """
+        if not self.is_lazy and not self.get_extra_columns():
+            return self.records
+        return self.get_dataframe().replace({np.nan: None}).to_dict(orient="records")
+
+    def add_column(self, name, expression, values):
+        """
+        Append a computed column without rewriting the stored records.
+
+        A lazy dataset records the derivation in its plan instead.
+
+        :param name: str, name of the new feature
+        :param expression: str, the expression the column was computed with
+        :param values: numpy.ndarray, one value per record (ignored for a lazy dataset)
+        """
+        if self.is_lazy:
+            self.plan = self.plan + [{"op": "derive", "name": name, "expression": expression}]
+            self.features = self.features + [name]
+            self.save(update_fields=["plan", "features"])
+            return
+        values = pd.Series(values)
+        if values.dtype.kind == "f":
+            values = values.where(np.isfinite(values))
+        DatasetColumn.objects.create(
+            dataset=self,
+            name=name,
+            expression=expression,
+            values=values.astype(object).where(values.notna(), None).tolist()
+        )
+        self.features = self.features + [name]
+        self.save(update_fields=["features"])
+
     def copy_dataset(self, new_name=None):
         """
         Create a copy of the current Dataset and establish the relationship 
@@ -59,15 +217,66 @@ class Dataset(models.Model):
             uploaded_file=self.uploaded_file,  # Copy the reference to the uploaded file
             features=self.features,  # Copy the feature list
             records=self.records,  # Copy the data records
+            plan=[] if self.is_lazy else None,  # A lazy copy computes its records from this dataset
             last_dataset=self  # Set the new dataset's last_dataset to the current dataset
         )
 
+        DatasetColumn.objects.bulk_create([
+            DatasetColumn(dataset=new_dataset, name=column.name, expression=column.expression, values=column.values)
+            for column in self.extra_columns.all()
+        ])
+
         # Update the current dataset's next_dataset to point to the new dataset
         self.next_dataset = new_dataset
         self.save(update_fields=["next_dataset"])
 
         return new_dataset
 
+    def create_child(self, name, dataframe):
+        """
+        Store a DataFrame computed on the server as a new Dataset derived from this one.
+        """
+        return Dataset.objects.create(
+            name=name,
+            features=list(dataframe.columns),
+            records=dataframe.replace({np.nan: None}).to_dict(orient="records"),
+            last_dataset=self
+        )
+
+    def create_lazy_child(self, name, plan):
+        """
+        Create a dataset defined by operations on this one, computed only when its data is requested.
+        """
+        plan = normalize_plan(plan)
+        return Dataset.objects.create(
+            name=name,
+            features=plan_features(self.features, plan),
+            plan=plan,
+            last_dataset=self
+        )
+
+
+@receiver(post_delete, sender=Dataset)
+def retire_deleted_dataset(sender, instance, **kwargs):
+    """
+    Remove the shared columns of a deleted dataset.
+    """
+    retire(f"{instance.pk}:{instance.version}")
+
+
+### **A computed column stored next to the records of a dataset**
+class DatasetColumn(models.Model):
+    dataset = models.ForeignKey(Dataset, on_delete=models.CASCADE, related_name="extra_columns")
+    name = models.CharField(max_length=255)  # Feature name, also listed in Dataset.features
+    expression = models.TextField(blank=True, default="")  # Expression the values were computed with
+    values = models.JSONField(default=list)  # One value per record, in record order
+
+    class Meta:
+        unique_together = ("dataset", "name")
+
+    def __str__(self):
+        return f"{self.dataset_id}.{self.name}"
+
 
 ### **Recording the results of data analysis**
 class AnalysisResult(models.Model):
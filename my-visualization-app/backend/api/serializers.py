@@ -6,6 +6,15 @@ class DatasetSerializer(serializers.ModelSerializer):
         model = Dataset
         fields = ['id', 'name', 'features', 'records']
 
+    def to_representation(self, instance):
+        """
+        Serialise the computed records of a lazy dataset instead of its empty stored ones,
+        and the records merged with separately stored columns otherwise
+        """
+        data = super().to_representation(instance)
+        data['records'] = instance.get_records()
+        return data
+
     def create(self, validated_data):
         """
         Customise the create method to ensure that the data is stored in the database and perform data format validation
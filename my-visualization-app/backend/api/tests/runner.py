@@ -0,0 +1,30 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+from backend.server_handler.cancellation import configure_cancellation, DEFAULT_KILL_AFTER
+from backend.server_handler.column_store import configure_store, DEFAULT_MAX_BYTES
+from backend.server_handler.single_flight import configure_single_flight
+
+
+class PrivateStoreRunner(DiscoverRunner):
+    """
+    Runs the tests with the column store, single-flight and cancellation files in a temporary
+    directory, removed afterwards, instead of the /dev/shm directories a running server uses.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.store_directory = tempfile.mkdtemp(prefix="visualization-tests-")
+        configure_store(os.path.join(self.store_directory, "columns"),
+                        getattr(settings, "COLUMN_STORE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        configure_single_flight(os.path.join(self.store_directory, "flights"))
+        configure_cancellation(os.path.join(self.store_directory, "cancel"),
+                               getattr(settings, "ENGINE_KILL_AFTER", DEFAULT_KILL_AFTER))
+
+    def teardown_test_environment(self, **kwargs):
+        shutil.rmtree(self.store_directory, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,69 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from backend.api.models import Dataset, DatasetColumn, AuditLog
+import json
+import math
+import pytest
+
+
+class AddFeatureViewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.records = [{"a": 1, "b": 2}, {"a": math.e, "b": 0}, {"a": -1, "b": 1}]
+        self.dataset = Dataset.objects.create(name="Features", features=["a", "b"], records=self.records)
+        self.url = '/api/add_feature/'
+
+    def add_feature(self, name, expression, dataset=None):
+        data = {"dataset_id": (dataset or self.dataset).id, "name": name, "expression": expression}
+        return self.client.post(self.url, json.dumps(data), content_type='application/json')
+
+    @pytest.mark.django_db
+    def test_add_feature_keeps_records(self):
+        response = self.add_feature("c", "log(a) + b*2")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["features"], ["a", "b", "c"])
+
+        self.dataset.refresh_from_db()
+        self.assertEqual(self.dataset.records, self.records)
+        column = DatasetColumn.objects.get(dataset=self.dataset, name="c")
+        self.assertEqual(column.values, [4.0, 1.0, None])  # log(-1) is stored as missing
+        self.assertTrue(AuditLog.objects.filter(dataset=self.dataset, tool_type="ADD_FEATURE").exists())
+
+        df = self.dataset.get_dataframe()
+        self.assertEqual(list(df.columns), ["a", "b", "c"])
+        self.assertEqual(list(self.dataset.get_dataframe(columns=["c"]).columns), ["c"])
+        detail = self.client.get(f'/api/datasets/{self.dataset.id}/').json()
+        self.assertEqual(detail["records"][0], {"a": 1, "b": 2, "c": 4.0})
+
+    @pytest.mark.django_db
+    def test_add_feature_on_lazy_dataset(self):
+        lazy = self.dataset.create_lazy_child("Lazy", [{"op": "filter", "expression": "b > 0"}])
+        response = self.add_feature("flag", "a > 0", dataset=lazy)
+        self.assertEqual(response.status_code, 200)
+        lazy.refresh_from_db()
+        self.assertEqual(list(lazy.get_dataframe()["flag"]), [True, False])
+
+    @pytest.mark.django_db
+    def test_invalid_feature(self):
+        self.assertEqual(self.add_feature("a", "b + 1").status_code, 400)
+        self.assertEqual(self.add_feature("c", "missing + 1").status_code, 400)
+        response = self.add_feature("c", "__import__('os')")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("unknown function", response.json()["error"])
+
+    @pytest.mark.django_db
+    def test_expression_on_text_column(self):
+        dataset = Dataset.objects.create(name="Labels", features=["a", "label"], records=[{"a": 1, "label": "x"}, {"a": 2, "label": "y"}])
+        response = self.add_feature("c", "log(label) + a", dataset=dataset)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Cannot evaluate", response.json()["error"])
+
+    @pytest.mark.django_db
+    def test_expression_overflow(self):
+        response = self.add_feature("c", "a + 9**9**9")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(DatasetColumn.objects.get(dataset=self.dataset, name="c").values, [None, None, None])  # inf
+        dataset = Dataset.objects.create(name="Mixed", features=["a", "m"], records=[{"a": 1, "m": 10.0}, {"a": 2, "m": "y"}])
+        response = self.add_feature("c", "m ** 400", dataset=dataset)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Cannot evaluate", response.json()["error"])
@@ -0,0 +1,77 @@
+import asyncio
+import json
+from django.test import TestCase, AsyncClient
+from backend.api.models import Dataset
+from backend.api.views import (DatasetDetailView, DatasetColumnsView, QueryDatasetView, FitCurveView, BatchFitCurveView,
+                               InterpolateView, ExtrapolateView, CorrelationView, DimensionalReductionView,
+                               RecommendDimReductionView, OversampleDataView, OutlierDetectionView, ClusterView)
+from backend.server_handler import scheduler, worker_pool
+from backend.server_handler.executor import arun_engine, EngineTimeoutError
+import pandas as pd
+
+
+class AsyncViewsTest(TestCase):
+    def setUp(self):
+        self.client = AsyncClient()
+        records = [{"x": float(i), "y": 2.0 * i + 1, "label": int(i >= 8)} for i in range(12)]
+        self.dataset = Dataset.objects.create(name="Async", features=["x", "y", "label"], records=records)
+
+    def test_views_are_async(self):
+        for view in (DatasetDetailView, DatasetColumnsView, QueryDatasetView, FitCurveView, BatchFitCurveView,
+                     InterpolateView, ExtrapolateView, CorrelationView, DimensionalReductionView,
+                     RecommendDimReductionView, OversampleDataView, OutlierDetectionView, ClusterView):
+            self.assertTrue(view.view_is_async, view.__name__)
+
+    async def test_concurrent_requests(self):
+        fit = {"params": {"datasetId": self.dataset.id, "xColumn": "x", "yColumn": "y", "type": "linear"}}
+        query = {"dataset_id": self.dataset.id, "where": [{"column": "x", "op": ">=", "value": 6}], "limit": 3}
+        responses = await asyncio.gather(
+            self.client.post("/api/fit_curve/", json.dumps(fit), content_type="application/json"),
+            self.client.post("/api/query/", json.dumps(query), content_type="application/json"),
+            self.client.get(f"/api/dataset/{self.dataset.id}/columns/"),
+            self.client.get(f"/api/datasets/{self.dataset.id}/"),
+        )
+        self.assertEqual([response.status_code for response in responses], [200] * 4)
+        fit_result, query_result, columns, detail = [response.json() for response in responses]
+        self.assertAlmostEqual(fit_result["params"][0], 2.0)
+        self.assertEqual(query_result["num_matched"], 6)
+        self.assertEqual(columns["columns"], ["x", "y", "label"])
+        self.assertEqual(len(detail["records"]), 12)
+
+        missing = await self.client.get("/api/datasets/999999/")
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_lazy_dataset(self):
+        # The cache key and records of a lazy dataset query its parent, which must not happen on the event loop
+        lazy = await Dataset.objects.acreate(name="Lazy", features=["x", "y", "label"], plan=[], last_dataset=self.dataset)
+        query = {"dataset_id": lazy.id, "sort": [{"column": "y", "descending": True}], "limit": 1}
+        response = await self.client.post("/api/query/", json.dumps(query), content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["records"][0]["y"], 23.0)
+        response = await self.client.get(f"/api/datasets/{lazy.id}/")
+        self.assertEqual(len(response.json()["records"]), 12)
+
+    async def test_streaming_response(self):
+        data = {
+            "datasetId": self.dataset.id,
+            "stream": True,
+            "params": {"xColumn": "x", "yColumn": "label", "features": ["x", "y"], "method": "smote", "num_samples": 1}
+        }
+        response = await self.client.post("/api/oversample_data/", json.dumps(data), content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        rows = [json.loads(line) for line in content.decode().splitlines()]
+        self.assertEqual(len(rows), 16)
+        self.assertEqual(scheduler.get_scheduler().memory_in_use, 0)  # Admission freed with the response
+
+    async def test_arun_engine(self):
+        data = pd.DataFrame({"x": range(20), "y": range(0, 40, 2)}, dtype=float)
+        worker_pool.configure_pool(size=0)
+        try:
+            result = await arun_engine("dimensional_reduction", data, method="pca", n_components=1)
+            self.assertEqual(result.shape, (20, 1))
+        finally:
+            worker_pool.configure_pool()
+        with self.assertRaises(EngineTimeoutError):
+            await arun_engine("dimensional_reduction", data, method="pca", timeout=1e-6)
@@ -0,0 +1,32 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from backend.api.models import Dataset
+import json
+import pytest
+
+class BatchFitCurveViewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.dataset = Dataset.objects.create(
+            name="Test Dataset",
+            features=["x", "y1", "y2"],
+            records=[{"x": i, "y1": 2 * i + 1, "y2": i * i} for i in range(6)]
+        )
+
+    @pytest.mark.django_db
+    def test_fit_curve_batch(self):
+        url = '/api/fit_curve_batch/'
+        data = {
+            "params": {
+                "datasetId": self.dataset.id,
+                "xColumn": "x",
+                "yColumns": ["y1", "y2"],
+                "type": "linear"
+            }
+        }
+        response = self.client.post(url, json.dumps(data), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        content = response.json()
+        self.assertEqual(set(content["results"]), {"y1", "y2"})
+        self.assertAlmostEqual(content["results"]["y1"]["params"][0], 2)
+        self.assertIn("generated_data", content["results"]["y2"])
@@ -0,0 +1,216 @@
+import asyncio
+import json
+import os
+import pickle
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from unittest import mock
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+from rest_framework.test import APIClient
+from backend.api.views.async_view import run_cancellable
+from backend.server_handler import cancellation, executor, pipeline, single_flight as flights
+from backend.server_handler.cancellation import (CancellationToken, OperationCancelled, OperationInterrupted,
+                                                 cancel_operation, configure_cancellation, operation_cancellation,
+                                                 check)
+from backend.server_handler.executor import run_engine, run_in_thread
+from backend.server_handler.nonlinear_fit import fit_nonlinear
+from backend.server_handler.pipeline import run_pipeline
+from backend.server_handler.single_flight import single_flight
+
+
+# Stands in for a pool worker stuck in code without cancellation points
+BUSY_WORKER = """
+import pickle, signal, sys, time
+from backend.server_handler import cancellation, single_flight as flights
+token = pickle.loads(bytes.fromhex(sys.argv[1]))
+cancellation.install_interrupt_handler()
+if sys.argv[2] == "block":
+    signal.pthread_sigmask(signal.SIG_BLOCK, [cancellation.INTERRUPT_SIGNAL])
+try:
+    with token.running():
+        print("running", flush=True)
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            pass
+except cancellation.OperationInterrupted:
+    sys.exit(3)
+"""
+
+
+class CancellationTest(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.chmod(self.directory, 0o700)
+        self.previous = dict(cancellation._config)
+        self.previous_flights = flights._flights["directory"]
+        configure_cancellation(self.directory)
+        flights.configure_single_flight(None)  # Coalesce within this process, without results published before
+
+    def tearDown(self):
+        cancellation._config.update(self.previous)
+        flights.configure_single_flight(self.previous_flights)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_token(self):
+        token = CancellationToken()
+        with token.active():
+            check()
+            token.cancel()
+            with self.assertRaises(OperationCancelled):
+                check()
+        check()  # Outside its context
+
+        shared = CancellationToken(shared=True)
+        with shared.active():
+            check()
+            shared.cancel()
+            time.sleep(cancellation.CHECK_INTERVAL)
+            with self.assertRaises(OperationCancelled):
+                check()
+        shared.close()
+        shared.cancel()  # E.g. a queued task whose done-callback ran first
+        self.assertEqual(os.listdir(self.directory), [])
+
+    async def test_cancelled_thread_stops(self):
+        stopped = threading.Event()
+
+        def loop():
+            try:
+                while True:
+                    check()
+                    time.sleep(0.001)
+            except OperationCancelled:
+                stopped.set()
+
+        task = asyncio.ensure_future(run_in_thread(loop))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        self.assertTrue(await asyncio.to_thread(stopped.wait, 5))
+
+    def test_nonlinear_fit_stops(self):
+        x = np.linspace(0.1, 5, 50)
+        token = CancellationToken()
+        token.cancel()
+        with token.active(), self.assertRaises(OperationCancelled):
+            fit_nonlinear("exponential", x, 2 * np.exp(0.5 * x) + 1)
+
+    def test_waiting_for_pool_stops(self):
+        future = Future()
+        token = CancellationToken()
+        with mock.patch.object(executor, "_submit", return_value=future), token.active():
+            threading.Timer(0.1, token.cancel).start()
+            with self.assertRaises(OperationCancelled):
+                run_engine("dimensional_reduction", pd.DataFrame({"x": [1.0, 2.0]}), method="pca")
+        self.assertTrue(future.cancelled())
+
+    def test_pipeline_stops(self):
+        token = CancellationToken()
+        token.cancel()
+        steps = [{"id": "pca", "op": "dimensional_reduction", "params": {"method": "pca"}}]
+        with mock.patch.object(pipeline, "run_engine") as engine, token.active():
+            with self.assertRaises(OperationCancelled):
+                run_pipeline(pd.DataFrame({"x": [1.0, 2.0], "y": [2.0, 1.0]}), steps)
+        engine.assert_not_called()
+
+    def run_worker(self, block_interrupt, kill_after):
+        token = CancellationToken(shared=True)
+        worker = subprocess.Popen([sys.executable, "-c", BUSY_WORKER, pickle.dumps(token).hex(),
+                                   "block" if block_interrupt else "handle"], stdout=subprocess.PIPE, text=True)
+        worker.stdout.readline()  # Past its check on starting
+        started = time.monotonic()
+        token.cancel(kill_after)
+        exitcode = worker.wait(10)
+        worker.stdout.close()
+        token.close()
+        return exitcode, time.monotonic() - started
+
+    def test_worker_interrupted(self):
+        exitcode, seconds = self.run_worker(block_interrupt=False, kill_after=None)
+        self.assertEqual(exitcode, 3)
+        self.assertLess(seconds, 5)
+
+    def test_worker_killed(self):
+        exitcode, seconds = self.run_worker(block_interrupt=True, kill_after=0.1)
+        self.assertEqual(exitcode, -signal.SIGKILL)
+        self.assertLess(seconds, 5)
+
+    def test_interrupted_worker_retired(self):
+        with mock.patch.object(executor, "retire_process_pool") as retire:
+            for exception in (OperationCancelled(), OperationInterrupted()):
+                future = Future()
+                future.add_done_callback(executor._task_done(CancellationToken(shared=True)))
+                future.set_exception(exception)
+        retire.assert_called_once_with()
+
+    async def test_cancel_operation(self):
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(30)
+
+        task = asyncio.ensure_future(run_cancellable("op-1", slow()))
+        await started.wait()
+        cancel_operation("op-1", hard=True)
+        with self.assertRaises(OperationCancelled):
+            await asyncio.wait_for(task, 5)
+        self.assertIsNone(operation_cancellation("op-1"))
+        self.assertEqual(await run_cancellable("op-2", asyncio.sleep(0, "done")), "done")
+
+    async def test_earlier_cancel_ignored(self):
+        cancel_operation("op-4")  # Arrived after an earlier request with this id had finished
+        self.assertEqual(await run_cancellable("op-4", asyncio.sleep(0.3, "done")), "done")
+
+        configure_cancellation(None)
+        for i in range(cancellation.MAX_OPERATIONS + 10):
+            cancel_operation(f"op-{i}")
+        self.assertEqual(len(cancellation._operations), cancellation.MAX_OPERATIONS)
+        self.assertIsNone(operation_cancellation("op-0"))
+        self.assertIs(operation_cancellation("op-20"), False)
+        self.assertIsNone(operation_cancellation("op-20", since=time.time()))
+        cancellation._operations.clear()
+
+    async def test_flight_cancelled_with_last_waiter(self):
+        cancelled = asyncio.Event()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        callers = [asyncio.ensure_future(single_flight("abandoned", compute)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        callers[0].cancel()
+        await asyncio.sleep(0.01)
+        self.assertFalse(cancelled.is_set())
+        callers[1].cancel()
+        await asyncio.wait_for(cancelled.wait(), 5)
+        await asyncio.gather(*callers, return_exceptions=True)
+
+        async def quick():
+            calls.append(2)
+            return "fresh"
+
+        self.assertEqual(await single_flight("abandoned", quick), "fresh")
+        self.assertEqual(calls, [1, 2])
+
+    def test_cancel_endpoint(self):
+        client = APIClient()
+        response = client.post("/api/cancel/", json.dumps({"operation_id": "op-3"}), content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertIs(operation_cancellation("op-3"), False)
+        cancellation.clear_operation("op-3")
+        response = client.post("/api/cancel/", json.dumps({}), content_type="application/json")
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,43 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from backend.api.models import Dataset
+from backend.server_handler.clustering import decode_labels
+import json
+import pytest
+
+
+class ClusterViewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        records = [{"x": i % 5, "y": i % 3, "z": 0} for i in range(20)]
+        records += [{"x": 100 + i % 5, "y": 100 + i % 3, "z": 0} for i in range(20)]
+        self.dataset = Dataset.objects.create(name="Clusters", features=["x", "y", "z"], records=records)
+        self.url = '/api/cluster/'
+
+    def cluster(self, **params):
+        data = {"dataset_id": self.dataset.id, **params}
+        return self.client.post(self.url, json.dumps(data), content_type='application/json')
+
+    @pytest.mark.django_db
+    def test_cluster_returns_compact_labels(self):
+        response = self.cluster(method="kmeans", n_clusters=2, features=["x", "y"])
+        self.assertEqual(response.status_code, 200)
+        content = response.json()
+        self.assertEqual(content["num_records"], 40)
+        self.assertEqual(content["num_clusters"], 2)
+        self.assertEqual(content["dtype"], "int8")
+        labels = decode_labels(content["labels"], content["dtype"])
+        self.assertEqual(len(set(labels[:20])), 1)
+        self.assertNotEqual(labels[0], labels[20])
+
+    @pytest.mark.django_db
+    def test_cluster_on_embedding(self):
+        response = self.cluster(method="dbscan", eps=5, min_samples=3, embedding={"method": "pca", "n_components": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["num_clusters"], 2)
+
+    @pytest.mark.django_db
+    def test_cluster_invalid_method(self):
+        response = self.cluster(method="spectral")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Unsupported clustering method", response.json()["error"])
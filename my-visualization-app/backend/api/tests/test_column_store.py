@@ -0,0 +1,97 @@
+from unittest import mock
+from django.test import TestCase
+from rest_framework.test import APIClient
+from backend.api.models import Dataset
+from backend.server_handler import column_store
+from backend.server_handler.column_store import ColumnFile, configure_store, shared_frame, store_path
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+
+class ColumnStoreTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.chmod(self.directory, 0o700)
+        self.previous = dict(column_store._store)
+        configure_store(self.directory)
+        records = [{"x": float(i), "count": i, "label": "ab"[i % 2] if i % 3 else None} for i in range(10)]
+        self.dataset = Dataset.objects.create(name="Shared", features=["x", "count", "label"], records=records)
+
+    def tearDown(self):
+        configure_store(self.previous["directory"], self.previous["max_bytes"])
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_round_trip(self):
+        expected = self.dataset._build_dataframe()
+        pd.testing.assert_frame_equal(self.dataset.get_dataframe(), expected)
+        pd.testing.assert_frame_equal(self.dataset.get_dataframe(["label", "x"]), expected[["label", "x"]])
+        self.assertTrue(os.path.exists(store_path(self.dataset.cache_key)))
+
+    def test_handles_share_one_mapping(self):
+        first = self.dataset.get_dataframe()
+        other = ColumnFile(store_path(self.dataset.cache_key)).frame()
+        self.assertFalse(other["x"].to_numpy().flags.writeable)
+        np.testing.assert_array_equal(other["x"].to_numpy(), first["x"].to_numpy())
+
+        first.loc[0, "x"] = -1.0  # Copy on write leaves the mapping untouched
+        self.assertEqual(self.dataset.get_dataframe().loc[0, "x"], 0.0)
+
+    def test_retired_on_change_and_delete(self):
+        self.dataset.get_dataframe()
+        old_path = store_path(self.dataset.cache_key)
+        self.dataset.records = self.dataset.records[:5]
+        self.dataset.save()
+        self.assertFalse(os.path.exists(old_path))
+        self.assertEqual(len(self.dataset.get_dataframe()), 5)
+
+        path = store_path(self.dataset.cache_key)
+        self.assertTrue(os.path.exists(path))
+        self.dataset.delete()
+        self.assertFalse(os.path.exists(path))
+
+    def test_least_recently_used_evicted(self):
+        frame = pd.DataFrame({"x": np.arange(1000, dtype=float)})
+        configure_store(self.directory, max_bytes=20000)
+        shared_frame("1:a", lambda: frame)
+        os.utime(store_path("1:a"), (0, 0))
+        shared_frame("2:b", lambda: frame)
+        shared_frame("3:c", lambda: frame)
+        self.assertFalse(os.path.exists(store_path("1:a")))
+        self.assertTrue(os.path.exists(store_path("3:c")))
+
+    def test_projection_reads_only_requested_columns(self):
+        self.dataset.get_dataframe(["x"])
+        handle = column_store._attached.get(self.dataset.cache_key)
+        self.assertEqual(list(handle._series), ["x"])
+        frame = handle.frame(["count", "missing"])
+        self.assertEqual(list(handle._series), ["x", "count"])
+        self.assertTrue(frame["missing"].isna().all())
+
+    def test_fit_does_not_load_records(self):
+        self.dataset.get_dataframe()  # Published by an earlier request
+        records = Dataset._meta.get_field("records")
+        body = {"params": {"datasetId": self.dataset.id, "xColumn": "x", "yColumn": "count", "type": "linear"}}
+        with mock.patch.object(records, "from_db_value", wraps=records.from_db_value) as decode:
+            response = APIClient().post("/api/fit_curve/", json.dumps(body), content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        decode.assert_not_called()
+
+    def test_dimensional_reduction_does_not_load_records(self):
+        dataset = Dataset.objects.create(name="Numeric", features=["x", "y"],
+                                         records=[{"x": float(i), "y": float(i % 3)} for i in range(10)])
+        dataset.get_dataframe()
+        records = Dataset._meta.get_field("records")
+        body = {"dataset_id": dataset.id, "method": "pca", "n_components": 2}
+        with mock.patch.object(records, "from_db_value", wraps=records.from_db_value) as decode:
+            response = APIClient().post("/api/dimensional_reduction/", json.dumps(body), content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        decode.assert_not_called()
+
+        empty = Dataset.objects.create(name="Empty", features=["x"], records=[])
+        body["dataset_id"] = empty.id
+        response = APIClient().post("/api/dimensional_reduction/", json.dumps(body), content_type="application/json")
+        self.assertEqual(response.status_code, 400)
@@ -1,6 +1,9 @@
+from unittest import mock
 from django.test import TestCase
 from rest_framework.test import APIClient
 from backend.api.models import Dataset
+from backend.api.views import processing_views
+from backend.server_handler import single_flight as flights
 import json
 import pytest
 
@@ -21,3 +24,31 @@ class DimensionalReductionViewTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn("reduced_features", response.data)
         self.assertIn("reduced_records", response.data)
+
+    @pytest.mark.django_db
+    def test_dimensional_reduction_materialize_reuses_preview(self):
+        url = '/api/dimensional_reduction/'
+        dataset = Dataset.objects.create(name="Cloud", features=["x", "y", "z"], records=[{"x": i, "y": i % 7, "z": (i * 5) % 11} for i in range(60)])
+        data = {"dataset_id": dataset.id, "method": "tsne", "n_components": 2}
+        preview = self.client.post(url, json.dumps(data), content_type='application/json').json()
+        data["materialize_as"] = "Cloud_Dim_Reduced_tsne"
+        response = self.client.post(url, json.dumps(data), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        new_dataset = Dataset.objects.get(id=response.json()["new_dataset_id"])
+        self.assertEqual(new_dataset.last_dataset_id, dataset.id)
+        self.assertEqual(new_dataset.records, preview["reduced_records"])
+
+    @pytest.mark.django_db
+    def test_dimensional_reduction_materialize_in_another_process(self):
+        url = '/api/dimensional_reduction/'
+        dataset = Dataset.objects.create(name="Cloud", features=["x", "y", "z"], records=[{"x": i, "y": i % 5, "z": (i * 3) % 13} for i in range(60)])
+        data = {"dataset_id": dataset.id, "method": "umap", "n_components": 2}
+        preview = self.client.post(url, json.dumps(data), content_type='application/json').json()
+        # A process that has not seen the preview computes the embedding anew
+        processing_views._reduction_cache.clear()
+        data["materialize_as"] = "Cloud_Dim_Reduced_umap"
+        with mock.patch.dict(flights._flights, directory=None):
+            response = self.client.post(url, json.dumps(data), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        new_dataset = Dataset.objects.get(id=response.json()["new_dataset_id"])
+        self.assertEqual(new_dataset.records, preview["reduced_records"])
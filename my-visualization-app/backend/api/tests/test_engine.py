@@ -26,6 +26,11 @@ class EngineTest(TestCase):
         self.assertEqual(result.shape[1], 2)
         self.assertEqual(result.shape[0], self.sample_data.shape[0])
 
+    def test_tsne_reproducible(self):
+        """The same data always gets the same t-SNE embedding, which caches rely on"""
+        data = pd.DataFrame(np.random.default_rng(0).normal(size=(40, 3)), columns=["a", "b", "c"])
+        pd.testing.assert_frame_equal(Engine.apply_tsne(data), Engine.apply_tsne(data))
+
     def test_dimensional_reduction(self):
         """Test general dimensionality reduction function"""
         pca_result = Engine.dimensional_reduction(self.sample_data, method="pca", n_components=2)
@@ -43,6 +48,13 @@ class EngineTest(TestCase):
         self.assertIsNotNone(params)
         self.assertIsInstance(fitted_data, pd.DataFrame)
 
+    def test_fit_curve_without_degrees_of_freedom(self):
+        """A fit through as many points as parameters has no covariance estimate"""
+        data = pd.DataFrame({"x": [0.0, 1.0, 2.0], "y": [3.0, 4.0, 7.0]})
+        params, covariance, fitted_data = Engine.fit_curve(data, "x", "y", method="exponential")
+        self.assertEqual(len(params), 3)
+        self.assertIsNone(covariance)
+
     def test_fit_curve_exponential(self):
         """Test curve fitting with exponential method"""
         params, covariance, fitted_data = Engine.fit_curve(self.sample_data, "feature1", "feature2", method="exponential")
@@ -125,3 +137,166 @@ class EngineTest(TestCase):
         )
         self.assertIsInstance(extrapolated_data, pd.DataFrame)
         self.assertEqual(len(extrapolated_data), len(target_x))
+
+    def test_recommend_dim_reduction_intrinsic_dimension(self):
+        """Test that the spectral probe sizes PCA to the latent dimension"""
+        rng = np.random.default_rng(0)
+        latent = rng.normal(size=(500, 2))
+        data = pd.DataFrame(latent @ rng.normal(size=(2, 12)), columns=[f"f{i}" for i in range(12)])
+        recommendations, parameters, profile = Engine.recommend_dim_reduction(data)
+        self.assertEqual(profile["intrinsic_dimension"], 2)
+        self.assertEqual(recommendations[0], "pca")
+        self.assertEqual(parameters["pca"]["n_components"], 2)
+        self.assertIn("expected_latency", parameters["pca"])
+
+    def test_spectral_profile_uses_sketch(self):
+        """Test that large datasets are probed on a bounded row sample"""
+        data = pd.DataFrame(np.random.default_rng(1).normal(size=(200000, 8)))
+        profile = Engine.spectral_profile(data)
+        self.assertEqual(profile["n_rows"], 200000)
+        self.assertLessEqual(profile["sample_rows"], 2000)
+
+    def test_fit_curves_polynomial_batch(self):
+        """Test batched polynomial fitting matches per-column np.polyfit"""
+        params_by_column, errors = Engine.fit_curves(self.sample_data, "feature1", ["feature2", "feature3"], method="polynomial", degree=2)
+        self.assertEqual(errors, {})
+        for column in ["feature2", "feature3"]:
+            params, covariance, fitted_data = params_by_column[column]
+            expected = np.polyfit(self.sample_data["feature1"], self.sample_data[column], 2)
+            np.testing.assert_allclose(params, expected, atol=1e-8)
+            self.assertEqual(covariance.shape, (3, 3))
+            self.assertIsInstance(fitted_data, pd.DataFrame)
+
+    def test_fit_curves_exponential_batch(self):
+        """Test batched exponential fitting across a worker pool"""
+        data = pd.DataFrame({"x": np.linspace(0, 2, 20)})
+        data["a"] = 2 * np.exp(0.5 * data["x"]) + 1
+        data["b"] = 3 * np.exp(0.3 * data["x"])
+        results, errors = Engine.fit_curves(data, "x", ["a", "b"], method="exponential")
+        self.assertEqual(errors, {})
+        np.testing.assert_allclose(results["a"][0], [2, 0.5, 1], rtol=1e-3, atol=1e-3)
+
+    def test_fit_curve_exponential_reports_convergence(self):
+        """Test seeded exponential fitting converges in few evaluations"""
+        data = pd.DataFrame({"x": np.linspace(0, 5, 40)})
+        data["y"] = 1.5 * np.exp(0.8 * data["x"]) - 4
+        params, covariance, fitted_data, info = Engine.fit_curve(data, "x", "y", method="exponential", full_output=True)
+        np.testing.assert_allclose(params, [1.5, 0.8, -4], rtol=1e-6)
+        self.assertTrue(info["converged"])
+        self.assertLess(info["nfev"], 50)
+
+    def test_fit_curve_logistic(self):
+        """Test curve fitting with logistic method"""
+        data = pd.DataFrame({"x": np.linspace(-6, 6, 50)})
+        data["y"] = 2 + 10 / (1 + np.exp(-1.3 * (data["x"] - 0.5)))
+        params, covariance, fitted_data, info = Engine.fit_curve(data, "x", "y", method="logistic", full_output=True)
+        np.testing.assert_allclose(params, [10, 1.3, 0.5, 2], rtol=1e-5)
+        self.assertEqual(covariance.shape, (4, 4))
+
+    def test_fit_curve_power(self):
+        """Test curve fitting with power law method"""
+        data = pd.DataFrame({"x": np.linspace(1, 10, 30)})
+        data["y"] = 3 * data["x"] ** 1.7
+        params, covariance, fitted_data = Engine.fit_curve(data, "x", "y", method="power")
+        np.testing.assert_allclose(params, [3, 1.7], rtol=1e-6)
+
+    def test_fit_curve_auto_degree(self):
+        """Test cross-validated degree selection recovers a cubic"""
+        rng = np.random.default_rng(3)
+        data = pd.DataFrame({"x": np.linspace(-3, 3, 80)})
+        data["y"] = data["x"] ** 3 - 2 * data["x"] + rng.normal(scale=0.1, size=80)
+        params, covariance, fitted_data, info = Engine.fit_curve(data, "x", "y", method="polynomial", degree="auto", full_output=True)
+        self.assertEqual(info["degree_selection"]["degree"], 3)
+        self.assertEqual(len(info["degree_selection"]["cv_errors"]), 10)
+        self.assertEqual(len(params), 4)
+
+    def test_interpolation_auto_degree(self):
+        """Test interpolation with an automatically selected polynomial degree"""
+        interpolated_data = Engine.interpolate(self.sample_data, x_feature="feature1", y_feature="feature2", kind="polynomial", num_points=10, degree="auto")
+        self.assertEqual(len(interpolated_data), 10)
+        self.assertEqual(interpolated_data.attrs["degree_selection"]["degree"], 1)
+
+    def test_fit_curve_bands(self):
+        """Test analytic and bootstrap bands over the fitted grid"""
+        rng = np.random.default_rng(4)
+        data = pd.DataFrame({"x": np.linspace(0, 10, 60)})
+        data["y"] = 0.5 * data["x"] ** 2 + rng.normal(scale=1.0, size=60)
+        params, covariance, fitted_data, info = Engine.fit_curve(data, "x", "y", method="polynomial", degree=2, full_output=True, bands=True, bootstrap_samples=40)
+        bands = info["bands"]
+        self.assertIsNotNone(covariance)
+        self.assertEqual(len(bands), len(fitted_data))
+        self.assertTrue(np.all(bands["confidence_lower"] <= fitted_data["y"]))
+        self.assertTrue(np.all(bands["prediction_upper"] >= bands["confidence_upper"]))
+        self.assertTrue(np.all(bands["bootstrap_lower"] <= bands["bootstrap_upper"]))
+
+    def test_interpolation_unsorted_duplicate_x_uses_cached_index(self):
+        """Test interpolation on unsorted, duplicated x reuses the sorted index"""
+        from backend.server_handler import sorted_index
+        data = pd.DataFrame({"x": [3, 1, 2, 2, 4], "y": [30, 10, 18, 22, 40], "z": [3, 1, 2, 2, 4]})
+        first = Engine.interpolate(data, "x", "y", kind="linear", num_points=4, cache_key="test:1")
+        np.testing.assert_allclose(first["y"], [10, 20, 30, 40])
+        index = sorted_index.get_sorted_index(None, "test:1", "x")
+        Engine.interpolate(data, "x", "z", kind="spline", num_points=4, cache_key="test:1")
+        self.assertIs(sorted_index.get_sorted_index(None, "test:1", "x"), index)
+        spline = sorted_index.get_spline(None, None, 3, 0, "test:1", "x", "z")
+        self.assertIs(sorted_index.get_spline(None, None, 3, 0, "test:1", "x", "z"), spline)
+
+    def test_interpolate_many_matches_single_column(self):
+        """Test batched interpolation agrees with per-column interpolation"""
+        data = pd.DataFrame({"x": [5, 1, 3, 2, 4, 2], "a": [5.0, 1, 9, 4, 16, 4], "b": [1.0, 2, 3, np.nan, 5, 6]})
+        for kind in ["linear", "polynomial", "spline"]:
+            batch = Engine.interpolate_many(data, "x", ["a", "b"], kind=kind, num_points=7, degree=2)
+            self.assertEqual(list(batch.columns), ["x", "a", "b"])
+            for column in ["a", "b"]:
+                single = Engine.interpolate(data, "x", column, kind=kind, num_points=7, degree=2)
+                np.testing.assert_allclose(batch[column], single[column], atol=1e-8)
+
+    def test_oversample_multiple_features(self):
+        """Test SMOTE interpolates in the full feature subspace, exactly and approximately"""
+        rng = np.random.default_rng(0)
+        data = pd.DataFrame({"a": rng.normal(size=60), "b": rng.normal(size=60), "label": [0] * 50 + [1] * 10})
+        minority = data[data["label"] == 1]
+        for approximate in [False, True]:
+            result = Engine.oversample_data(data, "a", "label", method="smote", oversample_factor=1, features=["a", "b"], approximate=approximate)
+            self.assertEqual(list(result.columns), ["a", "b", "label"])
+            self.assertEqual(result["label"].value_counts().to_dict(), {0: 50, 1: 50})
+            synthetic = result.iloc[60:]
+            self.assertTrue(synthetic["a"].between(minority["a"].min(), minority["a"].max()).all())
+            self.assertTrue(synthetic["b"].between(minority["b"].min(), minority["b"].max()).all())
+
+    def test_oversample_stream_chunks(self):
+        """Test streamed oversampling yields bounded chunks adding up to the full result"""
+        data = pd.DataFrame({"a": np.arange(40.0), "b": np.arange(40.0) ** 2, "label": [0] * 30 + [1] * 10})
+        chunks = list(Engine.oversample_stream(data, "label", ["a", "b"], method="smote", oversample_factor=2, chunk_rows=16))
+        self.assertTrue(all(len(chunk) <= 16 for chunk in chunks))
+        result = pd.concat(chunks, ignore_index=True)
+        self.assertEqual(result["label"].value_counts().to_dict(), {1: 60, 0: 30})
+        pd.testing.assert_frame_equal(result.iloc[:40], data)
+
+    def test_detect_outliers(self):
+        """Test vectorized and model-based outlier flags"""
+        rng = np.random.default_rng(0)
+        data = pd.DataFrame({"a": rng.normal(size=200), "b": rng.normal(size=200), "label": ["p"] * 200})
+        data.loc[7, "a"] = 25.0
+        data.loc[42, "b"] = -30.0
+        for method in ["zscore", "mad", "iqr", "isolation_forest", "lof"]:
+            mask = Engine.detect_outliers(data, method=method, contamination=0.01 if method in ["isolation_forest", "lof"] else "auto")
+            self.assertEqual(mask.shape, (200,))
+            self.assertTrue(mask[7] and mask[42], method)
+        cached = Engine.detect_outliers(data, method="iqr", cache_key="outliers:1")
+        self.assertIs(Engine.detect_outliers(data, method="iqr", cache_key="outliers:1"), cached)
+        with self.assertRaises(ValueError):
+            Engine.detect_outliers(data, method="unknown")
+
+    def test_cluster(self):
+        """Test MiniBatchKMeans and subsampled density clustering"""
+        rng = np.random.default_rng(0)
+        centers = np.repeat([[0.0, 0.0], [10.0, 10.0]], 300, axis=0)
+        data = pd.DataFrame(centers + rng.normal(scale=0.5, size=centers.shape), columns=["a", "b"])
+        for method in ["kmeans", "dbscan", "hdbscan"]:
+            labels = Engine.cluster(data, method=method, n_clusters=2, eps=0.5, min_samples=5, sample_rows=200)
+            self.assertEqual(labels.shape, (600,))
+            self.assertNotEqual(labels[0], labels[599], method)
+            self.assertEqual(np.unique(labels[labels >= 0]).size, 2, method)
+        with self.assertRaises(ValueError):
+            Engine.cluster(data, method="unknown")
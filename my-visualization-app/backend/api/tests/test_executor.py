@@ -0,0 +1,71 @@
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.shared_memory import SharedMemory
+from unittest import mock
+from django.test import SimpleTestCase
+from backend.server_handler import executor, worker_pool
+from backend.server_handler.cancellation import CancellationToken, OperationCancelled
+from backend.server_handler.engine import Engine
+from backend.server_handler.executor import SharedFrame, run_engine, EngineTimeoutError, SHARED_MEMORY_MIN_BYTES
+import numpy as np
+import pandas as pd
+
+
+class ExecutorTest(SimpleTestCase):
+    def setUp(self):
+        rows = SHARED_MEMORY_MIN_BYTES // 16 + 1  # Two float columns just above the shared memory threshold
+        rng = np.random.default_rng(0)
+        self.data = pd.DataFrame({"x": rng.normal(size=rows), "y": rng.normal(size=rows),
+                                  "label": rng.choice(["a", "b"], size=rows), "count": np.arange(rows)})
+
+    def test_shared_frame_round_trip(self):
+        shared = SharedFrame(self.data)
+        try:
+            self.assertEqual([column for column, *_ in shared.layout], ["x", "y", "count"])
+            pd.testing.assert_frame_equal(shared.load(), self.data)
+        finally:
+            shared.release()
+
+    def test_run_engine_in_pool(self):
+        expected = Engine.dimensional_reduction(self.data, method="pca", n_components=2)
+        result = run_engine("dimensional_reduction", self.data, method="pca", n_components=2)
+        np.testing.assert_allclose(np.abs(result.to_numpy()), np.abs(expected.to_numpy()), atol=1e-8)
+        with self.assertRaises(ValueError):
+            run_engine("dimensional_reduction", self.data, method="unknown")
+        with self.assertRaises(EngineTimeoutError):
+            run_engine("dimensional_reduction", self.data, method="pca", timeout=1e-6)
+
+    def test_shared_input_outlives_timeout(self):
+        future = Future()
+        future.set_running_or_notify_cancel()  # Picked up by a worker, so it cannot be cancelled
+        with mock.patch.object(executor, "_submit", return_value=future) as submit:
+            with self.assertRaises(EngineTimeoutError):
+                run_engine("dimensional_reduction", self.data, method="pca", timeout=1e-3)
+        shared = submit.call_args.args[1]
+        SharedMemory(name=shared.name).close()  # The worker can still read it
+        future.set_result(None)
+        with self.assertRaises(FileNotFoundError):
+            SharedMemory(name=shared.name)
+
+    def test_inline_when_pool_disabled(self):
+        worker_pool.configure_pool(size=0)
+        try:
+            self.assertEqual(worker_pool.map_in_pool(abs, [-1, -2]), [1, 2])
+            self.assertEqual(run_engine("dimensional_reduction", self.data.head(10), method="pca").shape, (10, 2))
+        finally:
+            worker_pool.configure_pool()
+
+    def test_map_in_pool_stops_waiting(self):
+        worker_pool.configure_pool(size=2, task_timeout=0.5)
+        try:
+            started = time.monotonic()
+            with self.assertRaises(EngineTimeoutError):
+                worker_pool.map_in_pool(time.sleep, [2, 2, 2])
+            token = CancellationToken()
+            with token.active(), self.assertRaises(OperationCancelled):
+                threading.Timer(0.1, token.cancel).start()
+                worker_pool.map_in_pool(time.sleep, [2, 2, 2])
+            self.assertLess(time.monotonic() - started, 2)
+        finally:
+            worker_pool.configure_pool()
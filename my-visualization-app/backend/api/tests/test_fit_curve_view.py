@@ -24,3 +24,39 @@ class FitCurveViewTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn("params", response.data)
         self.assertIn("generated_data", response.data)
+
+    @pytest.mark.django_db
+    def test_fit_curve_with_bands(self):
+        url = '/api/fit_curve/'
+        dataset = Dataset.objects.create(name="Band Dataset", features=["x", "y"], records=[{"x": i, "y": 3 * i + (i % 3)} for i in range(10)])
+        data = {
+            "params": {
+                "datasetId": dataset.id,
+                "xColumn": "x",
+                "yColumn": "y",
+                "type": "exponential",
+                "bands": True
+            }
+        }
+        response = self.client.post(url, json.dumps(data), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        content = response.json()
+        self.assertEqual(len(content["bands"]), len(content["generated_data"]))
+        self.assertIn("prediction_upper", content["bands"][0])
+        self.assertIn("converged", content["fit_info"])
+
+    @pytest.mark.django_db
+    def test_fit_curve_rejects_unbounded_bootstrap(self):
+        url = '/api/fit_curve/'
+        data = {
+            "params": {
+                "datasetId": self.dataset.id,
+                "xColumn": "x",
+                "yColumn": "y",
+                "bands": True,
+                "bootstrap_samples": 10 ** 9
+            }
+        }
+        response = self.client.post(url, json.dumps(data), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Bootstrap samples", response.json()["error"])
@@ -0,0 +1,32 @@
+from django.test import SimpleTestCase
+from pathlib import Path
+import json
+import os
+import subprocess
+import sys
+
+IMPORT_TIME_BUDGET = 5.0  # Seconds for django.setup() and URL resolution in a fresh interpreter
+HEAVY_MODULES = ["umap", "numba", "pynndescent", "sklearn", "imblearn", "scipy.optimize", "scipy.stats"]
+APP_DIR = Path(__file__).resolve().parents[3]
+
+STARTUP_SCRIPT = f"""
+import json, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+from django.urls import resolve
+resolve("/api/dimensional_reduction/")
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [name for name in {HEAVY_MODULES!r} if name in sys.modules]}}))
+"""
+
+
+class ImportTimeTest(SimpleTestCase):
+    def test_startup_does_not_import_scientific_backends(self):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": "backend.settings",
+               "PYTHONPATH": os.pathsep.join([str(APP_DIR), str(APP_DIR / "backend")])}
+        output = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], cwd=APP_DIR, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        self.assertEqual(result["loaded"], [])
+        self.assertLess(result["elapsed"], IMPORT_TIME_BUDGET)
@@ -22,3 +22,47 @@ class InterpolateViewTest(TestCase):
         response = self.client.post(url, json.dumps(data), content_type='application/json')
         self.assertEqual(response.status_code, 200)
         self.assertIn("interpolated_data", response.data)
+
+    @pytest.mark.django_db
+    def test_interpolate_many_columns_server_side(self):
+        url = '/api/interpolate/'
+        dataset = Dataset.objects.create(name="Multi", features=["x", "y", "z"], records=[{"x": i, "y": 2 * i, "z": i * i} for i in range(5)])
+        data = {
+            "dataset_id": dataset.id,
+            "x_feature": "x",
+            "y_features": ["y", "z"],
+            "kind": "linear",
+            "numPoints": 9,
+            "new_dataset_name": "Multi interpolated"
+        }
+        response = self.client.post(url, json.dumps(data), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        content = response.json()
+        new_dataset = Dataset.objects.get(id=content["new_dataset_id"])
+        self.assertEqual(new_dataset.last_dataset_id, dataset.id)
+        self.assertEqual(new_dataset.features, ["x", "y", "z"])
+        self.assertEqual(len(new_dataset.records), 9)
+        self.assertEqual(content["preview"][1], {"x": 0.5, "y": 1.0, "z": 0.5})
+
+    @pytest.mark.django_db
+    def test_interpolate_materialize_as(self):
+        url = '/api/interpolate/'
+        dataset = Dataset.objects.create(name="Line", features=["x", "y"], records=[{"x": i, "y": 3 * i} for i in range(4)])
+        data = {
+            "dataset_id": dataset.id,
+            "x_feature": "x",
+            "y_feature": "y",
+            "kind": "linear",
+            "numPoints": 50,
+            "materialize_as": "Line interpolated"
+        }
+        response = self.client.post(url, json.dumps(data), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        content = response.json()
+        self.assertNotIn("interpolated_data", content)
+        self.assertEqual(content["name"], "Line interpolated")
+        self.assertEqual(content["num_records"], 50)
+        self.assertEqual(len(content["preview"]), 20)
+        new_dataset = Dataset.objects.get(id=content["new_dataset_id"])
+        self.assertEqual(new_dataset.last_dataset_id, dataset.id)
+        self.assertEqual(len(new_dataset.records), 50)
@@ -0,0 +1,34 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from backend.api.models import Dataset
+from backend.server_handler.outliers import decode_mask
+import json
+import pytest
+
+
+class OutlierDetectionViewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        records = [{"x": i % 10, "y": (i * 3) % 7} for i in range(50)]
+        records[13] = {"x": 500, "y": 2}
+        self.dataset = Dataset.objects.create(name="Outliers", features=["x", "y"], records=records)
+
+    @pytest.mark.django_db
+    def test_detect_outliers_returns_bitmask(self):
+        url = '/api/detect_outliers/'
+        data = {"dataset_id": self.dataset.id, "method": "mad", "features": ["x"]}
+        response = self.client.post(url, json.dumps(data), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        content = response.json()
+        self.assertEqual(content["num_records"], 50)
+        self.assertEqual(content["num_outliers"], 1)
+        self.assertEqual(content["encoding"], "packbits-base64")
+        self.assertEqual(len(content["mask"]), 12)  # 50 bits -> 7 bytes -> 12 base64 characters
+        self.assertEqual(list(decode_mask(content["mask"], 50).nonzero()[0]), [13])
+
+    @pytest.mark.django_db
+    def test_detect_outliers_invalid_method(self):
+        url = '/api/detect_outliers/'
+        data = {"dataset_id": self.dataset.id, "method": "unknown"}
+        response = self.client.post(url, json.dumps(data), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
@@ -25,3 +25,19 @@ class OversampleDataViewTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn("oversampled_features", response.data)
         self.assertIn("oversampled_records", response.data)
+
+    @pytest.mark.django_db
+    def test_oversample_stream(self):
+        url = '/api/oversample_data/'
+        dataset = Dataset.objects.create(name="Classes", features=["a", "b", "label"], records=[{"a": i, "b": i % 3, "label": int(i >= 8)} for i in range(12)])
+        data = {
+            "datasetId": dataset.id,
+            "stream": True,
+            "params": {"xColumn": "a", "yColumn": "label", "features": ["a", "b"], "method": "smote", "num_samples": 1}
+        }
+        response = self.client.post(url, json.dumps(data), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(rows), 16)
+        self.assertEqual(set(rows[-1]), {"a", "b", "label"})
@@ -0,0 +1,69 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from backend.api.models import Dataset
+import json
+import pytest
+
+
+class PipelineViewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.dataset = Dataset.objects.create(
+            name="Pipeline Dataset",
+            features=["x", "y", "z", "noise"],
+            records=[{"x": i, "y": 2 * i + 1, "z": i * i, "noise": (i * 7) % 5} for i in range(20)]
+        )
+        self.url = '/api/pipeline/'
+
+    @pytest.mark.django_db
+    def test_branches_and_requested_outputs(self):
+        data = {
+            "dataset_id": self.dataset.id,
+            "steps": [
+                {"id": "clean", "op": "drop_features", "params": {"features": ["noise"]}},
+                {"id": "interp", "op": "interpolate", "params": {"x_feature": "x", "y_features": ["y", "z"], "numPoints": 39}},
+                {"id": "pca", "op": "dimensional_reduction", "input": "clean", "params": {"method": "pca", "n_components": 2}},
+                {"id": "corr", "op": "correlation", "input": "interp", "params": {"features": ["y", "z"]}}
+            ],
+            "outputs": ["pca", "corr"]
+        }
+        response = self.client.post(self.url, json.dumps(data), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        content = response.json()
+        self.assertEqual(set(content["outputs"]), {"pca", "corr"})
+        self.assertEqual(len(content["outputs"]["pca"]["records"]), 20)
+        self.assertEqual(content["outputs"]["corr"]["features"], ["feature", "y", "z"])
+        self.assertFalse(content["cached"])
+
+        # The same definition with different key order is served from the cache
+        data["steps"][0] = {"params": {"features": ["noise"]}, "op": "drop_features", "id": "clean"}
+        response = self.client.post(self.url, json.dumps(data), content_type='application/json')
+        self.assertTrue(response.json()["cached"])
+
+    @pytest.mark.django_db
+    def test_materialize_output(self):
+        data = {
+            "dataset_id": self.dataset.id,
+            "steps": [
+                {"id": "interp", "op": "interpolate", "params": {"x_feature": "x", "y_feature": "y", "numPoints": 50}}
+            ],
+            "materialize_as": {"interp": "Pipeline result"}
+        }
+        response = self.client.post(self.url, json.dumps(data), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        output = response.json()["outputs"]["interp"]
+        new_dataset = Dataset.objects.get(id=output["new_dataset_id"])
+        self.assertEqual(new_dataset.last_dataset_id, self.dataset.id)
+        self.assertEqual(len(new_dataset.records), 50)
+        self.assertEqual(len(output["preview"]), 20)
+
+    @pytest.mark.django_db
+    def test_invalid_pipeline(self):
+        data = {"dataset_id": self.dataset.id, "steps": [{"id": "a", "op": "unknown"}]}
+        response = self.client.post(self.url, json.dumps(data), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Unknown pipeline operation", response.json()["error"])
+
+        data = {"dataset_id": self.dataset.id, "steps": [{"id": "a", "op": "correlation", "input": "b"}]}
+        response = self.client.post(self.url, json.dumps(data), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,99 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from backend.api.models import Dataset
+from backend.server_handler import query
+from backend.server_handler.query import ColumnIndex, run_query
+import json
+import numpy as np
+import pandas as pd
+import pytest
+
+
+class QueryDatasetViewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        records = [{"x": i, "y": (i * 7) % 10, "label": "even" if i % 2 == 0 else "odd"} for i in range(20)]
+        records[3]["y"] = None
+        self.dataset = Dataset.objects.create(name="Query", features=["x", "y", "label"], records=records)
+        self.url = '/api/query/'
+
+    def query(self, **params):
+        data = {"dataset_id": self.dataset.id, **params}
+        return self.client.post(self.url, json.dumps(data), content_type='application/json')
+
+    @pytest.mark.django_db
+    def test_filter_sort_and_limit(self):
+        response = self.query(where=[{"column": "x", "op": ">=", "value": 10}, {"column": "label", "op": "==", "value": "odd"}],
+                              sort=[{"column": "y", "descending": True}], columns=["x", "y"], limit=2)
+        self.assertEqual(response.status_code, 200)
+        content = response.json()
+        self.assertEqual(content["num_records"], 20)
+        self.assertEqual(content["num_matched"], 5)
+        self.assertEqual(content["records"], [{"x": 17, "y": 9.0}, {"x": 11, "y": 7.0}])
+
+    @pytest.mark.django_db
+    def test_missing_values_sort_last(self):
+        content = self.query(where=[{"column": "x", "op": "between", "value": [2, 4]}], sort=["y"]).json()
+        self.assertEqual([record["x"] for record in content["records"]], [2, 4, 3])
+        self.assertIsNone(content["records"][-1]["y"])
+        content = self.query(where=[{"column": "y", "op": "is_null"}]).json()
+        self.assertEqual([record["x"] for record in content["records"]], [3])
+
+    @pytest.mark.django_db
+    def test_group_by(self):
+        content = self.query(group_by=["label"], aggregates=[{"func": "count"}, {"column": "x", "func": "sum", "as": "total"}],
+                             sort=[{"column": "total", "descending": True}]).json()
+        self.assertEqual(content["columns"], ["label", "count", "total"])
+        self.assertEqual(content["records"], [{"label": "odd", "count": 10, "total": 100}, {"label": "even", "count": 10, "total": 90}])
+
+    @pytest.mark.django_db
+    def test_invalid_query(self):
+        self.assertEqual(self.query(where=[{"column": "missing", "op": "==", "value": 1}]).status_code, 400)
+        self.assertEqual(self.query(where=[{"column": "x", "op": "like", "value": 1}]).status_code, 400)
+        self.assertEqual(self.query(where=[{"column": "x", "op": ">", "value": "a"}]).status_code, 400)
+        self.assertEqual(self.query(group_by=["label"], aggregates=[{"column": "x", "func": "mode"}]).status_code, 400)
+        self.assertEqual(self.query(where=[{"column": "x", "op": "between", "value": [1]}]).status_code, 400)
+        self.assertEqual(self.query(where=[{"column": "x", "op": "between", "value": [1, None]}]).status_code, 400)
+        self.assertEqual(self.query(where=[{"column": "x", "op": "<", "value": None}]).status_code, 400)
+        self.assertEqual(self.query(where=["x"]).status_code, 400)
+        self.assertEqual(self.query(group_by=["label"], aggregates=["x"]).status_code, 400)
+        self.assertEqual(self.query(sort=[1]).status_code, 400)
+
+
+class ColumnIndexTest(TestCase):
+    def test_zone_map_scan_then_sorted_index(self):
+        values = np.arange(100000, dtype=np.float64)
+        values[5] = np.nan
+        index = ColumnIndex(values)
+        zone_min, zone_max = index.zones
+        self.assertEqual(len(zone_min), -(-100000 // query.ZONE_ROWS))
+        self.assertEqual((zone_min[0], zone_max[0]), (0.0, query.ZONE_ROWS - 1.0))
+
+        scanned = index.range_rows(90000, 90010, True, False)
+        self.assertFalse(index.is_sorted)
+        self.assertEqual(list(scanned), list(range(90000, 90010)))
+        self.assertEqual(list(index.range_rows(90000, 90010, True, False)), list(scanned))
+        self.assertTrue(index.is_sorted)
+        self.assertEqual(len(index.range_rows(None, 10)), 10)  # The missing value never matches
+
+    def test_top_k_and_cached_columns(self):
+        frame = pd.DataFrame({"x": np.random.default_rng(0).permutation(1000), "y": np.arange(1000)})
+        loaded = []
+
+        def load(columns):
+            loaded.append(columns)
+            return frame[columns]
+
+        result = run_query(load, ["x", "y"], {"where": [{"column": "y", "op": "<", "value": 500}],
+                                              "sort": [{"column": "x", "descending": True}], "limit": 3}, "query:1")
+        expected = frame[frame.y < 500].sort_values("x", ascending=False).head(3).to_dict(orient="records")
+        self.assertEqual(result["records"], expected)
+        run_query(load, ["x", "y"], {"columns": ["x"], "limit": 1}, "query:1")
+        self.assertEqual(loaded, [["y", "x"]])
+
+    def test_descending_unsigned(self):
+        frame = pd.DataFrame({"u": np.array([1, 2 ** 63 + 5, 3, 0], dtype=np.uint64)})
+        for limit in (2, 10):
+            result = run_query(lambda columns: frame[columns], ["u"], {"where": [{"column": "u", "op": ">", "value": 0}],
+                                                                       "sort": [{"column": "u", "descending": True}], "limit": limit})
+            self.assertEqual([record["u"] for record in result["records"]], [2 ** 63 + 5, 3, 1][:limit])
@@ -0,0 +1,108 @@
+import asyncio
+import json
+from django.test import TestCase, SimpleTestCase
+from rest_framework.test import APIClient
+from backend.api.models import Dataset
+from backend.server_handler import scheduler
+from backend.server_handler.cost_model import estimate_cost
+from backend.server_handler.scheduler import Scheduler, AdmissionError, QueueFullError, SchedulerBusyError
+
+
+class SchedulerTest(SimpleTestCase):
+    def test_estimates(self):
+        pca_seconds, pca_memory = estimate_cost("dimensional_reduction", 10 ** 6, 20, method="pca")
+        tsne_seconds, tsne_memory = estimate_cost("dimensional_reduction", 10 ** 6, 20, method="tsne")
+        self.assertGreater(tsne_seconds, 100 * pca_seconds)
+        self.assertGreater(tsne_memory, pca_memory)
+        self.assertLess(estimate_cost("interpolate", 1000, 2)[0], scheduler.INTERACTIVE_SECONDS)
+        self.assertLess(estimate_cost("fit_curve", 10 ** 5, 2)[0], estimate_cost("fit_curve", 10 ** 5, 2, repeats=200)[0])
+        with self.assertRaises(ValueError):
+            estimate_cost("unknown", 10, 2)
+
+    async def test_interactive_admitted_first(self):
+        queue = Scheduler(memory_budget=100, batch_slots=1)
+        order = []
+        holder = asyncio.Event()
+
+        async def run(name, seconds, memory, wait=None):
+            async with queue.admit(name, seconds, memory):
+                order.append(name)
+                if wait is not None:
+                    await wait.wait()
+
+        running = asyncio.ensure_future(run("holder", 0.1, 100, holder))
+        await asyncio.sleep(0)
+        waiting = [asyncio.ensure_future(run("batch", 10, 60)), asyncio.ensure_future(run("interactive", 0.1, 60))]
+        await asyncio.sleep(0.01)
+        self.assertEqual(queue.depth()["queued"], {"interactive": 1, "batch": 1})
+        holder.set()
+        await asyncio.gather(running, *waiting)
+        self.assertEqual(order, ["holder", "interactive", "batch"])
+        self.assertEqual(queue.memory_in_use, 0)
+
+    async def test_turned_away(self):
+        queue = Scheduler(memory_budget=100, batch_slots=1, max_queue=1, max_wait=0.05)
+        with self.assertRaises(AdmissionError) as raised:
+            async with queue.admit("huge", 10, 1000):
+                pass
+        self.assertEqual((raised.exception.status, raised.exception.retry_after), (503, None))
+
+        async with queue.admit("running", 10, 10):
+            with self.assertRaises(SchedulerBusyError):
+                async with queue.admit("waiting", 10, 10):
+                    pass
+            self.assertEqual(queue.depth()["queued"]["batch"], 0)
+
+            waiting = asyncio.ensure_future(queue.admit("waiting", 10, 10).__aenter__())
+            await asyncio.sleep(0)
+            with self.assertRaises(QueueFullError) as raised:
+                async with queue.admit("third", 10, 10):
+                    pass
+            self.assertEqual(raised.exception.status, 429)
+            with self.assertRaises(SchedulerBusyError):
+                await waiting
+        self.assertEqual(queue.depth()["running"], {"interactive": 0, "batch": 0})
+
+
+class SchedulerViewsTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.previous = scheduler.get_scheduler()
+        self.dataset = Dataset.objects.create(name="Scheduled", features=["x", "y"],
+                                              records=[{"x": float(i), "y": i % 3} for i in range(10)])
+
+    def tearDown(self):
+        scheduler._scheduler["instance"] = self.previous
+
+    def test_queue_status(self):
+        response = self.client.get("/api/queue/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()["queued"]), {"interactive", "batch"})
+
+    def test_rejected_over_budget(self):
+        body = {"dataset_id": self.dataset.id, "features": ["x", "y"]}
+        response = self.client.post("/api/correlation/", json.dumps(body), content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+
+        scheduler.configure_scheduler(memory_budget=1)
+        response = self.client.post("/api/correlation/", json.dumps(body), content_type="application/json")
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("budget", response.json()["error"])
+        self.assertNotIn("Retry-After", response)
+
+    def test_pipeline_and_stream_admitted(self):
+        dataset = Dataset.objects.create(name="Classes", features=["a", "label"],
+                                         records=[{"a": float(i), "label": int(i >= 8)} for i in range(12)])
+        pipeline = {"dataset_id": dataset.id, "steps": [{"id": "corr", "op": "correlation"}]}
+        stream = {"datasetId": dataset.id, "stream": True,
+                  "params": {"xColumn": "a", "yColumn": "label", "features": ["a"], "num_samples": 1}}
+        response = self.client.post("/api/oversample_data/", json.dumps(stream), content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(scheduler.get_scheduler().memory_in_use, 0)  # Held until the response is done
+        b"".join(response.streaming_content)
+        self.assertEqual(scheduler.get_scheduler().memory_in_use, 0)
+
+        scheduler.configure_scheduler(memory_budget=1)
+        for url, body in (("/api/pipeline/", pipeline), ("/api/oversample_data/", stream)):
+            response = self.client.post(url, json.dumps(body), content_type="application/json")
+            self.assertEqual(response.status_code, 503)
@@ -0,0 +1,60 @@
+import json
+from django.test import TestCase, SimpleTestCase, AsyncClient, override_settings
+from rest_framework.test import APIClient
+from backend.api.models import Dataset
+from backend.server_handler.timing import Timings, recording, span, timed
+
+
+class TimingsTest(SimpleTestCase):
+    def test_spans(self):
+        with span("outside"):
+            pass
+
+        @timed("helper")
+        def helper():
+            with span("inner"):
+                return 1
+
+        with recording() as timings:
+            helper()
+            helper()
+            other = Timings()
+            other.add("worker", 0.002)
+            timings.merge(other.as_dict())
+        self.assertEqual(set(timings.spans), {"helper", "inner", "worker"})
+        self.assertEqual(timings.spans["helper"][1], 2)
+        self.assertIn("worker;dur=2.0", timings.header())
+
+
+class ServerTimingMiddlewareTest(TestCase):
+    def setUp(self):
+        records = [{"x": float(i), "y": 3.0 * i - 1} for i in range(20)]
+        self.dataset = Dataset.objects.create(name="Timed", features=["x", "y"], records=records)
+        self.body = json.dumps({"params": {"datasetId": self.dataset.id, "xColumn": "x", "yColumn": "y", "type": "linear"}})
+
+    def phases(self, response):
+        return {metric.split(";")[0] for metric in response["Server-Timing"].split(", ")}
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1)
+    def test_fit_curve_breakdown(self):
+        with self.assertLogs("backend.timing", "INFO") as logs:
+            response = APIClient().post("/api/fit_curve/", self.body, content_type="application/json",
+                                        HTTP_ORIGIN="http://localhost:3000")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue({"parse", "db", "decode", "dataframe", "engine", "fit", "serialize", "total"}
+                        <= self.phases(response))
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual((line["path"], line["status"]), ("/api/fit_curve/", 200))
+        self.assertGreaterEqual(line["spans_ms"]["total"], line["spans_ms"]["engine"])
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1)
+    async def test_async_client(self):
+        with self.assertLogs("backend.timing", "INFO"):
+            response = await AsyncClient().post("/api/fit_curve/", self.body, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("engine", self.phases(response))
+
+    def test_not_sampled(self):
+        response = APIClient().post("/api/fit_curve/", self.body, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Server-Timing", response)
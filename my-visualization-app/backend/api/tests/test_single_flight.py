@@ -0,0 +1,85 @@
+import asyncio
+import fcntl
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+from django.test import SimpleTestCase
+from backend.server_handler import single_flight as flights
+from backend.server_handler.single_flight import configure_single_flight, flight_key, single_flight
+
+
+class SingleFlightTest(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.chmod(self.directory, 0o700)
+        self.previous = flights._flights["directory"]
+        configure_single_flight(self.directory)
+        self.calls = 0
+
+    def tearDown(self):
+        configure_single_flight(self.previous)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    async def compute(self):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return {"calls": self.calls}
+
+    async def test_concurrent_callers_share_one_computation(self):
+        key = flight_key("1:v", "correlation", features=["x", "y"], method="pearson")
+        results = await asyncio.gather(*[single_flight(key, self.compute) for _ in range(5)])
+        self.assertEqual(self.calls, 1)
+        self.assertTrue(all(result is results[0] for result in results))
+
+        await single_flight(flight_key("1:v", "correlation", features=["x"], method="pearson"), self.compute)
+        self.assertEqual(self.calls, 2)
+
+    async def test_exception_shared_and_cancellation_ignored(self):
+        async def fail():
+            self.calls += 1
+            await asyncio.sleep(0.05)
+            raise ValueError("no")
+
+        callers = [asyncio.ensure_future(single_flight("failing", fail)) for _ in range(3)]
+        await asyncio.sleep(0)
+        callers[0].cancel()
+        results = await asyncio.gather(*callers, return_exceptions=True)
+        self.assertIsInstance(results[0], asyncio.CancelledError)
+        self.assertTrue(all(isinstance(result, ValueError) for result in results[1:]))
+        self.assertEqual(self.calls, 1)
+
+    def test_callers_in_other_threads_wait(self):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(asyncio.run(single_flight("threads", self.compute))))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [{"calls": 1}] * 4)
+
+    async def test_result_of_another_process_is_reused(self):
+        key = flight_key("2:v", "dimensional_reduction", method="pca", n_components=2)
+        path = os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest())
+        # A separate open file stands in for another process holding the lock while it computes
+        other = os.open(path + flights.LOCK_SUFFIX, os.O_CREAT | os.O_RDWR, 0o600)
+        fcntl.flock(other, fcntl.LOCK_EX)
+        waiting = asyncio.ensure_future(single_flight(key, self.compute))
+        await asyncio.sleep(3 * flights.LOCK_POLL_INTERVAL)
+        self.assertFalse(waiting.done())
+
+        with open(path + flights.RESULT_SUFFIX, "wb") as file:
+            pickle.dump("published", file)
+        os.close(other)
+        self.assertEqual(await waiting, "published")
+        self.assertEqual(self.calls, 0)
+        self.assertEqual(os.listdir(self.directory), [os.path.basename(path) + flights.LOCK_SUFFIX])
+
+    async def test_result_published_only_for_waiters(self):
+        self.assertEqual(await single_flight("alone", self.compute), {"calls": 1})
+        self.assertFalse(any(name.endswith(flights.RESULT_SUFFIX) for name in os.listdir(self.directory)))
+        self.assertEqual(await single_flight("alone", self.compute), {"calls": 2})
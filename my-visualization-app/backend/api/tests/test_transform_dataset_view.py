@@ -0,0 +1,97 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from backend.api.models import Dataset
+from backend.server_handler.lazy import LazyFrame, optimize_plan
+import json
+import pandas as pd
+import pytest
+
+
+class TransformDatasetViewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.dataset = Dataset.objects.create(
+            name="Source",
+            features=["a", "b", "label"],
+            records=[{"a": i, "b": 10 - i, "label": f"r{i}"} for i in range(10)]
+        )
+        self.url = '/api/transform_dataset/'
+
+    def transform(self, operations, dataset=None, **extra):
+        data = {"dataset_id": (dataset or self.dataset).id, "operations": operations, **extra}
+        return self.client.post(self.url, json.dumps(data), content_type='application/json')
+
+    @pytest.mark.django_db
+    def test_lazy_dataset_is_computed_on_request(self):
+        response = self.transform([
+            {"op": "filter", "expression": "a >= 5"},
+            {"op": "derive", "name": "ratio", "expression": "a / b"},
+            {"op": "drop", "columns": ["b"]}
+        ])
+        self.assertEqual(response.status_code, 200)
+        content = response.json()
+        self.assertTrue(content["lazy"])
+        self.assertEqual(content["features"], ["a", "label", "ratio"])
+
+        lazy_dataset = Dataset.objects.get(id=content["new_dataset_id"])
+        self.assertEqual(lazy_dataset.records, [])
+        self.assertEqual(lazy_dataset.last_dataset_id, self.dataset.id)
+
+        detail = self.client.get(f'/api/datasets/{lazy_dataset.id}/').json()
+        self.assertEqual(len(detail["records"]), 5)
+        self.assertEqual(detail["records"][0], {"a": 5, "label": "r5", "ratio": 1.0})
+
+        download = self.client.get(f'/api/download/{lazy_dataset.id}/csv/').content.decode('utf-8')
+        self.assertTrue(download.startswith("a,label,ratio"))
+
+    @pytest.mark.django_db
+    def test_chained_lazy_datasets_and_deletion(self):
+        first = Dataset.objects.get(id=self.transform([{"op": "derive", "name": "c", "expression": "a + b"}]).json()["new_dataset_id"])
+        second = Dataset.objects.get(id=self.transform([{"op": "filter", "expression": "a < 3"}], dataset=first).json()["new_dataset_id"])
+        self.assertEqual(list(second.get_dataframe()["c"]), [10, 10, 10])
+
+        response = self.client.post('/api/delete_feature/', json.dumps({"dataset_id": second.id, "features_to_remove": ["label"]}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        second.refresh_from_db()
+        self.assertEqual(second.features, ["a", "b", "c"])
+        self.assertEqual(list(second.get_dataframe().columns), ["a", "b", "c"])
+
+        response = self.client.post('/api/delete_feature/', json.dumps({"dataset_id": second.id, "features_to_remove": ["unknown"]}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        second.refresh_from_db()
+        self.assertEqual(len(second.plan), 2)
+        self.assertEqual(list(second.get_dataframe().columns), ["a", "b", "c"])
+
+    @pytest.mark.django_db
+    def test_materialize_and_invalid_plan(self):
+        content = self.transform([{"op": "select", "columns": ["a"]}], materialize=True).json()
+        self.assertFalse(content["lazy"])
+        self.assertEqual(len(Dataset.objects.get(id=content["new_dataset_id"]).records), 10)
+
+        response = self.transform([{"op": "derive", "name": "x", "expression": "missing * 2"}])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("missing", response.json()["error"])
+
+
+class LazyFrameTest(TestCase):
+    def test_projection_pushdown_and_dead_derivations(self):
+        source = pd.DataFrame({"a": [1.0, 2.0, 3.0], "b": [3.0, 2.0, 1.0], "c": [0, 0, 0]})
+        loaded = []
+
+        def load(columns):
+            loaded.append(columns)
+            return source[columns]
+
+        frame = (LazyFrame(load, list(source.columns))
+                 .derive("unused", "log(c)")
+                 .derive("s", "a + b")
+                 .filter("a > 1")
+                 .select(["s"]))
+        source_columns, stage, output = optimize_plan(frame.source_features, frame.plan)
+        self.assertEqual(source_columns, ["a", "b"])
+        self.assertEqual([step["op"] for step in stage], ["derive", "filter"])
+        self.assertEqual(output, ["s"])
+
+        result = frame.collect()
+        self.assertEqual(loaded, [["a", "b"]])
+        self.assertEqual(list(result["s"]), [4.0, 4.0])
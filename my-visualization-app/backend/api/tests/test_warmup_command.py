@@ -0,0 +1,40 @@
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from backend.server_handler import warmup
+from io import StringIO
+from unittest import mock
+import os
+import shutil
+import sys
+import tempfile
+
+
+class WarmupCommandTest(SimpleTestCase):
+    def test_warmup_reports_timings(self):
+        output = StringIO()
+        call_command("warmup", tasks=["imports"], stdout=output)
+        self.assertIn("imports:", output.getvalue())
+        self.assertIn("Warm-up finished", output.getvalue())
+        self.assertIn("imports", warmup._completed)
+        self.assertEqual(warmup.warm_up(["imports"]), {"imports": 0.0})  # Not repeated in the same process
+
+    def test_numba_cache_directory(self):
+        self.assertEqual(warmup.configure_numba_cache(None), os.environ.get("NUMBA_CACHE_DIR"))
+        if "numba" in sys.modules:
+            self.addCleanup(setattr, sys.modules["numba"].config, "CACHE_DIR", sys.modules["numba"].config.CACHE_DIR)
+        cache_dir = os.path.join(tempfile.mkdtemp(), ".numba_cache")
+        self.addCleanup(shutil.rmtree, os.path.dirname(cache_dir), True)
+        with mock.patch.dict(os.environ):
+            os.environ.pop("NUMBA_CACHE_DIR", None)
+            self.assertEqual(warmup.configure_numba_cache(cache_dir), cache_dir)
+            self.assertEqual(os.environ["NUMBA_CACHE_DIR"], cache_dir)
+        self.assertTrue(os.path.isdir(cache_dir))
+
+    def test_warm_up_logged(self):
+        with self.assertLogs("backend.warmup", "INFO") as logs:
+            warmup.start_warm_up(["imports"]).join(60)
+        self.assertIn("Warm-up finished: imports", logs.output[0])
+
+    def test_unknown_task(self):
+        with self.assertRaises(ValueError):
+            warmup.warm_up(["compile_everything"])
@@ -1,8 +1,9 @@
 from django.urls import path
 from .views import DataVisualizationView, OversampleDataView, \
-    HandleUserActionView, ExtrapolateView, FitCurveView, InterpolateView, \
+    HandleUserActionView, ExtrapolateView, FitCurveView, BatchFitCurveView, InterpolateView, \
     CorrelationView, DimensionalReductionView, DatasetDetailView, DatasetColumnsView, \
-    DeleteFeatureView, UploadView, DownloadView, RecommendDimReductionView
+    DeleteFeatureView, AddFeatureView, TransformDatasetView, QueryDatasetView, UploadView, DownloadView, RecommendDimReductionView, PipelineView, \
+    OutlierDetectionView, ClusterView, QueueStatusView, CancelOperationView
 from backend.api.views.dataset_views import CreateDatasetView
 
 urlpatterns = [
@@ -11,14 +12,23 @@ urlpatterns = [
     path('download/<int:dataset_id>/<str:file_format>/', DownloadView.as_view(), name='download_dataset'),
     path("handle_user_action/", HandleUserActionView.as_view(), name="handle_user_action"),
     path('fit_curve/', FitCurveView.as_view(), name='fit_curve'),
+    path('fit_curve_batch/', BatchFitCurveView.as_view(), name='fit_curve_batch'),
     path('interpolate/', InterpolateView.as_view(), name='interpolate'),
     path('extrapolate/', ExtrapolateView.as_view(), name='extrapolate'),
     path('correlation/', CorrelationView.as_view(), name='correlation'),
     path('dimensional_reduction/', DimensionalReductionView.as_view(), name='dimensional_reduction'),
     path('recommend_dim_reduction/', RecommendDimReductionView.as_view(), name='recommend_dim_reduction'),
     path('oversample_data/', OversampleDataView.as_view(), name='oversample_data'),
+    path('pipeline/', PipelineView.as_view(), name='pipeline'),
+    path('detect_outliers/', OutlierDetectionView.as_view(), name='detect_outliers'),
+    path('cluster/', ClusterView.as_view(), name='cluster'),
+    path('queue/', QueueStatusView.as_view(), name='queue_status'),
+    path('cancel/', CancelOperationView.as_view(), name='cancel_operation'),
     path('datasets/<int:dataset_id>/', DatasetDetailView.as_view(), name='dataset-detail'),
     path('dataset/<int:dataset_id>/columns/', DatasetColumnsView.as_view(), name='dataset-columns'),
     path('delete_feature/', DeleteFeatureView.as_view(), name='delete_feature'),
+    path('add_feature/', AddFeatureView.as_view(), name='add_feature'),
+    path('transform_dataset/', TransformDatasetView.as_view(), name='transform_dataset'),
+    path('query/', QueryDatasetView.as_view(), name='query'),
     path('create_dataset/', CreateDatasetView.as_view(), name = 'creat_dataset'),
 ]
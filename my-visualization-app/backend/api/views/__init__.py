@@ -2,11 +2,14 @@ from .data_visualization_view import DataVisualizationView
 from .handle_user_action_view import HandleUserActionView
 from .upload_view import UploadView
 from .download_view import DownloadView
-from .dataset_views import DatasetColumnsView, DatasetDetailView, DeleteFeatureView, ChangeDataView
+from .dataset_views import DatasetColumnsView, DatasetDetailView, DeleteFeatureView, ChangeDataView, TransformDatasetView, QueryDatasetView, \
+    AddFeatureView
 from .upload_dataset_view import UploadDatasetView
 from .processing_views import (InterpolateView, ExtrapolateView, CorrelationView, FitCurveView,
-                               DimensionalReductionView, OversampleDataView
-                               , RecommendDimReductionView)
+                               BatchFitCurveView, DimensionalReductionView, OversampleDataView
+                               , RecommendDimReductionView, PipelineView,
+                               OutlierDetectionView, ClusterView, QueueStatusView,
+                               CancelOperationView)
 
 __all__ = [
     "UploadDatasetView",
@@ -17,6 +20,9 @@ __all__ = [
     "DatasetColumnsView",
     "DeleteFeatureView",
     "ChangeDataView",
+    "TransformDatasetView",
+    "QueryDatasetView",
+    "AddFeatureView",
     "DimensionalReductionView",
     "RecommendDimReductionView",
     "OversampleDataView",
@@ -24,5 +30,11 @@ __all__ = [
     "InterpolateView",
     "CorrelationView",
     "FitCurveView",
+    "BatchFitCurveView",
+    "PipelineView",
+    "OutlierDetectionView",
+    "ClusterView",
+    "QueueStatusView",
+    "CancelOperationView",
     "DownloadView",
 ]
\ No newline at end of file
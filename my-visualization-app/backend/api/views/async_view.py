@@ -0,0 +1,174 @@
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from backend.api.models import Dataset
+from backend.server_handler.cancellation import cancel_scope, operation_cancellation, clear_operation, \
+    OperationCancelled
+from backend.server_handler.executor import run_in_thread
+from backend.server_handler.scheduler import get_scheduler
+from backend.server_handler.timing import timed
+
+OPERATION_HEADER = "X-Operation-Id"  # Client-chosen id under which a running request can be cancelled
+CANCEL_POLL_INTERVAL = 0.1  # Seconds between looks whether the operation of a request was cancelled
+CANCELLED_STATUS = 499
+CANCELLED_REASON = "Client Closed Request"
+OPERATION_CANCELLED = "Operation {} was cancelled."
+
+
+class AsyncAPIView(View):
+    """
+    Base of the views that run natively under ASGI (backend/asgi.py).
+
+    While such a view waits for the database, a computation or a slow client it
+    holds no thread, so one process can serve many slow requests at once.
+    Database access goes through sync_to_async, in-process computations through
+    run_in_thread and Engine calls for the process pool through arun_engine.
+    Like DRF's APIView, the views are exempt from CSRF checks.
+
+    A request sent with an OPERATION_HEADER can be cancelled through the cancel
+    endpoint while it runs, and under ASGI a request is cancelled when its
+    client disconnects; either stops the computations it waits for.
+    """
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        operation_id = request.headers.get(OPERATION_HEADER)
+        if not operation_id:
+            return await super().dispatch(request, *args, **kwargs)
+        try:
+            return await run_cancellable(operation_id, super().dispatch(request, *args, **kwargs))
+        except OperationCancelled:
+            return JsonResponse({"error": OPERATION_CANCELLED.format(operation_id)}, status=CANCELLED_STATUS,
+                                reason=CANCELLED_REASON)
+
+
+async def run_cancellable(operation_id: str, coroutine):
+    """
+    Await coroutine, cancelling it once the operation is cancelled (see cancellation.cancel_operation).
+    Cancels sent before the request started are ignored, so a client may reuse an operation id.
+
+    :raises OperationCancelled: if it was
+    """
+    started = time.time()
+    with cancel_scope() as scope:
+        task = asyncio.ensure_future(coroutine)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=CANCEL_POLL_INTERVAL)
+            if done:
+                return task.result()
+            hard = operation_cancellation(operation_id, since=started)  # A look at one small file in shared memory
+            if hard is not None:
+                scope.hard = hard
+                task.cancel()
+                await asyncio.wait({task})
+                raise OperationCancelled()
+    except asyncio.CancelledError:
+        task.cancel()  # The client went away
+        raise
+    finally:
+        clear_operation(operation_id)
+
+
+@timed("dataframe")
+async def dataset_frame(dataset, load=None):
+    """
+    Load a DataFrame of a dataset together with its cache key, both of which may query the
+    database (separately stored columns, the parents of a lazy dataset).
+
+    :param dataset: Dataset
+    :param load: callable, Dataset -> pandas.DataFrame (default: all of its columns)
+    :return: tuple (pandas.DataFrame, str)
+    """
+    load = load or Dataset.get_dataframe
+    return await sync_to_async(lambda: (load(dataset), dataset.cache_key))()
+
+
+async def dataset_cache_key(dataset) -> str:
+    """
+    Dataset.cache_key, which queries the parents of a lazy dataset.
+    """
+    return await sync_to_async(lambda: dataset.cache_key)()
+
+
+@timed("serialize")
+async def json_response(data, **kwargs) -> JsonResponse:
+    """
+    JsonResponse encoded in a compute thread, since large record lists take a while to serialise.
+    """
+    return await run_in_thread(JsonResponse, data, **kwargs)
+
+
+def admission_response(error) -> JsonResponse:
+    """
+    Answer an operation the scheduler turned away, with the queue state and when to retry.
+
+    :param error: scheduler.AdmissionError
+    """
+    response = JsonResponse({"error": str(error), "queue": get_scheduler().depth()}, status=error.status)
+    if error.retry_after is not None:
+        response["Retry-After"] = str(error.retry_after)
+    return response
+
+
+async def iterate_in_thread(iterable):
+    """
+    Asynchronous iterator over a blocking one, advanced in a compute thread.
+    """
+    iterator = iter(iterable)
+    done = object()
+    while (item := await run_in_thread(next, iterator, done)) is not done:
+        yield item
+
+
+class _ReleasingChunks(object):
+    """
+    Response chunks whose close(), which Django calls once the response is done, calls release.
+    """
+
+    def __init__(self, chunks, release):
+        self.chunks = chunks
+        self.release = release
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def close(self):
+        release, self.release = self.release, None
+        if release is not None:
+            release()
+
+
+class _AsyncReleasingChunks(_ReleasingChunks):
+    def __aiter__(self):
+        return aiter(self.chunks)
+
+
+def streaming_response(request, chunks, release=None, **kwargs) -> StreamingHttpResponse:
+    """
+    StreamingHttpResponse sending every chunk as soon as it is ready. Under ASGI, where a
+    synchronous iterator would first be consumed completely, the chunks are produced in a
+    compute thread; under WSGI the server iterates them itself.
+
+    :param request: HttpRequest, the request being answered
+    :param chunks: iterable, the blocking iterator of response chunks
+    :param release: callable, called once the response is done, e.g. to free the admission of
+                    the operation that produces the chunks (see scheduler.admission)
+    """
+    if isinstance(request, ASGIRequest):
+        chunks = iterate_in_thread(chunks)
+        if release is not None:
+            chunks = _AsyncReleasingChunks(chunks, release)
+    elif release is not None:
+        chunks = _ReleasingChunks(chunks, release)
+    return StreamingHttpResponse(chunks, **kwargs)
@@ -1,38 +1,45 @@
+from asgiref.sync import sync_to_async
 from rest_framework import status
-from rest_framework.response import Response
-from django.shortcuts import get_object_or_404
+from django.shortcuts import get_object_or_404, aget_object_or_404
 
 from backend.api.serializers import DatasetSerializer
 from django.http import JsonResponse
-from backend.api.models import Dataset
+from backend.api.models import Dataset, AuditLog
+from backend.server_handler.expressions import parse_expression
+from backend.server_handler.lazy import normalize_plan, plan_features
+from backend.server_handler.executor import run_in_thread
+from backend.server_handler.query import load_query, execute_query
+import numpy as np
 from rest_framework.views import APIView
+from backend.api.views.async_view import AsyncAPIView, json_response
 import json
 
-class DatasetDetailView(APIView):
+class DatasetDetailView(AsyncAPIView):
     """
     Get full dataset (data + column names)
     """
 
-    def get(self, request, dataset_id):
+    async def get(self, request, dataset_id):
         try:
-            dataset = Dataset.objects.get(id=dataset_id)
-            serializer = DatasetSerializer(dataset)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            dataset = await Dataset.objects.aget(id=dataset_id)
+            # Serialising may compute the records of a lazy dataset, which queries its parents
+            data = await sync_to_async(lambda: DatasetSerializer(dataset).data)()
+            return await json_response(data, status=status.HTTP_200_OK)
         except Dataset.DoesNotExist:
-            return Response({"error": "Dataset not found"}, status=status.HTTP_404_NOT_FOUND)
+            return JsonResponse({"error": "Dataset not found"}, status=status.HTTP_404_NOT_FOUND)
         
 
-class DatasetColumnsView(APIView):
+class DatasetColumnsView(AsyncAPIView):
     """
     Get only the column names of the dataset
     """
 
-    def get(self, request, dataset_id):
+    async def get(self, request, dataset_id):
         try:
-            dataset = Dataset.objects.get(id=dataset_id)
-            return Response({"columns": dataset.features}, status=status.HTTP_200_OK)
+            dataset = await Dataset.objects.only("features").aget(id=dataset_id)
+            return JsonResponse({"columns": dataset.features}, status=status.HTTP_200_OK)
         except Dataset.DoesNotExist:
-            return Response({"error": "Dataset not found"}, status=status.HTTP_404_NOT_FOUND)
+            return JsonResponse({"error": "Dataset not found"}, status=status.HTTP_404_NOT_FOUND)
         
 
 class ChangeDataView(APIView):
@@ -56,9 +63,10 @@ class ChangeDataView(APIView):
         if "features" in modifications:
             new_dataset.features = modifications["features"]
 
-        # Modify records
+        # Modify records (they already hold any separately stored columns, which are dropped)
         if "records" in modifications:
             new_dataset.records = modifications["records"]
+            new_dataset.extra_columns.all().delete()
 
         new_dataset.save()
 
@@ -87,6 +95,21 @@ class DeleteFeatureView(APIView):
         # Copy the dataset to maintain modification history
         #new_dataset = original_dataset.copy_dataset(new_name=f"{original_dataset.name}_modified")
 
+        if original_dataset.is_lazy:
+            # A lazy dataset only records the deletion in its plan, once it is known to apply
+            try:
+                step = normalize_plan([{"op": "drop", "columns": features_to_remove}])
+                features = plan_features(original_dataset.features, step)
+            except ValueError as e:
+                return JsonResponse({"error": str(e)}, status=400)
+            original_dataset.plan = original_dataset.plan + step
+            original_dataset.features = features
+            original_dataset.save(update_fields=["plan", "features"])
+            return JsonResponse({
+                "message": "Feature(s) removed successfully",
+                "dataset_id": original_dataset.id
+            })
+
         # Keep only the features that are not being removed
         original_dataset.features = [f for f in original_dataset.features if f not in features_to_remove]
 
@@ -96,6 +119,8 @@ class DeleteFeatureView(APIView):
             for record in original_dataset.records
         ]
 
+        original_dataset.extra_columns.filter(name__in=features_to_remove).delete()
+
          # Save the modified dataset
         original_dataset.save()
 
@@ -127,4 +152,105 @@ class CreateDatasetView(APIView):
             return JsonResponse({"new_dataset_id": new_dataset.id,"name":new_dataset.name})
 
         except Exception as e:
-            return JsonResponse({"error": str(e)}, status=400)
\ No newline at end of file
+            return JsonResponse({"error": str(e)}, status=400)
+
+class AddFeatureView(APIView):
+    def post(self, request):
+        """
+        Add a column computed from an expression over existing columns, e.g. "log(a) + b*2".
+
+        The expression is evaluated on whole columns and only the columns it reads are
+        loaded. The result is stored next to the records, which are not rewritten.
+        """
+        try:
+            body = json.loads(request.body)
+            dataset_id = body.get("dataset_id")
+            name = body.get("name")
+            expression = body.get("expression")
+
+            if not dataset_id or not name or not expression:
+                return JsonResponse({"error": "Missing dataset_id, name or expression"}, status=400)
+
+            dataset = get_object_or_404(Dataset, id=dataset_id)
+            if name in dataset.features:
+                return JsonResponse({"error": f"Feature '{name}' already exists"}, status=400)
+
+            compiled = parse_expression(expression)
+            missing = sorted(compiled.columns - set(dataset.features))
+            if missing:
+                return JsonResponse({"error": f"Columns {missing} not found in dataset"}, status=400)
+
+            values = None
+            if not dataset.is_lazy:
+                columns = dataset.get_dataframe(columns=sorted(compiled.columns))
+                values = np.broadcast_to(compiled.evaluate(columns), (len(dataset.records),))
+            dataset.add_column(name, expression, values)
+
+            AuditLog.objects.create(tool_type="ADD_FEATURE", params={"name": name, "expression": expression}, dataset=dataset)
+
+            return JsonResponse({
+                "message": "Feature added successfully",
+                "dataset_id": dataset.id,
+                "features": dataset.features
+            })
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+
+class TransformDatasetView(APIView):
+    def post(self, request):
+        """
+        Create a dataset defined by select, filter, derive and drop operations on another one.
+
+        The new dataset only stores its plan; the records are computed when a graph,
+        download or processing endpoint asks for them.
+        """
+        try:
+            body = json.loads(request.body)
+            dataset_id = body.get("dataset_id")
+            operations = body.get("operations", [])  # e.g. [{"op": "filter", "expression": "x > 0"}]
+            name = body.get("new_dataset_name", "Transformed Dataset")
+            materialize = body.get("materialize", False)  # Store the records right away instead
+
+            if not dataset_id:
+                return JsonResponse({"error": "Dataset ID is required"}, status=400)
+
+            dataset = get_object_or_404(Dataset, id=dataset_id)
+            new_dataset = dataset.create_lazy_child(name, operations)
+            if materialize:
+                new_dataset.records = new_dataset.get_records()
+                new_dataset.plan = None
+                new_dataset.save()
+
+            return JsonResponse({
+                "new_dataset_id": new_dataset.id,
+                "name": new_dataset.name,
+                "features": new_dataset.features,
+                "lazy": new_dataset.is_lazy
+            })
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+
+class QueryDatasetView(AsyncAPIView):
+    async def post(self, request):
+        """
+        Filter, sort, group and page a dataset on the server instead of downloading it, e.g.
+        {"dataset_id": 1, "where": [{"column": "x", "op": ">", "value": 0}], "sort": [{"column": "y", "descending": true}], "limit": 10}
+
+        See run_query for the query format.
+        """
+        try:
+            body = json.loads(request.body)
+            dataset_id = body.get("dataset_id")
+
+            if not dataset_id:
+                return JsonResponse({"error": "Dataset ID is required"}, status=400)
+
+            dataset = await aget_object_or_404(Dataset.without_records(), id=dataset_id)
+            # Loading the columns may query the database, so only that runs in the database thread
+            loaded = await sync_to_async(lambda: load_query(dataset.get_dataframe, dataset.features, body, dataset.cache_key))()
+            result = await run_in_thread(execute_query, *loaded)
+            return await json_response(result)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
@@ -16,7 +16,7 @@ class DownloadView(APIView):
 
         # Ensure that `features` and `records` exist.
         features = dataset.features if hasattr(dataset, "features") else []
-        records = dataset.records if hasattr(dataset, "records") else []
+        records = dataset.get_records() if hasattr(dataset, "records") else []  # Computed here for a lazy dataset
 
         df = pd.DataFrame(records, columns=features)
 
@@ -1,15 +1,94 @@
-from django.shortcuts import get_object_or_404
+import contextlib
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404
 from backend.server_handler.engine import Engine
+from backend.server_handler.cache import LRUCache
+from backend.server_handler.executor import arun_engine, run_in_thread, EngineTimeoutError
+from backend.server_handler.single_flight import single_flight, flight_key
+from backend.server_handler.scheduler import admitted, admission, get_scheduler, AdmissionError
+from backend.server_handler.cancellation import cancel_operation
+from backend.server_handler.timing import span
+from backend.server_handler.pipeline import run_pipeline, normalize_pipeline, estimate_pipeline_cost
+from backend.server_handler.outliers import encode_mask, MASK_ENCODING
+from backend.server_handler.clustering import encode_labels, LABEL_ENCODING
+from backend.server_handler.uncertainty import bootstrap_sample_count
 from django.http import JsonResponse
 from backend.api.models import UploadedFile, Dataset
-from rest_framework.views import APIView
+from backend.api.views.async_view import AsyncAPIView, dataset_frame, dataset_cache_key, json_response, \
+    streaming_response, admission_response
 import json
+import numpy as np
 import pandas as pd
 
-class FitCurveView(APIView):
-    def post(self, request):
+PREVIEW_ROWS = 20  # Number of records returned with a dataset stored on the server
+REDUCTION_CACHE_SIZE = 8  # Embeddings kept so that saving a preview does not recompute it
+
+EMPTY_DATASET = "Dataset is empty or invalid."
+
+_reduction_cache = LRUCache(REDUCTION_CACHE_SIZE)
+
+
+async def reduced_embedding(dataset, cache_key, method, n_components):
+    """
+    Embedding of a dataset, computed once per dataset version, method and dimension.
+    Concurrent identical requests, e.g. from a double click, share one computation.
+    """
+    key = (cache_key, method, n_components)
+    embedding = _reduction_cache.get(key)
+    if embedding is None:
+        async def compute():
+            dataset_df, _ = await dataset_frame(dataset)
+            if dataset_df.empty:
+                raise ValueError(EMPTY_DATASET)
+            async with admitted("dimensional_reduction", dataset_df, method=method, n_components=n_components):
+                return await arun_engine("dimensional_reduction", dataset_df, method=method, n_components=n_components)
+
+        embedding = await single_flight(
+            flight_key(cache_key, "dimensional_reduction", method=method, n_components=n_components), compute
+        )
+        _reduction_cache.set(key, embedding)
+    return embedding
+
+
+def feature_frame(dataset, *features):
+    """
+    Only the given features of a dataset, so that columns a computation does not use are never
+    loaded. Unknown names are left out for the Engine to report.
+    """
+    return dataset.get_dataframe(columns=[feature for feature in dict.fromkeys(features) if feature in dataset.features])
+
+
+def materialize(dataset, name, dataframe) -> dict:
+    """
+    Store a processing result as a child of dataset and describe it by its id and a preview.
+    """
+    new_dataset = dataset.create_child(name, dataframe)
+    return {
+        "new_dataset_id": new_dataset.id,
+        "name": new_dataset.name,
+        "features": new_dataset.features,
+        "num_records": len(dataframe),
+        "preview": new_dataset.records[:PREVIEW_ROWS]
+    }
+
+
+def materialized_response(dataset, name, dataframe, **extra):
+    """
+    Store a processing result as a child of dataset and return only its id and a preview.
+
+    :param dataset: Dataset, the dataset the result was computed from
+    :param name: str, name of the new dataset
+    :param dataframe: pandas.DataFrame, the result to store
+    :param extra: additional JSON-serialisable fields of the response
+    """
+    return JsonResponse({**materialize(dataset, name, dataframe), **extra})
+
+
+class FitCurveView(AsyncAPIView):
+    async def post(self, request):
         try:
-            body = json.loads(request.body)
+            with span("parse"):
+                body = json.loads(request.body)
             #dataset_id = body.get("dataset_id")
             params = body.get("params", {})
             x_feature = params.get("xColumn")
@@ -17,6 +96,11 @@ class FitCurveView(APIView):
             method = params.get("type", "linear")
             degree = params.get("degree", 2)
             initial_params = params.get("initial_params", None)
+            bands = params.get("bands", False)  # Whether to return confidence and prediction bands
+            confidence_level = params.get("confidence_level", 0.95)
+            # Residual bootstrap refits (0 disables them), capped since each one is a full fit
+            bootstrap_samples = bootstrap_sample_count(params.get("bootstrap_samples", 0))
+            materialize_as = body.get("materialize_as")  # Store the fitted curve as a new dataset with this name
             dataset_id = params.get("datasetId")
             print(dataset_id)
             # Ensure dataset_id is provided
@@ -27,67 +111,177 @@ class FitCurveView(APIView):
             #if not dataset_id:
                 #dataset = Dataset.objects.order_by("-id").first()
             #else:
-            dataset = get_object_or_404(Dataset, id=dataset_id)
-            # Convert dataset to Pandas DataFrame
-            dataset_df = dataset.get_dataframe()
+            with span("db"):  # The records are left to the column store
+                dataset = await aget_object_or_404(Dataset.without_records(), id=dataset_id)
+            # Load only the two columns the fit reads
+            dataset_df, _ = await dataset_frame(dataset, lambda d: feature_frame(d, x_feature, y_feature))
             # Ensure required features exist in the dataset
             if x_feature not in dataset_df.columns or y_feature not in dataset_df.columns:
                 return JsonResponse({"error": "Specified features not found in dataset"}, status=400)
             # Perform curve fitting using Engine
-            params, covariance, fitted_data = Engine.fit_curve(
-                dataset_df,
-                x_feature,
-                y_feature,
-                method=method,
-                degree=degree,
-                initial_params=initial_params
-            )
-            # Create original data array with x_feature and y_feature values
-            original_data = dataset_df[[x_feature, y_feature]].rename(columns={x_feature: 'x', y_feature: 'y'}).to_dict(
-                orient='records')
-            return JsonResponse({
-                "params": params.tolist(),
-                "covariance": covariance.tolist() if covariance is not None else None,
-                "generated_data": fitted_data.to_dict(orient='records'),
-                "original_data": original_data
+            async with admitted("fit_curve", dataset_df, repeats=1 + bootstrap_samples):
+                params, covariance, fitted_data, fit_info = await arun_engine(
+                    "fit_curve",
+                    dataset_df,
+                    x_feature,
+                    y_feature,
+                    method=method,
+                    degree=degree,
+                    initial_params=initial_params,
+                    full_output=True,
+                    bands=bands,
+                    confidence_level=confidence_level,
+                    bootstrap_samples=bootstrap_samples
+                )
+            fit_bands = fit_info.pop("bands", None)
+            if materialize_as:
+                return await sync_to_async(materialized_response)(
+                    dataset, materialize_as, fitted_data,
+                    params=params.tolist(),
+                    covariance=covariance.tolist() if covariance is not None else None,
+                    fit_info=fit_info
+                )
+            with span("serialize"):
+                # Create original data array with x_feature and y_feature values
+                original_data = dataset_df[[x_feature, y_feature]].rename(columns={x_feature: 'x', y_feature: 'y'}).to_dict(
+                    orient='records')
+                result = {
+                    "params": params.tolist(),
+                    "covariance": covariance.tolist() if covariance is not None else None,
+                    "generated_data": fitted_data.to_dict(orient='records'),
+                    "original_data": original_data,
+                    "fit_info": fit_info,
+                    # Bounds of curves that overflow are infinite, which JSON cannot represent
+                    "bands": fit_bands.replace([np.inf, -np.inf, np.nan], None).to_dict(orient='records') if fit_bands is not None else None
+                }
+            return await json_response(result)
+        except AdmissionError as e:
+            return admission_response(e)
+        except EngineTimeoutError as e:
+            return JsonResponse({"error": str(e)}, status=504)
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+
+class BatchFitCurveView(AsyncAPIView):
+    async def post(self, request):
+        try:
+            body = json.loads(request.body)
+            params = body.get("params", {})
+            x_feature = params.get("xColumn")
+            y_features = params.get("yColumns", [])
+            method = params.get("type", "linear")
+            degree = params.get("degree", 2)
+            initial_params = params.get("initial_params", None)
+            dataset_id = params.get("datasetId")
+
+            # Ensure dataset_id and the y columns are provided
+            if not dataset_id:
+                return JsonResponse({"error": "Dataset ID is required"}, status=400)
+            if not x_feature or not y_features:
+                return JsonResponse({"error": "xColumn and a non-empty yColumns list are required"}, status=400)
+
+            dataset = await aget_object_or_404(Dataset.without_records(), id=dataset_id)
+            dataset_df, _ = await dataset_frame(dataset, lambda d: feature_frame(d, x_feature, *y_features))
+            if x_feature not in dataset_df.columns or not all(y in dataset_df.columns for y in y_features):
+                return JsonResponse({"error": "Specified features not found in dataset"}, status=400)
+
+            # Fit every y column in one Engine call, so the dataset is loaded once; it costs one fit per column
+            async with admitted("fit_curve", dataset_df, repeats=len(y_features)):
+                results, errors = await run_in_thread(
+                    Engine.fit_curves,
+                    dataset_df,
+                    x_feature,
+                    y_features,
+                    method=method,
+                    degree=degree,
+                    initial_params=initial_params
+                )
+            return await json_response({
+                "results": {
+                    y_feature: {
+                        "params": fit_params.tolist(),
+                        "covariance": covariance.tolist() if covariance is not None else None,
+                        "generated_data": fitted_data.to_dict(orient='records')
+                    }
+                    for y_feature, (fit_params, covariance, fitted_data) in results.items()
+                },
+                "errors": errors
             })
+        except AdmissionError as e:
+            return admission_response(e)
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=400)
 
 
-class InterpolateView(APIView):
-    def post(self, request):
+class InterpolateView(AsyncAPIView):
+    async def post(self, request):
         try:
             # Parse the request body
             body = json.loads(request.body)
             dataset_id = body.get("dataset_id")  # Get the ID of the uploaded file
             x_feature = body.get("x_feature")  # The column name for the x-axis
             y_feature = body.get("y_feature")  # The column name for the y-axis
+            y_features = body.get("y_features")  # Several y columns interpolated onto one grid (optional)
             kind = body.get("kind", "linear")  # The type of interpolation (linear, polynomial, spline, exponential)
             num_points = body.get("numPoints") or 100  # Default to 100 if null
             min_value = body.get("minValue", None)  # Minimum x value for interpolation (optional)
             max_value = body.get("maxValue", None)  # Maximum x value for interpolation (optional)
+            degree = body.get("degree", 3)  # Polynomial/spline degree, or "auto" to select it by cross-validation
             new_dataset_name = body.get("new_dataset_name", "Interpolated Dataset")
+            materialize_as = body.get("materialize_as")  # Store the result as a new dataset with this name
 
             # Ensure dataset_id is provided
             if not dataset_id:
                 return JsonResponse({"error": "Dataset ID is required"}, status=400)
 
             # Get the dataset object
-            dataset = get_object_or_404(Dataset, id=dataset_id)
+            dataset = await aget_object_or_404(Dataset.without_records(), id=dataset_id)
 
-            # Convert dataset to Pandas DataFrame
-            dataset_df = dataset.get_dataframe()
-            # Perform interpolation
-            interpolated_data = Engine.interpolate(
-                dataset_df,
-                x_feature=x_feature,
-                y_feature=y_feature,
-                kind=kind,
-                num_points=num_points,
-                min_value=min_value,
-                max_value=max_value
+            # Load only the x column and the interpolated y columns
+            dataset_df, cache_key = await dataset_frame(
+                dataset, lambda d: feature_frame(d, x_feature, *(y_features or [y_feature]))
             )
+
+            if y_features:
+                # Interpolate every column at once and store the result on the server,
+                # so the records never travel to the browser and back
+                async with admitted("interpolate", dataset_df):
+                    interpolated_data = await run_in_thread(
+                        Engine.interpolate_many,
+                        dataset_df,
+                        x_feature=x_feature,
+                        y_features=y_features,
+                        kind=kind,
+                        num_points=num_points,
+                        min_value=min_value,
+                        max_value=max_value,
+                        degree=degree,
+                        cache_key=cache_key
+                    )
+                return await sync_to_async(materialized_response)(
+                    dataset, materialize_as or new_dataset_name, interpolated_data
+                )
+
+            # Perform interpolation
+            async with admitted("interpolate", dataset_df):
+                interpolated_data = await run_in_thread(
+                    Engine.interpolate,
+                    dataset_df,
+                    x_feature=x_feature,
+                    y_feature=y_feature,
+                    kind=kind,
+                    num_points=num_points,
+                    min_value=min_value,
+                    max_value=max_value,
+                    degree=degree,
+                    cache_key=cache_key
+                )
+            if materialize_as:
+                return await sync_to_async(materialized_response)(
+                    dataset, materialize_as, interpolated_data,
+                    degree_selection=interpolated_data.attrs.get("degree_selection")
+                )
             """
             # Generate new features and records
             reduced_features = [x_feature, y_feature]
@@ -102,16 +296,19 @@ class InterpolateView(APIView):
             )
             """
             # Return the interpolated data in JSON format
-            return JsonResponse({"interpolated_data": interpolated_data.to_dict(orient='records')
+            return await json_response({"interpolated_data": interpolated_data.to_dict(orient='records'),
+                "degree_selection": interpolated_data.attrs.get("degree_selection")
             #, "new_dataset_id": new_dataset.id
             })
 
+        except AdmissionError as e:
+            return admission_response(e)
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=400)
 
 
-class ExtrapolateView(APIView):
-    def post(self, request):
+class ExtrapolateView(AsyncAPIView):
+    async def post(self, request):
         try:
             # Parse the JSON data sent from the frontend
             request_data = json.loads(request.body)
@@ -122,64 +319,83 @@ class ExtrapolateView(APIView):
             method = request_data.get('kind')
             extrapolate_range = request_data.get('params', {}).get('extrapolateRange', [])
             new_dataset_name = request_data.get("new_dataset_name", "Extrapolated Dataset")
+            materialize_as = request_data.get("materialize_as")  # Store the result as a new dataset with this name
 
             # Ensure that the request data is valid
             if not dataset_id or not x_feature or not y_feature or not method or not extrapolate_range:
                 return JsonResponse({"error": "Missing required parameters"}, status=400)
 
             # Retrieve the dataset
-            dataset = Dataset.objects.get(id=dataset_id)
-            # Convert dataset to Pandas DataFrame
-            dataset_df = dataset.get_dataframe()
-            print(1)
+            dataset = await Dataset.without_records().aget(id=dataset_id)
+            # Load only the x and y columns
+            dataset_df, cache_key = await dataset_frame(dataset, lambda d: feature_frame(d, x_feature, y_feature))
 
             # Call the extrapolate function to perform extrapolation
-            extrapolated_data = Engine.extrapolate(
-                data=dataset_df,
-                x_feature=x_feature,
-                y_feature=y_feature,
-                target_x=extrapolate_range,
-                method=method
-            )
+            async with admitted("extrapolate", dataset_df):
+                extrapolated_data = await run_in_thread(
+                    Engine.extrapolate,
+                    data=dataset_df,
+                    x_feature=x_feature,
+                    y_feature=y_feature,
+                    target_x=extrapolate_range,
+                    method=method,
+                    cache_key=cache_key
+                )
+
+            if materialize_as:
+                return await sync_to_async(materialized_response)(dataset, materialize_as, extrapolated_data)
 
             # Convert the DataFrame to a dictionary and return it to the frontend
             result = extrapolated_data.to_dict(orient='records')
 
-            return JsonResponse({"original_data": dataset_df.to_dict(orient='records'),
+            return await json_response({"original_data": dataset_df.to_dict(orient='records'),
                 "extrapolated_data": result,
                 #"new_dataset_id": new_dataset.id
             })
 
+        except AdmissionError as e:
+            return admission_response(e)
         except Exception as e:
             # Catch exceptions and return an error message
             return JsonResponse({"error": str(e)}, status=500)
 
 
-class CorrelationView(APIView):
-    def post(self, request):
+class CorrelationView(AsyncAPIView):
+    async def post(self, request):
         try:
             # Parsing Request JSON
             body = json.loads(request.body)
             dataset_id = body.get("dataset_id")
             selected_features = body.get("features", [])
             method = body.get("method", "pearson")
+            materialize_as = body.get("materialize_as")  # Store the matrix as a new dataset with this name
 
             # Ensure that `dataset_id` exists
             if not dataset_id:
                 return JsonResponse({"error": "Dataset ID is required"}, status=400)
 
             # Getting the dataset object
-            dataset = get_object_or_404(Dataset, id=dataset_id)  # 用 `id` 代替 `dataset_id`
+            dataset = await aget_object_or_404(Dataset.without_records(), id=dataset_id)  # 用 `id` 代替 `dataset_id`
 
-            # Converting a dataset to a Pandas DataFrame
-            df = dataset.get_dataframe()
-
-            # Ensure that the selected columns are in the DataFrame
-            if not all(feature in df.columns for feature in selected_features):
+            # Ensure that the selected columns are in the dataset
+            if not all(feature in dataset.features for feature in selected_features):
                 return JsonResponse({"error": "One or more selected features are missing from the dataset"}, status=400)
 
-            # Calculate the correlation matrix
-            correlation_matrix = df[selected_features].corr(method=method)
+            async def compute():
+                # Converting the selected features to a Pandas DataFrame
+                df, _ = await dataset_frame(dataset, lambda d: feature_frame(d, *selected_features))
+                async with admitted("correlation", df):
+                    return await run_in_thread(df[selected_features].corr, method=method)
+
+            # Calculate the correlation matrix, once for concurrent identical requests
+            cache_key = await dataset_cache_key(dataset)
+            correlation_matrix = await single_flight(
+                flight_key(cache_key, "correlation", features=selected_features, method=method), compute
+            )
+            if materialize_as:
+                return await sync_to_async(materialized_response)(
+                    dataset, materialize_as, correlation_matrix.rename_axis("feature").reset_index()
+                )
 
             # Convert correlation matrix to JSON format
             result = {
@@ -189,12 +405,14 @@ class CorrelationView(APIView):
 
             return JsonResponse({"correlation_matrix": result})
 
+        except AdmissionError as e:
+            return admission_response(e)
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=500)
 
 
-class DimensionalReductionView(APIView):
-    def post(self, request):
+class DimensionalReductionView(AsyncAPIView):
+    async def post(self, request):
         try:
             # Parsing the request body
             body = json.loads(request.body)
@@ -202,68 +420,78 @@ class DimensionalReductionView(APIView):
             method = body.get("method", "pca").lower()
             n_components = body.get("n_components", 2)
             new_dataset_name = body.get("new_dataset_name", "Reduced Dataset")
+            materialize_as = body.get("materialize_as")  # Store the embedding as a new dataset with this name
 
             # Ensure dataset_id exists
             if not dataset_id:
                 return JsonResponse({"error": "Missing dataset_id."}, status=400)
 
             try:
-                dataset = Dataset.objects.get(id=int(dataset_id))
+                dataset = await Dataset.without_records().aget(id=int(dataset_id))
             except (Dataset.DoesNotExist, ValueError):
                 return JsonResponse({"error": f"Dataset with ID {dataset_id} not found or invalid."}, status=404)
 
-            # Get DataFrame
-            if not dataset.features or not dataset.records:
-                return JsonResponse({"error": "Dataset is empty or invalid."}, status=400)
+            # The records are only loaded if the column store has no copy (an empty frame is reported then)
+            if not dataset.features:
+                return JsonResponse({"error": EMPTY_DATASET}, status=400)
 
-            dataset_df = pd.DataFrame(dataset.records, columns=dataset.features)
+            cache_key = await dataset_cache_key(dataset)
+
+            # do dim reduction, reusing the embedding of an earlier preview so that
+            # saving it stores exactly what was shown, without recomputing it (another
+            # server process recomputes the same embedding, since t-SNE and UMAP are seeded)
+            reduced_data = await reduced_embedding(dataset, cache_key, method, n_components)
+            if materialize_as:
+                return await sync_to_async(materialized_response)(dataset, materialize_as, reduced_data)
 
-            # do dim reduction
-            reduced_data = Engine.dimensional_reduction(
-                dataset_df,
-                method=method,
-                n_components=n_components
-            )
-            
             # Generate new features and records
             reduced_features = [f"dim{i+1}" for i in range(n_components)]
             reduced_records = reduced_data.to_dict(orient="records")
             
-            return JsonResponse({
+            return await json_response({
                 "message": "Dimensionality reduction successful.",
                 #"new_dataset_id": new_dataset.id,
                 "reduced_features": reduced_features,
                 "reduced_records": reduced_records
             }, status=200)
 
+        except AdmissionError as e:
+            return admission_response(e)
         except json.JSONDecodeError:
             return JsonResponse({"error": "Invalid JSON format."}, status=400)
 
+        except EngineTimeoutError as e:
+            return JsonResponse({"error": str(e)}, status=504)
+
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=500)
 
 
-class RecommendDimReductionView(APIView):
-    def get(self, request):
+class RecommendDimReductionView(AsyncAPIView):
+    async def get(self, request):
         try:
             dataset_id = request.GET.get("dataset_id")
             if not dataset_id:
                 return JsonResponse({"error": "Dataset ID is required"}, status=400)
 
-            dataset = get_object_or_404(Dataset, id=dataset_id)
-            dataset_df = dataset.get_dataframe()
+            dataset = await aget_object_or_404(Dataset.without_records(), id=dataset_id)
+            dataset_df, _ = await dataset_frame(dataset)
 
-            recommendations, parameters = Engine.recommend_dim_reduction(dataset_df)
+            recommendations, parameters, profile = await run_in_thread(Engine.recommend_dim_reduction, dataset_df)
 
             return JsonResponse({
                 "recommendations": recommendations,
-                "parameters": parameters
+                "parameters": parameters,
+                "profile": profile
             })
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=500)
 
-class OversampleDataView(APIView):
-    def post(self, request):
+class OversampleDataView(AsyncAPIView):
+    async def post(self, request):
         try:
             # Parse the incoming JSON body
             body = json.loads(request.body)
@@ -275,40 +503,238 @@ class OversampleDataView(APIView):
             y_feature = params.get("yColumn")  # get y column from params
             method = params.get("method", "smote")  # Oversample method (default: smote)
             oversample_factor = params.get("num_samples", 1)  # Oversampling factor (default: 1)
+            features = params.get("features") or [x_feature]  # Feature columns SMOTE interpolates in
+            approximate = params.get("approximate")  # Force (True) or disable (False) approximate neighbours
+            stream = body.get("stream", False)  # Stream the rows as NDJSON chunks instead of one response
+            materialize_as = body.get("materialize_as")  # Store the result as a new dataset with this name
 
             # Ensure dataset_id is provided
             if not dataset_id:
                 return JsonResponse({"error": "Dataset ID is required"}, status=400)
 
             # Get the dataset object
-            dataset = get_object_or_404(Dataset, id=dataset_id)
+            dataset = await aget_object_or_404(Dataset.without_records(), id=dataset_id)
 
             # Convert dataset to Pandas DataFrame
-            dataset_df = dataset.get_dataframe()
-
-            # Perform oversampling (data interpolation)
-            try:
-                oversampled_data = Engine.oversample_data(
+            dataset_df, _ = await dataset_frame(dataset)
+
+            if stream:
+                # Checked up front: errors raised once streaming has started cannot change the status
+                if y_feature not in dataset_df.columns or not all(feature in dataset_df.columns for feature in features):
+                    return JsonResponse({"error": "Specified features not found in dataset"}, status=400)
+                # The chunks are generated while they are sent, so the admission lasts until the response is done
+                release = await admission("oversample_data", dataset_df, repeats=1 + int(oversample_factor or 0))
+                chunks = Engine.oversample_stream(
                     dataset_df,
-                    x_feature=x_feature,
                     y_feature=y_feature,
+                    features=features,
                     method=method,
-                    oversample_factor=oversample_factor
+                    oversample_factor=oversample_factor,
+                    approximate=approximate
                 )
+                return streaming_response(
+                    request,
+                    (chunk.to_json(orient="records", lines=True) for chunk in chunks),
+                    release=release,
+                    content_type="application/x-ndjson"
+                )
+
+            # Perform oversampling (data interpolation)
+            try:
+                async with admitted("oversample_data", dataset_df, repeats=1 + int(oversample_factor or 0)):
+                    oversampled_data = await arun_engine(
+                        "oversample_data",
+                        dataset_df,
+                        x_feature=x_feature,
+                        y_feature=y_feature,
+                        method=method,
+                        oversample_factor=oversample_factor,
+                        features=features,
+                        approximate=approximate
+                    )
+            except AdmissionError as e:
+                return admission_response(e)
+            except EngineTimeoutError as e:
+                return JsonResponse({"error": str(e)}, status=504)
             except Exception as e:
                 # Handle any errors raised during oversampling
                 return JsonResponse({"error": f"{str(e)}. Try to use other method or check your dataset."}, status=500)
 
+            if materialize_as:
+                return await sync_to_async(materialized_response)(dataset, materialize_as, oversampled_data)
+
             # Convert the oversampled data to a dictionary for easy JSON response
             oversampled_features = list(oversampled_data.columns)
             oversampled_records = oversampled_data.to_dict(orient="records")
 
             # Return the oversampled data as a JSON response
-            return JsonResponse({
+            return await json_response({
                 "message": "Oversampling successful.",
                 "oversampled_features": oversampled_features,
                 "oversampled_records": oversampled_records
             }, status=200)
+        except AdmissionError as e:
+            return admission_response(e)
         except Exception as e:
             # If any error occurs, return an error response with the exception message
             return JsonResponse({"error": f"{str(e)} Try to use other method or check your dataset."}, status=400)
+
+
+class OutlierDetectionView(AsyncAPIView):
+    async def post(self, request):
+        try:
+            body = json.loads(request.body)
+            dataset_id = body.get("dataset_id")
+            method = body.get("method", "zscore")  # zscore, mad, iqr, isolation_forest or lof
+            features = body.get("features")  # Columns to examine (default: all numeric columns)
+            threshold = body.get("threshold")  # Cut-off of zscore/mad/iqr (default per method)
+            contamination = body.get("contamination", "auto")  # Expected share of outliers for the models
+
+            if not dataset_id:
+                return JsonResponse({"error": "Dataset ID is required"}, status=400)
+
+            dataset = await aget_object_or_404(Dataset.without_records(), id=dataset_id)
+            dataset_df, cache_key = await dataset_frame(dataset, lambda d: d.get_dataframe(columns=features))
+
+            # The flags are cached per dataset version, so repeated requests are instant
+            async with admitted("detect_outliers", dataset_df):
+                mask = await run_in_thread(
+                    Engine.detect_outliers,
+                    dataset_df,
+                    method=method,
+                    threshold=threshold,
+                    contamination=contamination,
+                    cache_key=cache_key
+                )
+            return JsonResponse({
+                "method": method,
+                "num_records": int(mask.size),
+                "num_outliers": int(mask.sum()),
+                "encoding": MASK_ENCODING,  # One bit per record, most significant bit first
+                "mask": encode_mask(mask)
+            })
+        except AdmissionError as e:
+            return admission_response(e)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=500)
+
+
+class ClusterView(AsyncAPIView):
+    async def post(self, request):
+        try:
+            body = json.loads(request.body)
+            dataset_id = body.get("dataset_id")
+            method = body.get("method", "kmeans")  # kmeans, dbscan or hdbscan
+            features = body.get("features")  # Raw feature columns (default: all numeric columns)
+            embedding = body.get("embedding")  # e.g. {"method": "umap", "n_components": 2} to cluster an embedding
+            n_clusters = body.get("n_clusters", 8)
+            eps = body.get("eps", 0.5)
+            min_samples = body.get("min_samples", 5)
+
+            if not dataset_id:
+                return JsonResponse({"error": "Dataset ID is required"}, status=400)
+
+            dataset = await aget_object_or_404(Dataset.without_records(), id=dataset_id)
+            if embedding:
+                # Reuses the embedding computed for a dimensionality reduction preview
+                data = await reduced_embedding(dataset, await dataset_cache_key(dataset),
+                                               embedding.get("method", "pca").lower(), embedding.get("n_components", 2))
+            else:
+                data, _ = await dataset_frame(dataset, lambda d: d.get_dataframe(columns=features))
+
+            async with admitted("cluster", data):
+                labels = await run_in_thread(
+                    Engine.cluster,
+                    data,
+                    method=method,
+                    n_clusters=n_clusters,
+                    eps=eps,
+                    min_samples=min_samples,
+                    standardize=not embedding
+                )
+            encoded, dtype = encode_labels(labels)
+            return JsonResponse({
+                "method": method,
+                "num_records": int(labels.size),
+                "num_clusters": int(np.unique(labels[labels >= 0]).size),
+                "encoding": LABEL_ENCODING,  # Little-endian integers of the given dtype, -1 for noise
+                "dtype": dtype,
+                "labels": encoded
+            })
+        except AdmissionError as e:
+            return admission_response(e)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=500)
+
+
+class QueueStatusView(AsyncAPIView):
+    """
+    Queue depth and budget use of the scheduler admitting heavy operations in this server process
+    """
+
+    async def get(self, request):
+        return JsonResponse(get_scheduler().depth())
+
+
+class CancelOperationView(AsyncAPIView):
+    """
+    Cancel a request sent with an X-Operation-Id header, in whichever server process runs it.
+    Its Engine computations stop at their next cancellation point; with "hard", pool
+    workers still running them are killed at once.
+    """
+
+    async def post(self, request):
+        try:
+            body = json.loads(request.body)
+            operation_id = body.get("operation_id")
+            if not operation_id:
+                return JsonResponse({"error": "operation_id is required"}, status=400)
+            await sync_to_async(cancel_operation)(operation_id, hard=bool(body.get("hard", False)))
+            return JsonResponse({"operation_id": operation_id, "cancelled": True})
+        except json.JSONDecodeError:
+            return JsonResponse({"error": "Invalid JSON format"}, status=400)
+
+
+class PipelineView(AsyncAPIView):
+    async def post(self, request):
+        try:
+            body = json.loads(request.body)
+            dataset_id = body.get("dataset_id")
+            steps = body.get("steps", [])  # Ordered Engine operations, each with an id, op, optional input and params
+            outputs = body.get("outputs")  # Step ids whose results are returned (default: the last step)
+            materialize_as = body.get("materialize_as", {})  # Step id -> name of a new dataset storing that output
+
+            if not dataset_id:
+                return JsonResponse({"error": "Dataset ID is required"}, status=400)
+
+            steps, outputs = normalize_pipeline(steps, outputs)
+            dataset = await aget_object_or_404(Dataset.without_records(), id=dataset_id)
+            dataset_df, cache_key = await dataset_frame(dataset)
+
+            # Admitted as a whole, at the summed cost of its steps
+            cost = estimate_pipeline_cost(steps, *dataset_df.shape)
+            async with get_scheduler().admit("pipeline", *cost) if cost else contextlib.nullcontext():
+                results, cached = await run_in_thread(run_pipeline, dataset_df, steps, outputs, cache_key=cache_key)
+
+            response = {}
+            for step_id, result in results.items():
+                if step_id in materialize_as:
+                    response[step_id] = await sync_to_async(materialize)(dataset, materialize_as[step_id], result)
+                else:
+                    response[step_id] = {
+                        "features": list(result.columns),
+                        "records": result.replace({np.nan: None}).to_dict(orient="records")
+                    }
+            return await json_response({"outputs": response, "cached": cached})
+        except AdmissionError as e:
+            return admission_response(e)
+        except EngineTimeoutError as e:
+            return JsonResponse({"error": str(e)}, status=504)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=500)
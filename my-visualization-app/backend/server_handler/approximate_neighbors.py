@@ -0,0 +1,45 @@
+import numpy as np
+from scipy import sparse
+from sklearn.base import BaseEstimator
+
+APPROXIMATE_NN_DEGREE = 30
+DEFAULT_N_NEIGHBORS = 6
+RANDOM_STATE = 42
+
+
+class ApproximateNeighbors(BaseEstimator):
+    """
+    k-nearest-neighbour search backed by an NN-descent graph (pynndescent).
+
+    Exposes the kneighbors / kneighbors_graph interface SMOTE expects from a
+    scikit-learn neighbours object, at a near-linear build cost instead of the
+    exact search cost on large classes.
+    """
+
+    def __init__(self, n_neighbors: int = DEFAULT_N_NEIGHBORS, n_jobs: int = -1, random_state: int = RANDOM_STATE):
+        self.n_neighbors = n_neighbors
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+
+    def fit(self, X, y=None):
+        from pynndescent import NNDescent
+
+        degree = min(max(self.n_neighbors, APPROXIMATE_NN_DEGREE), len(X) - 1)
+        self.index_ = NNDescent(np.asarray(X, dtype=np.float32), n_neighbors=degree, n_jobs=self.n_jobs, random_state=self.random_state)
+        self.n_samples_fit_ = len(X)
+        return self
+
+    def kneighbors(self, X=None, n_neighbors=None, return_distance=True):
+        n_neighbors = n_neighbors or self.n_neighbors
+        if X is None:
+            indices, distances = self.index_.neighbor_graph
+            indices, distances = indices[:, 1:n_neighbors + 1], distances[:, 1:n_neighbors + 1]
+        else:
+            indices, distances = self.index_.query(np.asarray(X, dtype=np.float32), k=n_neighbors)
+        return (distances, indices) if return_distance else indices
+
+    def kneighbors_graph(self, X=None, n_neighbors=None, mode="connectivity"):
+        distances, indices = self.kneighbors(X, n_neighbors, return_distance=True)
+        n_rows, k = indices.shape
+        data = distances.ravel() if mode == "distance" else np.ones(n_rows * k)
+        return sparse.csr_matrix((data, indices.ravel(), np.arange(0, n_rows * k + 1, k)), shape=(n_rows, self.n_samples_fit_))
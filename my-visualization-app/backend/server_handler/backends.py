@@ -0,0 +1,44 @@
+import importlib
+from functools import lru_cache
+
+# Scientific backends by name, as "module:attribute". Importing umap (with its numba
+# compiled distances), scikit-learn, imblearn or scipy takes seconds, so they are
+# imported the first time a method needs them instead of when the server starts.
+BACKENDS = {
+    "pca": "sklearn.decomposition:PCA",
+    "tsne": "sklearn.manifold:TSNE",
+    "umap": "umap.umap_:UMAP",
+    "randomized_svd": "sklearn.utils.extmath:randomized_svd",
+    "linear_regression": "sklearn.linear_model:LinearRegression",
+    "smote": "imblearn.over_sampling:SMOTE",
+    "random_oversampler": "imblearn.over_sampling:RandomOverSampler",
+    "nearest_neighbors": "sklearn.neighbors:NearestNeighbors",
+    "approximate_neighbors": "backend.server_handler.approximate_neighbors:ApproximateNeighbors",
+    "isolation_forest": "sklearn.ensemble:IsolationForest",
+    "lof": "sklearn.neighbors:LocalOutlierFactor",
+    "kmeans": "sklearn.cluster:MiniBatchKMeans",
+    "dbscan": "sklearn.cluster:DBSCAN",
+    "hdbscan": "sklearn.cluster:HDBSCAN",
+    "curve_fit": "scipy.optimize:curve_fit",
+    "least_squares": "scipy.optimize:least_squares",
+    "interp1d": "scipy.interpolate:interp1d",
+    "make_interp_spline": "scipy.interpolate:make_interp_spline",
+    "univariate_spline": "scipy.interpolate:UnivariateSpline",
+    "solve_triangular": "scipy.linalg:solve_triangular",
+    "t_distribution": "scipy.stats:t",
+}
+
+UNKNOWN_BACKEND = "Unknown backend: {}"
+
+
+@lru_cache(maxsize=None)
+def load_backend(name: str):
+    """
+    Import and return the class or function registered under name.
+
+    :param name: str, key of BACKENDS
+    """
+    if name not in BACKENDS:
+        raise ValueError(UNKNOWN_BACKEND.format(name))
+    module_name, attribute = BACKENDS[name].split(":")
+    return getattr(importlib.import_module(module_name), attribute)
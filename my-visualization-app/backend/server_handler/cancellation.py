@@ -0,0 +1,300 @@
+import contextlib
+import contextvars
+import hashlib
+import os
+import signal
+import threading
+import time
+import uuid
+
+from backend.server_handler.column_store import make_private_directory
+
+CHECK_INTERVAL = 0.05  # Seconds between looks at a flag file; in-process flags are checked every time
+DEFAULT_KILL_AFTER = None  # Seconds an interrupted pool task may take to stop before its worker is killed (None: never)
+FLAG_TTL = 3600  # Seconds after which flags nobody cleared, e.g. of a finished operation, are removed
+MAX_OPERATIONS = 1024  # Cancelled operation ids kept when there is no shared directory
+INTERRUPT_SIGNAL = signal.SIGUSR1
+CANCELLED_SUFFIX = ".cancelled"
+PID_SUFFIX = ".pid"
+OPERATION_PREFIX = "operation-"
+HARD = "hard"
+
+_config = {"directory": None, "kill_after": DEFAULT_KILL_AFTER}
+_operations = {}  # Cancelled operation id -> (hard, time) when there is no directory shared with other processes
+_current = contextvars.ContextVar("cancellation_token", default=None)
+_scope = contextvars.ContextVar("cancellation_scope", default=None)
+_running = {"token": None}  # The token of the task this pool worker runs
+
+
+class OperationCancelled(BaseException):
+    """
+    Raised inside a computation whose result is no longer wanted. Like asyncio.CancelledError
+    it is not an Exception, so that the Engine's error handling does not turn it into a ValueError.
+    """
+
+
+class OperationInterrupted(OperationCancelled):
+    """
+    Raised by INTERRUPT_SIGNAL in a pool task, at any point of its code. The worker may have
+    been stopped while holding a lock, e.g. of a cache, so it must not run further tasks
+    (see worker_pool.retire_process_pool).
+    """
+
+
+def configure_cancellation(directory: str = None, kill_after: float = DEFAULT_KILL_AFTER):
+    """
+    :param directory: str, private directory of the flag files through which any server process
+                      cancels an operation and pool workers notice it (None: within this process only)
+    :param kill_after: float, seconds an interrupted pool task may take to stop before its worker is
+                       killed, which also fails the tasks of other requests (None: only when a cancel
+                       asks for it, see cancel_operation)
+    """
+    if directory is not None:
+        make_private_directory(directory)
+    _config.update(directory=directory, kill_after=kill_after)
+
+
+class CancellationToken(object):
+    """
+    Tells a running computation that its result is no longer wanted.
+
+    The computation calls check() between iterations or batches, which raises
+    OperationCancelled once cancel() was called. A shared token can be sent to a
+    pool worker: its flag is then a file in the cancellation directory, and the
+    worker records its pid beside it, so that cancel() can also interrupt code
+    that never checks (INTERRUPT_SIGNAL) and, after kill_after seconds, kill the
+    worker.
+    """
+
+    def __init__(self, shared: bool = False):
+        directory = _config["directory"]
+        self.path = os.path.join(directory, uuid.uuid4().hex) if shared and directory is not None else None
+        self._event = threading.Event()
+        self._lock = threading.Lock()  # Orders cancel() and close(), e.g. of a task finishing meanwhile
+        self._closed = False
+        self._checked = 0.0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_event"], state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        if not self._event.is_set() and self.path is not None and os.path.exists(self.path + CANCELLED_SUFFIX):
+            self._event.set()
+        return self._event.is_set()
+
+    def check(self):
+        """
+        :raises OperationCancelled: if the token was cancelled
+        """
+        if self.path is not None and not self._event.is_set():
+            now = time.monotonic()
+            if now - self._checked < CHECK_INTERVAL:
+                return
+            self._checked = now
+        if self.cancelled:
+            raise OperationCancelled()
+
+    def cancel(self, kill_after: float = None):
+        """
+        :param kill_after: float, seconds after which the pool worker still running the task is killed,
+                           which also fails the tasks other workers run (None: never; see kill_delay)
+        """
+        self._event.set()
+        if self.path is None:
+            return
+        with self._lock:
+            if self._closed:
+                return  # The task is done, e.g. it was cancelled while queued
+            with open(self.path + CANCELLED_SUFFIX, "w"):
+                pass
+        pid = self._worker()
+        if pid is None:
+            return  # Not started yet; it stops on starting
+        with contextlib.suppress(ProcessLookupError):
+            os.kill(pid, INTERRUPT_SIGNAL)
+        if kill_after is not None:
+            timer = threading.Timer(kill_after, self._kill, args=(pid,))
+            timer.daemon = True
+            timer.start()
+
+    @contextlib.contextmanager
+    def active(self):
+        """
+        Context in which check() (the module function) checks this token, e.g. in a compute thread.
+        """
+        reset = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(reset)
+
+    @contextlib.contextmanager
+    def running(self):
+        """
+        Context of the pool worker running the task, which INTERRUPT_SIGNAL then interrupts.
+        """
+        if self.path is not None:
+            with open(self.path + PID_SUFFIX, "w") as file:
+                file.write(str(os.getpid()))
+        _running["token"] = self
+        try:
+            self.check()  # Cancelled while queued
+            with self.active():
+                yield self
+        finally:
+            _running["token"] = None
+            if self.path is not None:
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(self.path + PID_SUFFIX)
+
+    def close(self):
+        """
+        Remove the flag files, once the task finished; a later cancel() creates none.
+        """
+        if self.path is not None:
+            with self._lock:
+                self._closed = True
+                for suffix in (CANCELLED_SUFFIX, PID_SUFFIX):
+                    with contextlib.suppress(FileNotFoundError):
+                        os.unlink(self.path + suffix)
+
+    def _worker(self):
+        try:
+            with open(self.path + PID_SUFFIX) as file:
+                return int(file.read())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _kill(self, pid):
+        if self._worker() != pid:
+            return  # Stopped in time
+        with contextlib.suppress(ProcessLookupError):
+            os.kill(pid, signal.SIGKILL)
+        from backend.server_handler.worker_pool import reset_process_pool
+        reset_process_pool()
+
+
+def current_token():
+    """
+    The token of the computation running in this context, or None.
+    """
+    return _current.get()
+
+
+def check():
+    """
+    Cancellation point of Engine code: raises OperationCancelled if the computation
+    running in this context was cancelled.
+    """
+    token = _current.get()
+    if token is not None:
+        token.check()
+
+
+def _interrupt(signum, frame):
+    token = _running["token"]
+    if token is not None and token.cancelled:  # Not a signal meant for a task that already finished
+        raise OperationInterrupted()
+
+
+def install_interrupt_handler():
+    """
+    Let cancel() interrupt the task a pool worker runs; called once in every worker.
+    """
+    signal.signal(INTERRUPT_SIGNAL, _interrupt)
+
+
+class CancelScope(object):
+    """
+    State of a request that can be cancelled by its operation id; hard is set when
+    the client asked for its pool tasks to be killed rather than interrupted.
+    """
+
+    def __init__(self):
+        self.hard = False
+
+
+@contextlib.contextmanager
+def cancel_scope():
+    scope = CancelScope()
+    reset = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(reset)
+
+
+def kill_delay() -> float:
+    """
+    Seconds after which cancelled pool tasks of the current request are killed (see CancellationToken.cancel).
+    """
+    scope = _scope.get()
+    return 0 if scope is not None and scope.hard else _config["kill_after"]
+
+
+def _operation_path(operation_id: str) -> str:
+    digest = hashlib.sha256(str(operation_id).encode("utf-8")).hexdigest()
+    return os.path.join(_config["directory"], OPERATION_PREFIX + digest)
+
+
+def cancel_operation(operation_id: str, hard: bool = False):
+    """
+    Cancel the request a client sent with this operation id, in whichever server process runs it.
+
+    :param hard: bool, kill its pool tasks at once instead of interrupting them
+    """
+    now = time.time()
+    if _config["directory"] is None:
+        _operations.pop(str(operation_id), None)
+        _operations[str(operation_id)] = (hard, now)
+        for stale in list(_operations)[:max(len(_operations) - MAX_OPERATIONS, 0)]:
+            del _operations[stale]  # The oldest first
+        return
+    _expire_flags(_config["directory"])
+    with open(_operation_path(operation_id), "w") as file:
+        file.write(f"{now!r}\n{HARD if hard else ''}")
+
+
+def operation_cancellation(operation_id: str, since: float = None):
+    """
+    None while the operation is wanted, else whether it was cancelled hard.
+
+    :param since: float, time.time() at which the request started; earlier cancels are
+                  ignored, e.g. one that arrived after a previous request with this id finished
+    """
+    if _config["directory"] is None:
+        flag = _operations.get(str(operation_id))
+    else:
+        try:
+            with open(_operation_path(operation_id)) as file:
+                cancelled_at, _, kind = file.read().partition("\n")
+            flag = (kind == HARD, float(cancelled_at))
+        except (FileNotFoundError, ValueError):
+            flag = None
+    if flag is None or since is not None and flag[1] < since:
+        return None
+    return flag[0]
+
+
+def clear_operation(operation_id: str):
+    _operations.pop(str(operation_id), None)
+    if _config["directory"] is not None:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(_operation_path(operation_id))
+
+
+def _expire_flags(directory):
+    deadline = time.time() - FLAG_TTL
+    with os.scandir(directory) as scan:
+        for entry in scan:
+            with contextlib.suppress(FileNotFoundError):
+                if entry.stat().st_mtime < deadline:
+                    os.unlink(entry.path)
@@ -0,0 +1,94 @@
+import base64
+
+import numpy as np
+
+from backend.server_handler.backends import load_backend
+
+KMEANS_METHOD = "kmeans"
+DBSCAN_METHOD = "dbscan"
+HDBSCAN_METHOD = "hdbscan"
+DENSITY_METHODS = (DBSCAN_METHOD, HDBSCAN_METHOD)
+
+DEFAULT_CLUSTERS = 8
+DEFAULT_EPS = 0.5
+DEFAULT_MIN_SAMPLES = 5
+KMEANS_BATCH_SIZE = 4096
+KMEANS_N_INIT = 3
+CLUSTER_SAMPLE_ROWS = 20000  # Density-based methods run on at most this many rows
+ASSIGNMENT_CHUNK_ROWS = 65536
+NOISE_LABEL = -1
+RANDOM_STATE = 42
+LABEL_ENCODING = "base64"
+
+UNSUPPORTED_CLUSTER_METHOD = "Unsupported clustering method: {}. Choose from 'kmeans', 'dbscan' or 'hdbscan'."
+
+
+def cluster_labels(X: np.ndarray, method: str = KMEANS_METHOD, n_clusters: int = DEFAULT_CLUSTERS, eps: float = DEFAULT_EPS,
+                   min_samples: int = DEFAULT_MIN_SAMPLES, sample_rows: int = CLUSTER_SAMPLE_ROWS) -> np.ndarray:
+    """
+    Cluster label of every row of X.
+
+    MiniBatchKMeans fits on mini-batches of the whole data. DBSCAN and HDBSCAN,
+    whose cost grows faster than linearly, are fitted on a uniform sample of at
+    most sample_rows rows; the sampled rows keep their labels (-1 is noise) and
+    every other row gets the label of the nearest cluster centroid.
+
+    :param X: numpy.ndarray of shape (n_rows, n_features) without missing values
+    :return: numpy.ndarray of int labels
+    """
+    if method == KMEANS_METHOD:
+        model = load_backend("kmeans")(n_clusters=min(n_clusters, len(X)), batch_size=KMEANS_BATCH_SIZE,
+                                           n_init=KMEANS_N_INIT, random_state=RANDOM_STATE)
+        return model.fit_predict(X)
+    if method not in DENSITY_METHODS:
+        raise ValueError(UNSUPPORTED_CLUSTER_METHOD.format(method))
+
+    rng = np.random.default_rng(RANDOM_STATE)
+    sample = np.sort(rng.choice(len(X), size=sample_rows, replace=False)) if len(X) > sample_rows else np.arange(len(X))
+    if method == DBSCAN_METHOD:
+        model = load_backend("dbscan")(eps=eps, min_samples=min_samples, n_jobs=-1)
+    else:
+        model = load_backend("hdbscan")(min_samples=min_samples, min_cluster_size=max(min_samples, 2), copy=False)  # X[sample] is already a copy
+    sample_labels = model.fit_predict(X[sample])
+
+    labels = np.full(len(X), NOISE_LABEL, dtype=np.int64)
+    labels[sample] = sample_labels
+    clusters = np.unique(sample_labels[sample_labels != NOISE_LABEL])
+    rest = np.setdiff1d(np.arange(len(X)), sample, assume_unique=True)
+    if clusters.size and rest.size:
+        centroids = np.stack([X[sample][sample_labels == cluster].mean(axis=0) for cluster in clusters])
+        centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+        for start in range(0, rest.size, ASSIGNMENT_CHUNK_ROWS):
+            rows = rest[start:start + ASSIGNMENT_CHUNK_ROWS]
+            # |x - c|^2 up to the constant |x|^2, one matrix product per chunk
+            distances = centroid_norms - 2.0 * X[rows] @ centroids.T
+            labels[rows] = clusters[np.argmin(distances, axis=1)]
+    return labels
+
+
+def compact_labels(labels: np.ndarray) -> np.ndarray:
+    """
+    Labels in the smallest signed integer type that holds them (noise is -1).
+    """
+    largest = int(labels.max()) if labels.size else 0
+    for dtype in (np.int8, np.int16, np.int32):
+        if largest <= np.iinfo(dtype).max:
+            return labels.astype(dtype)
+    return labels.astype(np.int64)
+
+
+def encode_labels(labels: np.ndarray):
+    """
+    Encode labels as little-endian bytes in base64.
+
+    :return: tuple (encoded str, dtype name such as "int8")
+    """
+    labels = compact_labels(labels)
+    return base64.b64encode(labels.astype(labels.dtype.newbyteorder("<")).tobytes()).decode("ascii"), labels.dtype.name
+
+
+def decode_labels(encoded: str, dtype: str) -> np.ndarray:
+    """
+    Inverse of encode_labels.
+    """
+    return np.frombuffer(base64.b64decode(encoded), dtype=np.dtype(dtype).newbyteorder("<"))
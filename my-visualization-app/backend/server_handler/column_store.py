@@ -0,0 +1,262 @@
+import json
+import os
+import struct
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from backend.server_handler.cache import LRUCache
+
+STORE_MAGIC = b"VIZCOLS1"
+HEADER_FORMAT = "<8sQ"  # Magic and length of the JSON layout that follows; columns start after it, aligned
+COLUMN_ALIGNMENT = 64  # Bytes; every column starts on a cache line
+NUMERIC_KINDS = "biuf"
+SHARED_MEMORY_DIR = "/dev/shm"
+FILE_SUFFIX = ".cols"
+ATTACHED_CACHE_SIZE = 16  # Column files a process keeps mapped
+DEFAULT_MAX_BYTES = 2 << 30  # Size of all column files on the host before the least recently used are removed
+PRIVATE_MODE = 0o700
+
+STORE_NOT_PRIVATE = "Directory {} must be owned by this user and not accessible to others."
+
+_store = {"directory": None, "max_bytes": DEFAULT_MAX_BYTES}
+_attached = LRUCache(ATTACHED_CACHE_SIZE)
+
+
+def default_store_directory(kind: str = "columns") -> str:
+    """
+    A directory for files shared by the server processes, in shared memory (/dev/shm) where
+    available and in the temporary directory otherwise.
+    """
+    base = SHARED_MEMORY_DIR if os.path.isdir(SHARED_MEMORY_DIR) else tempfile.gettempdir()
+    return os.path.join(base, f"visualization-{kind}-{os.getuid()}")
+
+
+def make_private_directory(directory: str) -> str:
+    """
+    Create directory if needed and check that it is private to the server's user,
+    since every server process trusts the files it finds there.
+    """
+    os.makedirs(directory, mode=PRIVATE_MODE, exist_ok=True)
+    info = os.stat(directory)
+    if info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise ValueError(STORE_NOT_PRIVATE.format(directory))
+    return directory
+
+
+def configure_store(directory: str = None, max_bytes: int = DEFAULT_MAX_BYTES):
+    """
+    Enable the column store in directory (None disables it), which must be private (see make_private_directory).
+    """
+    if directory is not None:
+        make_private_directory(directory)
+    _store.update(directory=directory, max_bytes=max_bytes)
+    _attached.clear()
+
+
+def store_enabled() -> bool:
+    return _store["directory"] is not None
+
+
+def store_path(key: str) -> str:
+    return os.path.join(_store["directory"], key.replace(":", "-").replace("/", "_") + FILE_SUFFIX)
+
+
+class ColumnFile(object):
+    """
+    A DataFrame laid out column by column in one read-only memory-mapped file.
+
+    Numeric columns are views on the mapping, so every process that reads the
+    same file shares one physical copy through the page cache, and only the
+    pages of the columns a caller touches are ever read. Other columns are
+    stored as JSON and decoded on first use. Frames are assembled from one
+    cached Series per column, so callers may modify them: copy-on-write
+    copies a column before the read-only mapping would be written.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._map = np.memmap(path, dtype=np.uint8, mode="r")
+        header_size = struct.calcsize(HEADER_FORMAT)
+        magic, layout_size = struct.unpack(HEADER_FORMAT, self._map[:header_size].tobytes())
+        if magic != STORE_MAGIC:
+            raise ValueError(f"{path} is not a column file")
+        layout = json.loads(self._map[header_size:header_size + layout_size].tobytes())
+        self.data_start = aligned(header_size + layout_size)
+        self.num_rows = layout["num_rows"]
+        self.index = pd.RangeIndex(self.num_rows)
+        self.columns = {column["name"]: column for column in layout["columns"]}
+        self._series = {}
+
+    @property
+    def nbytes(self) -> int:
+        return self._map.size
+
+    def column(self, name: str) -> pd.Series:
+        series = self._series.get(name)
+        if series is None:
+            spec = self.columns[name]
+            start = self.data_start + spec["offset"]
+            if spec["dtype"] is not None:
+                values = np.frombuffer(self._map, dtype=spec["dtype"], count=self.num_rows, offset=start)
+            else:
+                values = np.array(json.loads(self._map[start:start + spec["size"]].tobytes()), dtype=object)
+            series = self._series.setdefault(name, pd.Series(values, index=self.index, name=name, copy=False))
+        return series
+
+    def frame(self, columns: list = None) -> pd.DataFrame:
+        """
+        The stored DataFrame, or the given columns of it (missing ones are all NaN).
+        Only the requested columns are decoded or paged in.
+        """
+        names = list(self.columns) if columns is None else list(columns)
+        stored = [name for name in dict.fromkeys(names) if name in self.columns]
+        if not stored:
+            return pd.DataFrame(index=self.index, columns=names, dtype=float)
+        frame = pd.concat({name: self.column(name) for name in stored}, axis=1)
+        return frame if stored == names else frame.reindex(columns=names)
+
+
+def aligned(size: int) -> int:
+    return -(-size // COLUMN_ALIGNMENT) * COLUMN_ALIGNMENT
+
+
+def json_value(value):
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+
+def column_layout(frame: pd.DataFrame):
+    """
+    Column specs and payloads of a frame: raw little-endian values for numeric columns, JSON otherwise.
+
+    Offsets are relative to the start of the column data.
+    """
+    layout, payloads = [], []
+    offset = 0
+    for name in frame.columns:
+        values = frame[name].to_numpy()
+        if values.dtype.kind in NUMERIC_KINDS:
+            payload = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<"))
+            spec = {"name": name, "dtype": payload.dtype.str, "offset": offset}
+        else:
+            missing = pd.isna(values)
+            payload = json.dumps([None if absent else value for value, absent in zip(values, missing)],
+                                 default=json_value).encode("utf-8")
+            spec = {"name": name, "dtype": None, "offset": offset, "size": len(payload)}
+        layout.append(spec)
+        payloads.append(payload)
+        offset += aligned(memoryview(payload).nbytes)
+    return layout, payloads
+
+
+def write_column_file(path: str, frame: pd.DataFrame):
+    """
+    Write frame to path atomically: concurrent writers of the same version leave exactly
+    one file, and readers never see a partially written one.
+    """
+    layout, payloads = column_layout(frame)
+    encoded = json.dumps({"num_rows": len(frame), "columns": layout}).encode("utf-8")
+    data_start = aligned(struct.calcsize(HEADER_FORMAT) + len(encoded))
+
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(struct.pack(HEADER_FORMAT, STORE_MAGIC, len(encoded)))
+            file.write(encoded)
+            for spec, payload in zip(layout, payloads):
+                file.seek(data_start + spec["offset"])
+                file.write(memoryview(payload).cast("B"))
+        try:
+            os.link(temporary, path)
+        except FileExistsError:
+            pass  # Another process published the same version first
+    finally:
+        os.unlink(temporary)
+
+
+def evict_files(incoming_bytes: int = 0):
+    """
+    Remove the least recently used column files until incoming_bytes fit under the size limit.
+
+    Processes that still map a removed file keep reading it: the memory is only
+    released when the last mapping is closed.
+    """
+    entries = []
+    with os.scandir(_store["directory"]) as scan:
+        for entry in scan:
+            if entry.name.endswith(FILE_SUFFIX):
+                try:
+                    info = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((info.st_mtime, info.st_size, entry.path))
+    total = sum(size for _, size, _ in entries) + incoming_bytes
+    for _, size, path in sorted(entries):
+        if total <= _store["max_bytes"]:
+            break
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def shared_frame(key: str, build, columns: list = None) -> pd.DataFrame:
+    """
+    The DataFrame of a dataset version from the host-wide column store.
+
+    The first process to ask for a version builds it and publishes its column
+    file; all others map the same file. Handles to files that were retired
+    meanwhile are dropped, so their memory can be released.
+
+    :param key: str, Dataset.cache_key of a stored dataset
+    :param build: callable, () -> pandas.DataFrame with all columns of the dataset
+    :param columns: list, optional subset of the columns
+    """
+    handle = _attached.get(key)
+    if handle is None:
+        path = store_path(key)
+        try:
+            handle = ColumnFile(path)
+        except FileNotFoundError:
+            frame = build()
+            evict_files(int(frame.memory_usage(index=False).sum()))
+            write_column_file(path, frame)
+            handle = ColumnFile(path)
+        try:
+            os.utime(path)  # Recently used files are evicted last
+        except FileNotFoundError:
+            pass
+        _attached.set(key, handle)
+        for attached_key in _attached.keys():
+            if attached_key != key and not os.path.exists(store_path(attached_key)):
+                _attached.pop(attached_key)
+    return handle.frame(columns)
+
+
+def retire(key: str):
+    """
+    Remove the column file of a dataset version that was changed or deleted.
+    """
+    _attached.pop(key)
+    if store_enabled():
+        try:
+            os.unlink(store_path(key))
+        except FileNotFoundError:
+            pass
+
+
+def clear_store():
+    """
+    Remove every column file, e.g. after all datasets were deleted.
+    """
+    _attached.clear()
+    if store_enabled():
+        with os.scandir(_store["directory"]) as scan:
+            for entry in scan:
+                if entry.name.endswith(FILE_SUFFIX):
+                    try:
+                        os.unlink(entry.path)
+                    except FileNotFoundError:
+                        pass
@@ -0,0 +1,106 @@
+import math
+
+# Seconds per unit of work, calibrated on a single core for float64 data.
+PCA_COST_PER_CELL = 5e-9
+TSNE_COST_PER_POINT = 2.5e-4
+UMAP_COST_PER_POINT = 1.2e-4
+UMAP_GROWTH_EXPONENT = 1.14
+FEATURE_COST_REFERENCE = 10
+FIXED_OVERHEAD = 0.01
+
+# Peak bytes of working memory, on top of INPUT_COPIES copies of the input
+BYTES_PER_CELL = 8
+INPUT_COPIES = 3  # Engine copy, float conversion and standardisation
+TSNE_BYTES_PER_POINT = 2200  # Sparse affinities over 3 * perplexity neighbours, gradient and tree
+UMAP_BYTES_PER_POINT = 1600  # Neighbour graph, fuzzy simplicial set and optimiser state
+FIXED_MEMORY = 1 << 20
+
+# Seconds and extra bytes per input cell (row x feature) of the other Engine operations
+OPERATION_COSTS = {
+    "correlation": (2e-8, 16),
+    "interpolate": (5e-8, 32),
+    "extrapolate": (5e-8, 32),
+    "fit_curve": (2e-7, 48),
+    "detect_outliers": (5e-7, 32),
+    "cluster": (1e-6, 48),
+    "oversample_data": (1e-6, 64),
+}
+DIMENSIONAL_REDUCTION = "dimensional_reduction"
+
+PCA_METHOD = "pca"
+TSNE_METHOD = "tsne"
+UMAP_METHOD = "umap"
+
+UNKNOWN_METHOD = "No cost model for method: {}"
+UNKNOWN_OPERATION = "No cost model for operation: {}"
+
+
+def estimate_runtime(method: str, n_rows: int, n_features: int, n_components: int = 2) -> float:
+    """
+    Estimate the wall-clock seconds of a dimensionality reduction method.
+
+    :param method: str, "pca", "tsne" or "umap"
+    :param n_rows: int, number of rows in the full dataset
+    :param n_features: int, number of numeric features
+    :param n_components: int, requested output dimension
+    :return: float, expected latency in seconds
+    """
+    n_rows = max(int(n_rows), 1)
+    n_features = max(int(n_features), 1)
+    feature_factor = max(1.0, n_features / FEATURE_COST_REFERENCE)
+
+    if method == PCA_METHOD:
+        return FIXED_OVERHEAD + PCA_COST_PER_CELL * n_rows * n_features * max(int(n_components), 1)
+    if method == TSNE_METHOD:
+        return FIXED_OVERHEAD + TSNE_COST_PER_POINT * n_rows * math.log2(n_rows + 1) * feature_factor
+    if method == UMAP_METHOD:
+        return FIXED_OVERHEAD + UMAP_COST_PER_POINT * n_rows ** UMAP_GROWTH_EXPONENT * feature_factor
+    raise ValueError(UNKNOWN_METHOD.format(method))
+
+
+def estimate_memory(method: str, n_rows: int, n_features: int, n_components: int = 2) -> int:
+    """
+    Estimate the peak working memory of a dimensionality reduction method.
+
+    :param method: str, "pca", "tsne" or "umap"
+    :param n_rows: int, number of rows in the full dataset
+    :param n_features: int, number of numeric features
+    :param n_components: int, requested output dimension
+    :return: int, expected bytes
+    """
+    n_rows = max(int(n_rows), 1)
+    n_features = max(int(n_features), 1)
+    base = FIXED_MEMORY + BYTES_PER_CELL * n_rows * (INPUT_COPIES * n_features + max(int(n_components), 1))
+
+    if method == PCA_METHOD:
+        return base + BYTES_PER_CELL * n_rows * n_features  # Centred copy for the SVD
+    if method == TSNE_METHOD:
+        return base + TSNE_BYTES_PER_POINT * n_rows
+    if method == UMAP_METHOD:
+        return base + UMAP_BYTES_PER_POINT * n_rows
+    raise ValueError(UNKNOWN_METHOD.format(method))
+
+
+def estimate_cost(operation: str, n_rows: int, n_features: int, method: str = None, n_components: int = 2,
+                  repeats: int = 1) -> tuple:
+    """
+    Estimate the seconds and peak bytes of an Engine operation, for admission control.
+
+    :param operation: str, name of the Engine operation
+    :param n_rows: int, number of rows of its input
+    :param n_features: int, number of columns of its input
+    :param method: str, method of a dimensionality reduction
+    :param n_components: int, output dimension of a dimensionality reduction
+    :param repeats: int, how often the operation runs over its input, e.g. 1 + bootstrap refits
+    :return: tuple (seconds, bytes)
+    """
+    if operation == DIMENSIONAL_REDUCTION:
+        return (estimate_runtime(method, n_rows, n_features, n_components),
+                estimate_memory(method, n_rows, n_features, n_components))
+    if operation not in OPERATION_COSTS:
+        raise ValueError(UNKNOWN_OPERATION.format(operation))
+    seconds_per_cell, bytes_per_cell = OPERATION_COSTS[operation]
+    cells = max(int(n_rows), 1) * max(int(n_features), 1)
+    repeats = max(int(repeats), 1)
+    return (FIXED_OVERHEAD + seconds_per_cell * cells * repeats,
+            FIXED_MEMORY + (INPUT_COPIES * BYTES_PER_CELL + bytes_per_cell) * cells)
@@ -2,23 +2,21 @@ import pandas as pd
 import numpy as np
 import os
 
-from sklearn.decomposition import PCA
-from sklearn.linear_model import LinearRegression
-from scipy.optimize import curve_fit, OptimizeWarning
-from imblearn.over_sampling import SMOTE,RandomOverSampler
-from sklearn.manifold import TSNE
-from sklearn.feature_selection import VarianceThreshold
-from scipy.interpolate import interp1d, UnivariateSpline
+from concurrent.futures import ThreadPoolExecutor
 from itertools import combinations
-from backend.api.models import UploadedFile
-import umap.umap_ as umap
-import warnings
+from backend.server_handler.backends import load_backend
+from backend.server_handler.cost_model import estimate_runtime
+from backend.server_handler.worker_pool import map_in_pool, EngineTimeoutError
+from backend.server_handler.nonlinear_fit import fit_nonlinear, model_function
+from backend.server_handler.uncertainty import compute_bands, DEFAULT_CONFIDENCE_LEVEL
+from backend.server_handler.sorted_index import sorted_xy, get_spline, get_cubic_interpolator, get_sorted_index
+from backend.server_handler.oversampling import neighbors_estimator, oversample_targets, synthetic_chunks, OVERSAMPLE_CHUNK_ROWS
+from backend.server_handler.outliers import outlier_mask, OUTLIER_SAMPLE_ROWS
+from backend.server_handler.clustering import cluster_labels, CLUSTER_SAMPLE_ROWS
+from backend.server_handler.timing import span
 
 DEFAULT_DIMREDUCTION_FACTOR = 2
 DEFAULT_POINT_NUMBER = 100
-PCA_RECOMMEND_NUMBER = 50
-TSNE_RECOMMEND_NUMBER = 10
-UMAP_RECOMMEND_NUMBER = 5
 PCA_MAX_COMPONENTS = 10
 TSNE_MAX_COMPONENTS = 30
 UMAP_MAX_COMPONENTS = 15
@@ -35,11 +33,24 @@ LARGEST_NOT_POSITIVE_NUMBER = 0
 DEGREE_OF_POLYNOMIAL = 1
 SLOPE_INDEX = 0
 INTERCEPT_INDEX = 1
+ROW_INDEX = 0
 SINGLE_COLUMN = 1
 AUTO = -1
 FEATURE_DROPPING_CORRELATION_THRESHOLD = 0.95
 FEATURE_DROPPING_VARIANCE_THRESHOLD = 0.01
 FEATURE_COMBING_CORRELATION_THRESHOLD = 0.9
+SPECTRAL_SAMPLE_ROWS = 2000
+SPECTRAL_MAX_RANK = 50
+SPECTRAL_POWER_ITERATIONS = 4
+EXPLAINED_VARIANCE_TARGET = 0.95
+NONLINEAR_STRUCTURE_THRESHOLD = 0.8
+RECOMMEND_LATENCY_BUDGET = 60.0
+LATENCY_DECIMALS = 3
+LINEAR_DEGREE = 1
+RANK_TOLERANCE = 1e-12
+AUTO_DEGREE = "auto"
+AUTO_MAX_DEGREE = 10
+CROSS_VALIDATION_FOLDS = 5
 
 DEFAULT_FILE_NAME = "unknown.csv"
 DEFAULT_ENGINE = "openpyxl"
@@ -49,6 +60,8 @@ OVERSAMPLE_PROCESS = "oversample"
 INTERPOLATE_PROCESS = "interpolation"
 EXTRAPOLATION_PROCESS = "extrapolate"
 FIT_CURVE_PROCESS = "curve fitting"
+OUTLIER_PROCESS = "outlier detection"
+CLUSTER_PROCESS = "clustering"
 
 CSV_TYPE = "csv"
 XLSX_TYPE = "xlsx"
@@ -73,10 +86,15 @@ SPLINE_METHOD = "spline"
 LINEAR_METHOD = "linear"
 POLYNOMIAL_METHOD = "polynomial"
 EXPONENTIAL_METHOD = "exponential"
+LOGISTIC_METHOD = "logistic"
+POWER_METHOD = "power"
+NONLINEAR_METHODS = (EXPONENTIAL_METHOD, LOGISTIC_METHOD, POWER_METHOD)
 
 INVALID_INPUT_INFORMATION = "Input data must be a pandas DataFrame."
 INVALID_DEGREE = "Degree must be an integer."
 ERROR_NUMERIC_DATA = "Dataset does not contain numeric data suitable for dimensionality reduction."
+ERROR_OUTLIER_DATA = "Dataset does not contain numeric columns to search for outliers."
+ERROR_CLUSTER_DATA = "Dataset does not contain numeric columns to cluster."
 INVALID_CORRELATION_METHOD_INFORMATION = "Invalid correlation method. Choose from 'pearson', 'spearman', or 'kendall'."
 INVALID_VALUE_IN_PROCESS = "Warning: NaN values generated during linear interpolation."
 ERROR_POSITIVE_VALUE = "All y values should be positive."
@@ -92,6 +110,9 @@ DATASET_NOT_FOUND_MESSAGE = "Dataset with ID {} not found."
 UNSUPPORTED_DIM_REDUCTION_METHOD = "Unsupported dimensionality reduction method: {}"
 INVALID_FEATURES = "Columns '{}' and/or '{}' not found in dataset"
 COLUMN_NAME = "dim{}"
+DEGENERATE_X_VALUES = "x values do not determine a degree {} polynomial"
+NOT_ENOUGH_POINTS = "Not enough valid points ({}) for a degree {} polynomial"
+NOT_ENOUGH_POINTS_FOR_CV = "At least {} points are required to select a polynomial degree."
 
 
 
@@ -105,7 +126,7 @@ class Engine:
         Perform PCA downscaling
         """
         try:
-            pca = PCA(n_components=n_components)
+            pca = load_backend(PCA_METHOD)(n_components=n_components)
             transformed_data = pca.fit_transform(data)
             columns = [COLUMN_NAME.format(i+COLUMN_INDEX) for i in range(n_components)]
             return pd.DataFrame(transformed_data, columns=columns)
@@ -118,7 +139,8 @@ class Engine:
         Perform t-SNE dimensionality reduction
         """
         try:
-            tsne = TSNE(n_components=n_components)
+            # Seeded, so that the same data always has the same embedding (caches key it by the input)
+            tsne = load_backend(TSNE_METHOD)(n_components=n_components, random_state=RANDOM_STATE)
             transformed_data = tsne.fit_transform(data)
             columns = [COLUMN_NAME.format(i+COLUMN_INDEX) for i in range(n_components)]
             return pd.DataFrame(transformed_data, columns=columns)
@@ -131,7 +153,7 @@ class Engine:
         Perform UMAP dimensionality reduction
         """
         try:
-            reducer = umap.UMAP(n_components=n_components)
+            reducer = load_backend(UMAP_METHOD)(n_components=n_components, random_state=RANDOM_STATE)  # Seeded like t-SNE
             transformed_data = reducer.fit_transform(data)
             columns = [COLUMN_NAME.format(i+COLUMN_INDEX) for i in range(n_components)]
             return pd.DataFrame(transformed_data, columns=columns)
@@ -161,34 +183,105 @@ class Engine:
         else:
             raise ValueError(UNSUPPORTED_DIM_REDUCTION_METHOD.format(method))
 
+    @staticmethod
+    def spectral_profile(dataset_df: pd.DataFrame, sample_rows: int = SPECTRAL_SAMPLE_ROWS) -> dict:
+        """
+        Measure the explained-variance curve of a dataset on a row sketch.
+
+        Rows are sampled uniformly, standardised and probed with a randomized SVD,
+        so the cost is bounded by the sample size rather than the dataset size.
+
+        :param dataset_df: pandas.DataFrame, the input dataset
+        :param sample_rows: int, maximum number of rows used for the probe
+        :return: dict with the explained variance ratio per component, its cumulative
+                 curve and the intrinsic dimension reaching EXPLAINED_VARIANCE_TARGET
+        """
+        n_rows = dataset_df.shape[ROW_INDEX]
+        if n_rows > sample_rows:
+            rng = np.random.default_rng(RANDOM_STATE)
+            sample_index = np.sort(rng.choice(n_rows, size=sample_rows, replace=False))
+            sample = dataset_df.iloc[sample_index]
+        else:
+            sample = dataset_df
+
+        numeric = sample.select_dtypes(include=[ALL_NUMERIC_TYPES]).dropna(axis=COLUMN_INDEX, how="all")
+        if numeric.empty:
+            raise ValueError(ERROR_NUMERIC_DATA)
+
+        values = numeric.to_numpy(dtype=np.float64)
+        means = np.nanmean(values, axis=ROW_INDEX)
+        values = np.where(np.isnan(values), means, values) - means
+        stds = values.std(axis=ROW_INDEX)
+        stds[stds == 0] = 1.0
+        values /= stds
+
+        total_variance = np.sum(values ** 2)
+        rank = min(SPECTRAL_MAX_RANK, *values.shape)
+        if total_variance == 0 or rank == 0:
+            ratios = np.zeros(0)
+        else:
+            _, singular_values, _ = load_backend("randomized_svd")(values, n_components=rank, n_iter=SPECTRAL_POWER_ITERATIONS, random_state=RANDOM_STATE)
+            ratios = singular_values ** 2 / total_variance
+
+        cumulative = np.cumsum(ratios)
+        reached = np.nonzero(cumulative >= EXPLAINED_VARIANCE_TARGET)[0]
+        intrinsic_dimension = int(reached[0]) + 1 if reached.size else int(ratios.size)
+
+        return {
+            "n_rows": int(n_rows),
+            "n_features": int(numeric.shape[COLUMN_INDEX]),
+            "sample_rows": int(values.shape[ROW_INDEX]),
+            "explained_variance_ratio": ratios.tolist(),
+            "cumulative_variance": cumulative.tolist(),
+            "intrinsic_dimension": intrinsic_dimension,
+        }
+
     @staticmethod
     def recommend_dim_reduction(dataset_df):
+        """
+        Recommend dimensionality reduction methods from the spectrum of the data.
+
+        PCA is sized to the intrinsic dimension of the sample. t-SNE and UMAP are only
+        suggested when a 2-D linear projection loses a large share of the variance and
+        their expected latency on the full row count fits RECOMMEND_LATENCY_BUDGET.
+
+        :return: tuple (recommendations, parameters, profile)
+        """
         try:
-            num_features = dataset_df.shape[COLUMN_INDEX]
+            profile = Engine.spectral_profile(dataset_df)
+            num_rows = profile["n_rows"]
+            num_features = profile["n_features"]
+            cumulative = profile["cumulative_variance"]
             recommendations = []
             parameters = {}
 
-            if num_features > PCA_RECOMMEND_NUMBER:
-                recommendations.append(PCA_METHOD)
-                parameters[PCA_METHOD] = {N_COMPONENTS: min(PCA_MAX_COMPONENTS, num_features // COMPONENTS_DIVISOR)}
-
-            if num_features > TSNE_RECOMMEND_NUMBER:
-                recommendations.append(TSNE_METHOD)
-                parameters[TSNE_METHOD] = {N_COMPONENTS: DEFAULT_DIMREDUCTION_FACTOR, TSNE_PERPLEXITY: min(TSNE_MAX_COMPONENTS, num_features - 1)}
-
-            if num_features > UMAP_RECOMMEND_NUMBER:
-                recommendations.append(UMAP_METHOD)
-                parameters[UMAP_METHOD] = {N_COMPONENTS: DEFAULT_DIMREDUCTION_FACTOR, UMAP_N_NEIGHBOR: min(UMAP_MAX_COMPONENTS, num_features - 1)}
+            def recommend(method, method_parameters):
+                latency = estimate_runtime(method, num_rows, num_features, method_parameters[N_COMPONENTS])
+                method_parameters["expected_latency"] = round(latency, LATENCY_DECIMALS)
+                recommendations.append(method)
+                parameters[method] = method_parameters
+
+            if num_features > MIN_COMPONENTS:
+                pca_components = min(PCA_MAX_COMPONENTS, max(MIN_COMPONENTS, profile["intrinsic_dimension"]))
+                recommend(PCA_METHOD, {N_COMPONENTS: min(pca_components, num_features)})
+
+            planar_variance = cumulative[min(DEFAULT_DIMREDUCTION_FACTOR, len(cumulative)) - 1] if cumulative else 1.0
+            if planar_variance < NONLINEAR_STRUCTURE_THRESHOLD and num_rows > MIN_COMPONENTS:
+                umap_parameters = {N_COMPONENTS: DEFAULT_DIMREDUCTION_FACTOR, UMAP_N_NEIGHBOR: min(UMAP_MAX_COMPONENTS, num_rows - 1)}
+                if estimate_runtime(UMAP_METHOD, num_rows, num_features, DEFAULT_DIMREDUCTION_FACTOR) <= RECOMMEND_LATENCY_BUDGET:
+                    recommend(UMAP_METHOD, umap_parameters)
+                tsne_parameters = {N_COMPONENTS: DEFAULT_DIMREDUCTION_FACTOR, TSNE_PERPLEXITY: min(TSNE_MAX_COMPONENTS, num_rows - 1)}
+                if estimate_runtime(TSNE_METHOD, num_rows, num_features, DEFAULT_DIMREDUCTION_FACTOR) <= RECOMMEND_LATENCY_BUDGET:
+                    recommend(TSNE_METHOD, tsne_parameters)
 
             if not recommendations:
-                recommendations.append(PCA_METHOD)
-                parameters[PCA_METHOD] = {N_COMPONENTS: min(MIN_COMPONENTS, num_features)}
+                recommend(PCA_METHOD, {N_COMPONENTS: min(MIN_COMPONENTS, num_features)})
 
-            return recommendations, parameters
+            return recommendations, parameters, profile
         except Exception as e:
-            return [], {}
+            return [], {}, {}
 
-    def interpolate(dataset: pd.DataFrame, x_feature: str, y_feature: str, kind: str = LINEAR_METHOD, num_points: int = DEFAULT_POINT_NUMBER, min_value=None, max_value=None, degree: int = DEFAULT_INTERPOLATION_DEGREE) -> pd.DataFrame:
+    def interpolate(dataset: pd.DataFrame, x_feature: str, y_feature: str, kind: str = LINEAR_METHOD, num_points: int = DEFAULT_POINT_NUMBER, min_value=None, max_value=None, degree: int = DEFAULT_INTERPOLATION_DEGREE, cache_key: str = None) -> pd.DataFrame:
         """
         Perform interpolation (or extrapolation) on a given dataset.
 
@@ -199,8 +292,11 @@ class Engine:
         :param num_points: int, number of generated data points (default: 100)
         :param min_value: float, minimum x value for interpolation (default: min(dataset[x_feature]))
         :param max_value: float, maximum x value for interpolation (default: max(dataset[x_feature]))
-        :param degree: int, degree of the polynomial (only used for "polynomial" and "spline")
-        :return: pandas.DataFrame containing interpolated 'x' and 'y' values
+        :param degree: int, degree of the polynomial (only used for "polynomial" and "spline"),
+                       or "auto" to select the polynomial degree by cross-validation
+        :param cache_key: str, Dataset.cache_key of the source, to reuse its sorted x index and splines
+        :return: pandas.DataFrame containing interpolated 'x' and 'y' values; with an automatic
+                 degree, attrs["degree_selection"] holds the chosen degree and the CV error curve
         """
 
         try:
@@ -209,8 +305,10 @@ class Engine:
                 raise ValueError(INVALID_FEATURES.format(x_feature,y_feature))
 
             # Extract x and y data
-            x = dataset[x_feature].values
-            y = dataset[y_feature].values
+            x_column = np.asarray(dataset[x_feature].values, dtype=np.float64)
+            y_column = np.asarray(dataset[y_feature].values, dtype=np.float64)
+            x = x_column
+            y = y_column
 
              # Handle NaN values in y by replacing them with the mean or by removing the rows with NaN values
             if np.any(np.isnan(y)):
@@ -219,6 +317,14 @@ class Engine:
                 x = x[mask]
                 y = y[mask]
 
+            degree_selection = None
+            if degree == AUTO_DEGREE:
+                if kind == POLYNOMIAL_METHOD:
+                    degree, cv_errors = Engine.select_polynomial_degree(x, y)
+                    degree_selection = {"degree": degree, "cv_errors": cv_errors}
+                else:
+                    degree = DEFAULT_INTERPOLATION_DEGREE
+
             # Use min and max values from the dataset if not provided
             if min_value is None:
                 min_value = np.min(x)
@@ -230,7 +336,9 @@ class Engine:
             
             # Linear interpolation
             if kind == LINEAR_METHOD:
-                interpolator = interp1d(x, y, kind=LINEAR_METHOD, fill_value=EXTRAPOLATION_PROCESS)
+                # Sorted, duplicate-averaged points come from the cached index of the x column
+                x_sorted, y_sorted = sorted_xy(x_column, y_column, cache_key, x_feature)
+                interpolator = load_backend("interp1d")(x_sorted, y_sorted, kind=LINEAR_METHOD, fill_value=EXTRAPOLATION_PROCESS, assume_sorted=True)
                 y_new = interpolator(x_new)
                 # Check if NaN values were generated during interpolation
                 if np.any(np.isnan(y_new)):
@@ -245,7 +353,7 @@ class Engine:
 
             # Spline interpolation
             elif kind == SPLINE_METHOD:
-                spline = UnivariateSpline(x, y, k=min(degree, len(x) - LIMIT), s=EXACT_INTERPOLATION_FACTOR)
+                spline = get_spline(x_column, y_column, degree, EXACT_INTERPOLATION_FACTOR, cache_key, x_feature, y_feature)
                 y_new = spline(x_new)
 
             # Exponential interpolation
@@ -264,12 +372,104 @@ class Engine:
                 raise ValueError(UNSUPPORTED_INTERPOLATION_METHOD)
 
             # Return the interpolated DataFrame
-            return pd.DataFrame({x_feature: x_new, y_feature: y_new})
+            interpolated_data = pd.DataFrame({x_feature: x_new, y_feature: y_new})
+            if degree_selection is not None:
+                interpolated_data.attrs["degree_selection"] = degree_selection
+            return interpolated_data
 
         except Exception as e:
             raise ValueError(ERROR_INFORMATION.format(INTERPOLATE_PROCESS, e))
 
-    def extrapolate(data: pd.DataFrame, x_feature: str, y_feature: str, target_x: list, method=LINEAR_METHOD, degree=DEFAULT_EXTRAPOLATION_DEGREE) -> pd.DataFrame:
+    @staticmethod
+    def interpolate_many(dataset: pd.DataFrame, x_feature: str, y_features: list, kind: str = LINEAR_METHOD, num_points: int = DEFAULT_POINT_NUMBER, min_value=None, max_value=None, degree: int = DEFAULT_INTERPOLATION_DEGREE, cache_key: str = None) -> pd.DataFrame:
+        """
+        Interpolate many y columns onto one shared x grid in a single vectorized pass.
+
+        Linear interpolation locates the grid in the sorted x index with one
+        searchsorted shared by all columns; splines are solved for all columns at
+        once; polynomial and exponential fits share one QR factorization. Columns
+        with missing values fall back to Engine.interpolate.
+
+        :param dataset: pandas.DataFrame, the input dataset
+        :param x_feature: str, the column name for the independent variable (x-axis)
+        :param y_features: list, the column names to interpolate
+        :param kind: str, type of interpolation ("linear", "polynomial", "spline", "exponential")
+        :param num_points: int, number of generated data points (default: 100)
+        :param min_value: float, minimum x value for interpolation (default: min(dataset[x_feature]))
+        :param max_value: float, maximum x value for interpolation (default: max(dataset[x_feature]))
+        :param degree: int, degree of the polynomial or spline, or "auto" for polynomials
+        :param cache_key: str, Dataset.cache_key of the source, to reuse its sorted x index
+        :return: pandas.DataFrame with the x grid and one interpolated column per y feature
+        """
+        try:
+            missing = [col for col in [x_feature, *y_features] if col not in dataset.columns]
+            if missing:
+                raise ValueError(f"Columns {missing} not found in dataset")
+
+            x_column = np.asarray(dataset[x_feature].values, dtype=np.float64)
+            Y = np.asarray(dataset[list(y_features)].values, dtype=np.float64)
+            index = get_sorted_index(x_column, cache_key, x_feature)
+            if min_value is None:
+                min_value = index.unique_x[0]
+            if max_value is None:
+                max_value = index.unique_x[-1]
+            x_new = np.linspace(min_value, max_value, num_points)
+            result = pd.DataFrame({x_feature: x_new})
+
+            complete = np.all(np.isfinite(Y[index.order]), axis=ROW_INDEX)
+            batch = [i for i in range(len(y_features)) if complete[i]]
+            Y_new = np.empty((num_points, len(batch)))
+
+            if batch and kind == LINEAR_METHOD:
+                x_sorted = index.unique_x
+                Y_sorted = index.aggregate_many(Y[:, batch])
+                # One searchsorted for every column; the end segments extrapolate linearly
+                right = np.clip(np.searchsorted(x_sorted, x_new), 1, x_sorted.size - 1)
+                left = right - 1
+                weight = ((x_new - x_sorted[left]) / (x_sorted[right] - x_sorted[left]))[:, None]
+                Y_new = Y_sorted[left] * (1 - weight) + Y_sorted[right] * weight
+
+            elif batch and kind == SPLINE_METHOD:
+                x_sorted = index.unique_x
+                spline_degree = DEFAULT_INTERPOLATION_DEGREE if degree == AUTO_DEGREE else int(degree)
+                spline = load_backend("make_interp_spline")(x_sorted, index.aggregate_many(Y[:, batch]), k=min(spline_degree, x_sorted.size - LIMIT), axis=ROW_INDEX)
+                Y_new = spline(x_new)
+
+            elif batch and kind == POLYNOMIAL_METHOD:
+                rows = index.order
+                if degree == AUTO_DEGREE:
+                    degrees = [Engine.select_polynomial_degree(x_column[rows], Y[rows, i])[0] for i in batch]
+                else:
+                    degrees = [int(degree)] * len(batch)
+                # Columns sharing a degree share the Vandermonde factorization
+                for fit_degree in set(degrees):
+                    group = [j for j, d in enumerate(degrees) if d == fit_degree]
+                    coeffs, _ = Engine._solve_polynomial_system(x_column[rows], Y[rows][:, [batch[j] for j in group]], fit_degree)
+                    Y_new[:, group] = np.vander(x_new, fit_degree + 1) @ coeffs
+
+            elif batch and kind == EXPONENTIAL_METHOD:
+                rows = index.order
+                if np.any(Y[rows][:, batch] <= LARGEST_NOT_POSITIVE_NUMBER):
+                    raise ValueError(ERROR_POSITIVE_VALUE)
+                coeffs, _ = Engine._solve_polynomial_system(x_column[rows], np.log(Y[rows][:, batch]), DEGREE_OF_POLYNOMIAL)
+                Y_new = np.exp(np.vander(x_new, DEGREE_OF_POLYNOMIAL + 1) @ coeffs)
+
+            elif kind not in (LINEAR_METHOD, SPLINE_METHOD, POLYNOMIAL_METHOD, EXPONENTIAL_METHOD):
+                raise ValueError(UNSUPPORTED_INTERPOLATION_METHOD)
+
+            for j, i in enumerate(batch):
+                result[y_features[i]] = Y_new[:, j]
+            for i in range(len(y_features)):
+                if not complete[i]:
+                    single = Engine.interpolate(dataset, x_feature, y_features[i], kind=kind, num_points=num_points, min_value=min_value, max_value=max_value, degree=degree, cache_key=cache_key)
+                    result[y_features[i]] = single[y_features[i]].values
+
+            return result[[x_feature, *y_features]]
+
+        except Exception as e:
+            raise ValueError(ERROR_INFORMATION.format(INTERPOLATE_PROCESS, e))
+
+    def extrapolate(data: pd.DataFrame, x_feature: str, y_feature: str, target_x: list, method=LINEAR_METHOD, degree=DEFAULT_EXTRAPOLATION_DEGREE, cache_key: str = None) -> pd.DataFrame:
         """
         Perform extrapolation using different methods.
 
@@ -279,6 +479,7 @@ class Engine:
         :param target_x: list, target x values for extrapolation
         :param method: str, extrapolation method ("linear", "polynomial", "exponential", "spline")
         :param degree: int, degree of polynomial fit (default: 2)
+        :param cache_key: str, Dataset.cache_key of the source, to reuse its sorted x index and splines
         :return: pandas.DataFrame, extrapolated data with columns ['x', 'y']
         """
     
@@ -292,7 +493,7 @@ class Engine:
         target_x = np.array(target_x)  # Convert to numpy array
 
         if method == LINEAR_METHOD:
-            model = LinearRegression()
+            model = load_backend("linear_regression")()
             model.fit(X, y)
             y_pred = model.predict(target_x.reshape(AUTO, SINGLE_COLUMN))
 
@@ -306,13 +507,13 @@ class Engine:
             if np.any(y <= LARGEST_NOT_POSITIVE_NUMBER):
                 raise ValueError(ERROR_POSITIVE_VALUE)
             log_y = np.log(y)
-            model = LinearRegression()
+            model = load_backend("linear_regression")()
             model.fit(X, log_y)
             log_y_pred = model.predict(target_x.reshape(-1, 1))
             y_pred = np.exp(log_y_pred)  # Convert back to exponential form
 
         elif method == SPLINE_METHOD:
-            spline_func = interp1d(X.flatten(), y, kind=CUBIC_METHOD, fill_value=EXTRAPOLATION_PROCESS)
+            spline_func = get_cubic_interpolator(X.flatten(), y, cache_key, x_feature, y_feature)
             y_pred = spline_func(target_x)
 
         else:
@@ -322,19 +523,24 @@ class Engine:
         return pd.DataFrame({x_feature: target_x, y_feature: y_pred})
 
     @staticmethod
-    def fit_curve(dataset: pd.DataFrame, x_feature: str, y_feature: str, method: str = LINEAR_METHOD, degree: int = 2, initial_params: list = None):
+    def fit_curve(dataset: pd.DataFrame, x_feature: str, y_feature: str, method: str = LINEAR_METHOD, degree: int = 2, initial_params: list = None, full_output: bool = False, bands: bool = False, confidence_level: float = DEFAULT_CONFIDENCE_LEVEL, bootstrap_samples: int = 0):
         """
         Perform curve fitting on the given dataset.
 
         :param dataset: pandas.DataFrame, the input dataset
         :param x_feature: str, the column name for the independent variable (x-axis)
         :param y_feature: str, the column name for the dependent variable (y-axis)
-        :param method: str, the type of curve fitting ("linear", "polynomial", "exponential")
-        :param degree: int, the degree of the polynomial (only used for "polynomial" method)
-        :param initial_params: list, initial parameters for curve fitting (only used for "exponential" method)
-        :return: tuple (params, covariance, fitted_data)
+        :param method: str, the type of curve fitting ("linear", "polynomial", "exponential", "logistic", "power")
+        :param degree: int, the degree of the polynomial (only used for "polynomial" method),
+                       or "auto" to select it by cross-validation
+        :param initial_params: list, extra starting point for the nonlinear methods
+        :param full_output: bool, also return a dict describing the fit (evaluations, convergence)
+        :param bands: bool, add confidence and prediction bands over the fitted grid to info["bands"]
+        :param confidence_level: float, coverage of the bands (default: 0.95)
+        :param bootstrap_samples: int, number of residual bootstrap refits for percentile bands (0 disables them)
+        :return: tuple (params, covariance, fitted_data), followed by info when full_output is set
                  - params: the fitted parameters
-                 - covariance: covariance of the fitted parameters (None for polynomial fitting)
+                 - covariance: covariance of the fitted parameters (None when it cannot be estimated)
                  - fitted_data: pandas.DataFrame with 'x' and 'y' values of the fitted curve
         """
         try:
@@ -346,6 +552,11 @@ class Engine:
             y = dataset[y_feature].values
             x = np.asarray(x, dtype=np.float64)
             y = np.asarray(y, dtype=np.float64)
+            info = {"model": method, "converged": True}
+            if degree == AUTO_DEGREE and method == POLYNOMIAL_METHOD:
+                with span("degree_selection"):
+                    degree, cv_errors = Engine.select_polynomial_degree(x, y)
+                info["degree_selection"] = {"degree": degree, "cv_errors": cv_errors}
             try:
                 degree = int(degree)
             except ValueError:
@@ -358,98 +569,258 @@ class Engine:
                 def linear_func(x, a, b):
                     return a * x + b
 
-                params, covariance = curve_fit(linear_func, x, y)
+                with span("fit"):
+                    params, covariance = load_backend("curve_fit")(linear_func, x, y)
                 y_fit_curve = linear_func(x_fit, *params)
 
             elif method == POLYNOMIAL_METHOD:
                 try:
-                    poly_coeffs = np.polyfit(x, y, degree)
+                    with span("fit"):
+                        poly_coeffs, covariances = Engine._solve_polynomial_system(x, y[:, None], degree)
                 except Exception as e:
                     print(ERROR_INFORMATION.format(FIT_CURVE_PROCESS,e))
-                    return None, None, None
-                poly_func = np.poly1d(poly_coeffs)
+                    return (None, None, None, None) if full_output else (None, None, None)
+                poly_func = np.poly1d(poly_coeffs[:, 0])
                 y_fit_curve = poly_func(x_fit)
-                params, covariance = poly_coeffs, None  # no covariance for polynomial
+                params, covariance = poly_coeffs[:, 0], covariances[0]
 
-            elif method == EXPONENTIAL_METHOD:
-                def exp_func(x, a, b, c):
-                    return a * np.exp(b * x) + c
+            elif method in NONLINEAR_METHODS:
                 if x.size == 0 or y.size == 0:
                     raise ValueError("Input x or y is empty!")
 
                 if np.any(np.isnan(x)) or np.any(np.isnan(y)) or np.any(np.isinf(x)) or np.any(np.isinf(y)):
                     raise ValueError("Input data contains NaN or Inf!")
 
-                if np.any(y < 0):
+                if method == EXPONENTIAL_METHOD and np.any(y < 0):
                     print("Warning: Some y values are negative, which may affect exponential fitting.")
 
-                if initial_params is None:
-                    initial_params = [max(y), 0.01, min(y)]  # Adjustment of initial values according to data
-
-                with warnings.catch_warnings():
-                    warnings.simplefilter("error", OptimizeWarning)
-                    try:
-                        params, covariance = curve_fit(exp_func, x, y, p0=initial_params, 
-                                           bounds=([0, -1, -np.inf], [np.inf, 1, np.inf]), 
-                                           maxfev=5000)
-                        y_fit_curve = exp_func(x_fit, *params)
-                    except (RuntimeError, OptimizeWarning) as e:
-                        raise ValueError(f"Curve fitting failed: {e}")
-
+                # Starts are seeded from closed-form log-linear estimates and refined with analytic Jacobians
+                with span("fit"):
+                    params, covariance, info = fit_nonlinear(method, x, y, initial_params=initial_params)
+                with np.errstate(over="ignore"):
+                    y_fit_curve = model_function(method)(x_fit, *params)
 
             else:
-                raise ValueError("Unsupported method. Choose from 'linear', 'polynomial', or 'exponential'.")
+                raise ValueError("Unsupported method. Choose from 'linear', 'polynomial', 'exponential', 'logistic' or 'power'.")
 
             # create result DataFrame
             fitted_data = pd.DataFrame({"x": x_fit, "y": y_fit_curve})
 
+            if bands:
+                with span("bands"):
+                    info["bands"] = compute_bands(method, params, covariance, x, y, x_fit, confidence_level=confidence_level, bootstrap_samples=bootstrap_samples)
+
+            if full_output:
+                return params, covariance, fitted_data, info
             return params, covariance, fitted_data
 
+        except EngineTimeoutError:
+            raise  # Of the tasks spread across the pool
         except Exception as e:
             raise ValueError(ERROR_INFORMATION.format(FIT_CURVE_PROCESS,e))
 
-    def oversample_data(dataset: pd.DataFrame, x_feature: str, y_feature: str, method: str = SMOTE_METHOD, oversample_factor: int = DEFAULT_OVERSAMPLE_FACTOR) -> pd.DataFrame:
+    @staticmethod
+    def fit_curves(dataset: pd.DataFrame, x_feature: str, y_features: list, method: str = LINEAR_METHOD, degree: int = 2, initial_params: list = None):
+        """
+        Fit many y columns against one x column in a single call.
+
+        Linear and polynomial fits share one QR factorization of the Vandermonde
+        matrix and solve all columns as one least-squares system. Nonlinear fits
+        are independent problems and are spread across the shared process pool.
+
+        :param dataset: pandas.DataFrame, the input dataset
+        :param x_feature: str, the column name for the independent variable (x-axis)
+        :param y_features: list, the column names of the dependent variables
+        :param method: str, the type of curve fitting ("linear", "polynomial", "exponential", "logistic", "power")
+        :param degree: int, the degree of the polynomial (only used for "polynomial" method)
+        :param initial_params: list, extra starting point for the nonlinear methods
+        :return: tuple (results, errors)
+                 - results: dict mapping each y column to (params, covariance, fitted_data)
+                 - errors: dict mapping each y column that could not be fitted to its message
+        """
+        try:
+            missing = [col for col in [x_feature, *y_features] if col not in dataset.columns]
+            if missing:
+                raise ValueError(f"Columns {missing} not found in dataset")
+            try:
+                degree = int(degree)
+            except ValueError:
+                raise ValueError(INVALID_DEGREE)
+
+            x = np.asarray(dataset[x_feature].values, dtype=np.float64)
+            Y = np.asarray(dataset[list(y_features)].values, dtype=np.float64)
+            x_fit = np.linspace(np.nanmin(x), np.nanmax(x), DEFAULT_POINT_NUMBER)
+            results, errors = {}, {}
+
+            if method in (LINEAR_METHOD, POLYNOMIAL_METHOD):
+                fit_degree = LINEAR_DEGREE if method == LINEAR_METHOD else degree
+                rows = np.isfinite(x)
+                complete = np.all(np.isfinite(Y[rows]), axis=ROW_INDEX)
+
+                # Columns without gaps share the same design matrix and factorization
+                shared = [i for i in range(len(y_features)) if complete[i]]
+                if shared:
+                    coeffs, covariances = Engine._solve_polynomial_system(x[rows], Y[rows][:, shared], fit_degree)
+                    for j, i in enumerate(shared):
+                        results[y_features[i]] = (coeffs[:, j], covariances[j], pd.DataFrame({"x": x_fit, "y": np.polyval(coeffs[:, j], x_fit)}))
+
+                for i in range(len(y_features)):
+                    if complete[i]:
+                        continue
+                    mask = rows & np.isfinite(Y[:, i])
+                    try:
+                        coeffs, covariances = Engine._solve_polynomial_system(x[mask], Y[mask][:, [i]], fit_degree)
+                        results[y_features[i]] = (coeffs[:, 0], covariances[0], pd.DataFrame({"x": x_fit, "y": np.polyval(coeffs[:, 0], x_fit)}))
+                    except ValueError as e:
+                        errors[y_features[i]] = str(e)
+
+            elif method in NONLINEAR_METHODS:
+                tasks = [(x, Y[:, i], method, degree, initial_params) for i in range(len(y_features))]
+                outcomes = map_in_pool(_fit_curve_task, tasks)
+                for name, (result, error) in zip(y_features, outcomes):
+                    if error is None:
+                        results[name] = result
+                    else:
+                        errors[name] = error
+
+            else:
+                raise ValueError("Unsupported method. Choose from 'linear', 'polynomial', 'exponential', 'logistic' or 'power'.")
+
+            return results, errors
+
+        except EngineTimeoutError:
+            raise  # Of the tasks spread across the pool
+        except Exception as e:
+            raise ValueError(ERROR_INFORMATION.format(FIT_CURVE_PROCESS,e))
+
+    @staticmethod
+    def select_polynomial_degree(x: np.ndarray, y: np.ndarray, max_degree: int = AUTO_MAX_DEGREE, folds: int = CROSS_VALIDATION_FOLDS):
+        """
+        Select a polynomial degree in 1..max_degree by k-fold cross-validation.
+
+        Each fold factorizes its training Vandermonde matrix once with QR. Since the
+        columns are ordered by increasing power, the fit of degree d only needs the
+        leading (d+1) block of R and of Q^T y, so every degree reuses the same
+        factorization. Folds are evaluated in parallel threads.
+
+        :param x: numpy.ndarray, independent variable
+        :param y: numpy.ndarray, dependent variable
+        :param max_degree: int, highest degree evaluated
+        :param folds: int, number of cross-validation folds
+        :return: tuple (degree, cv_errors) where cv_errors lists the mean validation
+                 squared error of every evaluated degree (None when not identifiable)
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        mask = np.isfinite(x) & np.isfinite(y)
+        x, y = x[mask], y[mask]
+        folds = min(folds, x.size)
+        if folds < 2 or x.size < 3:
+            raise ValueError(NOT_ENOUGH_POINTS_FOR_CV.format(3))
+
+        # Map x to [-1, 1] so high powers stay well conditioned
+        center = (np.max(x) + np.min(x)) / 2
+        half_range = (np.max(x) - np.min(x)) / 2 or 1.0
+        x = (x - center) / half_range
+
+        solve_triangular = load_backend("solve_triangular")
+        order = np.random.default_rng(RANDOM_STATE).permutation(x.size)
+        test_splits = np.array_split(order, folds)
+        max_degree = max(1, min(int(max_degree), x.size - x.size // folds - 2))
+
+        def fold_errors(test_index):
+            train = np.ones(x.size, dtype=bool)
+            train[test_index] = False
+            q, r = np.linalg.qr(np.vander(x[train], max_degree + 1, increasing=True))
+            qty = q.T @ y[train]
+            test_vandermonde = np.vander(x[test_index], max_degree + 1, increasing=True)
+            diagonal = np.abs(np.diag(r))
+            errors = np.full(max_degree, np.inf)
+            for d in range(1, max_degree + 1):
+                if diagonal[d] <= RANK_TOLERANCE * diagonal[0]:
+                    break
+                coeffs = solve_triangular(r[:d + 1, :d + 1], qty[:d + 1])
+                errors[d - 1] = np.mean((test_vandermonde[:, :d + 1] @ coeffs - y[test_index]) ** 2)
+            return errors
+
+        with ThreadPoolExecutor(max_workers=folds) as pool:
+            errors = np.mean(list(pool.map(fold_errors, test_splits)), axis=ROW_INDEX)
+
+        degree = int(np.argmin(errors)) + 1
+        cv_errors = [float(error) if np.isfinite(error) else None for error in errors]
+        return degree, cv_errors
+
+    @staticmethod
+    def _solve_polynomial_system(x: np.ndarray, Y: np.ndarray, degree: int):
+        """
+        Least-squares polynomial fit of every column of Y against x with one QR factorization.
+
+        :return: tuple (coeffs, covariances) where coeffs has one column per y column,
+                 highest power first as in np.polyfit, and covariances is a list of
+                 parameter covariance matrices (None when there are no residual degrees of freedom)
+        """
+        n_params = degree + 1
+        if x.size < n_params:
+            raise ValueError(NOT_ENOUGH_POINTS.format(x.size, degree))
+
+        vandermonde = np.vander(x, n_params)
+        # Column scaling keeps high degree Vandermonde matrices well conditioned
+        scale = np.sqrt(np.sum(vandermonde ** 2, axis=ROW_INDEX))
+        scale[scale == 0] = 1.0
+        q, r = np.linalg.qr(vandermonde / scale)
+        diagonal = np.abs(np.diag(r))
+        if diagonal.min() <= RANK_TOLERANCE * diagonal.max():
+            raise ValueError(DEGENERATE_X_VALUES.format(degree))
+
+        solve_triangular = load_backend("solve_triangular")
+        coeffs = solve_triangular(r, q.T @ Y) / scale[:, None]
+
+        dof = x.size - n_params
+        if dof <= 0:
+            return coeffs, [None] * Y.shape[COLUMN_INDEX]
+        residuals = Y - vandermonde @ coeffs
+        variances = np.sum(residuals ** 2, axis=ROW_INDEX) / dof
+        r_inv = solve_triangular(r, np.eye(n_params))
+        unscaled = (r_inv @ r_inv.T) / np.outer(scale, scale)
+        return coeffs, [variance * unscaled for variance in variances]
+
+    def oversample_data(dataset: pd.DataFrame, x_feature: str, y_feature: str, method: str = SMOTE_METHOD, oversample_factor: int = DEFAULT_OVERSAMPLE_FACTOR, features: list = None, n_jobs: int = -1, approximate: bool = None) -> pd.DataFrame:
         """
         Perform oversampling.
 
         :param dataset: pandas.DataFrame, input data containing the features to oversample
         :param x_feature: str, the column name for the independent variable (x-axis)
         :param y_feature: str, the column name for the dependent variable (y-axis)
-        :param method: str, interpolation method ("linear", "spline", "polynomial")
+        :param method: str, oversampling method ("smote" or "random")
         :param oversample_factor: int, the value of oversample factor
+        :param features: list, feature columns SMOTE interpolates in (default: [x_feature])
+        :param n_jobs: int, cores used by the neighbour search (-1 uses all of them)
+        :param approximate: bool, use approximate neighbours (default: only for large classes)
         :return: pandas.DataFrame, oversampled data
         """
         try:
-            # Ensure that x_feature and y_feature exist in the DataFrame
-            if x_feature not in dataset.columns or y_feature not in dataset.columns:
-                raise ValueError(INVALID_FEATURES.format(x_feature,y_feature))
+            features = list(features or [x_feature])
+            # Ensure that the features and y_feature exist in the DataFrame
+            if y_feature not in dataset.columns or not all(feature in dataset.columns for feature in features):
+                raise ValueError(INVALID_FEATURES.format(features, y_feature))
             
             else:
-                X = dataset[[x_feature]].values
+                X = dataset[features].values
                 y = dataset[y_feature].values
                 class_counts = dataset[y_feature].value_counts()
-                num_classes = dataset[y_feature].nunique()
-                if num_classes == 2:
-                    min_class = class_counts.idxmin()  # Get min class
-                    max_class = class_counts.idxmax()  # Get max class
-
-                    minority_count = class_counts[min_class]
-                    majority_count = class_counts[max_class]
-
-                    target_minority_count = int(majority_count * oversample_factor)
-                    sampling_strategy = target_minority_count / majority_count
-                else:
-                    sampling_strategy = {cls: max(int(count * oversample_factor), count + 1) for cls, count in class_counts.items()}
+                sampling_strategy = oversample_targets(class_counts, oversample_factor)
 
                 #Use SMOTE to oversample.
                 if method == SMOTE_METHOD:
                     min_samples = min(class_counts.values)
                     n_neighbors = max(1, min(5, min_samples - 1))
-                    oversampler = SMOTE(sampling_strategy=sampling_strategy, random_state=RANDOM_STATE, k_neighbors=n_neighbors)
+                    largest_class = max(class_counts[cls] for cls in sampling_strategy)
+                    neighbors = neighbors_estimator(largest_class, n_neighbors, n_jobs, approximate)
+                    oversampler = load_backend(SMOTE_METHOD)(sampling_strategy=sampling_strategy, random_state=RANDOM_STATE, k_neighbors=neighbors)
 
                 #Use random to oversample.
                 elif method == RANDOM_METHOD:
-                    oversampler = RandomOverSampler(sampling_strategy=sampling_strategy, random_state=RANDOM_STATE)
+                    oversampler = load_backend("random_oversampler")(sampling_strategy=sampling_strategy, random_state=RANDOM_STATE)
                 
                 else:
                     raise ValueError(INVALID_OVERSAMPLE_METHOD)
@@ -458,10 +829,104 @@ class Engine:
                 X_resampled, y_resampled = oversampler.fit_resample(X, y)
 
                 # Build DataFrame
-                oversampled_data = pd.DataFrame(X_resampled, columns=[x_feature])
+                oversampled_data = pd.DataFrame(X_resampled, columns=features)
                 oversampled_data[y_feature] = y_resampled
 
                 return oversampled_data
 
         except Exception as e:
             raise ValueError(ERROR_INFORMATION.format(OVERSAMPLE_PROCESS,e))
+
+    @staticmethod
+    def detect_outliers(dataset: pd.DataFrame, method: str = "zscore", features: list = None, threshold: float = None, contamination="auto", sample_rows: int = OUTLIER_SAMPLE_ROWS, cache_key: str = None) -> np.ndarray:
+        """
+        Flag outlying rows.
+
+        "zscore", "mad" and "iqr" test every numeric column at once and flag a row
+        when any of its values is extreme. "isolation_forest" and "lof" score whole
+        rows with a model fitted on at most sample_rows sampled rows.
+
+        :param dataset: pandas.DataFrame, the input dataset
+        :param method: str, "zscore", "mad", "iqr", "isolation_forest" or "lof"
+        :param features: list, columns to examine (default: all numeric columns)
+        :param threshold: float, cut-off of the univariate methods (default per method)
+        :param contamination: "auto" or float, expected share of outliers for the models
+        :param sample_rows: int, maximum number of rows the models are fitted on
+        :param cache_key: str, Dataset.cache_key of the source dataset (None disables caching)
+        :return: numpy.ndarray of bool, True for every outlying row
+        """
+        try:
+            data = dataset[features] if features else dataset
+            numeric_data = data.select_dtypes(include=[ALL_NUMERIC_TYPES])
+            if numeric_data.empty:
+                raise ValueError(ERROR_OUTLIER_DATA)
+            X = numeric_data.to_numpy(dtype=np.float64)
+            return outlier_mask(X, method, threshold, contamination, sample_rows, cache_key, tuple(numeric_data.columns))
+        except Exception as e:
+            raise ValueError(ERROR_INFORMATION.format(OUTLIER_PROCESS, e))
+
+    @staticmethod
+    def cluster(data: pd.DataFrame, method: str = "kmeans", n_clusters: int = 8, eps: float = 0.5, min_samples: int = 5, sample_rows: int = CLUSTER_SAMPLE_ROWS, standardize: bool = True) -> np.ndarray:
+        """
+        Assign every row to a cluster, e.g. to colour a scatter plot.
+
+        :param data: pandas.DataFrame, raw features or an embedding from dimensional_reduction
+        :param method: str, "kmeans" (MiniBatchKMeans), "dbscan" or "hdbscan"
+        :param n_clusters: int, number of clusters for kmeans
+        :param eps: float, neighbourhood radius for dbscan
+        :param min_samples: int, core point density for dbscan and hdbscan
+        :param sample_rows: int, rows the density-based methods are fitted on; the rest
+                            are assigned to the nearest cluster centroid
+        :param standardize: bool, scale every column to unit variance first (for raw features)
+        :return: numpy.ndarray of int labels, -1 for noise
+        """
+        try:
+            numeric_data = data.select_dtypes(include=[ALL_NUMERIC_TYPES])
+            if numeric_data.empty:
+                raise ValueError(ERROR_CLUSTER_DATA)
+            X = numeric_data.to_numpy(dtype=np.float64)
+            X = np.where(np.isnan(X), np.nanmedian(X, axis=0), X)
+            if standardize:
+                scale = X.std(axis=0)
+                X = (X - X.mean(axis=0)) / np.where(scale > 0, scale, 1.0)
+            return cluster_labels(X, method, int(n_clusters), float(eps), int(min_samples), int(sample_rows))
+        except Exception as e:
+            raise ValueError(ERROR_INFORMATION.format(CLUSTER_PROCESS, e))
+
+    @staticmethod
+    def oversample_stream(dataset: pd.DataFrame, y_feature: str, features: list, method: str = SMOTE_METHOD, oversample_factor: int = DEFAULT_OVERSAMPLE_FACTOR, chunk_rows: int = OVERSAMPLE_CHUNK_ROWS, n_jobs: int = -1, approximate: bool = None):
+        """
+        Oversample like oversample_data, yielding the result in chunks of at most chunk_rows rows.
+
+        The original rows come first, then the synthetic rows of each class as they
+        are generated, so a large oversample is never held in memory at once.
+
+        :return: generator of pandas.DataFrame chunks with the features and y_feature columns
+        """
+        if y_feature not in dataset.columns or not all(feature in dataset.columns for feature in features):
+            raise ValueError(INVALID_FEATURES.format(features, y_feature))
+        columns = list(features) + [y_feature]
+        for start in range(0, len(dataset), chunk_rows):
+            yield dataset[columns].iloc[start:start + chunk_rows].reset_index(drop=True)
+
+        X = dataset[features].to_numpy(dtype=np.float64)
+        y = dataset[y_feature].to_numpy()
+        targets = oversample_targets(dataset[y_feature].value_counts(), oversample_factor)
+        for X_new, y_new in synthetic_chunks(X, y, targets, method, chunk_rows=chunk_rows, n_jobs=n_jobs, approximate=approximate, random_state=RANDOM_STATE):
+            chunk = pd.DataFrame(X_new, columns=features)
+            chunk[y_feature] = y_new
+            yield chunk
+
+
+
+def _fit_curve_task(task):
+    """
+    Worker-pool entry point fitting one (x, y) pair; returns (result, error message).
+    """
+    x, y, method, degree, initial_params = task
+    mask = np.isfinite(x) & np.isfinite(y)
+    try:
+        result = Engine.fit_curve(pd.DataFrame({"x": x[mask], "y": y[mask]}), "x", "y", method=method, degree=degree, initial_params=initial_params)
+        return result, None
+    except Exception as e:
+        return None, str(e)
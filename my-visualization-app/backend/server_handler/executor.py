@@ -0,0 +1,237 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from asgiref.sync import sync_to_async
+
+from backend.server_handler.cancellation import CancellationToken, OperationCancelled, OperationInterrupted, kill_delay
+from backend.server_handler.engine import Engine
+from backend.server_handler.timing import current_timings, recording, span, timed
+from backend.server_handler.worker_pool import get_process_pool, pool_size, reset_process_pool, result_within, \
+    retire_process_pool, task_timeout, EngineTimeoutError, ENGINE_TIMEOUT
+
+SHARED_MEMORY_MIN_BYTES = 1 << 20  # Smaller frames are cheaper to pickle than to place in shared memory
+COLUMN_ALIGNMENT = 64  # Bytes; every column starts on a cache line
+NUMERIC_KINDS = "biuf"
+
+ENGINE_WORKER_DIED = "The worker running {} stopped unexpectedly."
+
+# Threads for computations async views run in this process, e.g. because they use its caches
+_compute_executor = ThreadPoolExecutor(thread_name_prefix="compute")
+
+
+class SharedFrame(object):
+    """
+    A DataFrame whose numeric columns are copied once into a shared memory block.
+
+    Pickling it sends only the block name and the column layout (plus any
+    non-numeric columns), so a worker reads the data from memory instead of
+    receiving it through a pipe. The creating process must call release().
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        numeric = [column for column in frame.columns if frame[column].dtype.kind in NUMERIC_KINDS]
+        self.columns = list(frame.columns)
+        self.index = frame.index
+        self.other = frame.drop(columns=numeric)
+        self.layout = []
+        size = 0
+        for column in numeric:
+            values = frame[column].to_numpy()
+            self.layout.append((column, values.dtype.str, size, len(values)))
+            size += -(-values.nbytes // COLUMN_ALIGNMENT) * COLUMN_ALIGNMENT
+        self._block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.name = self._block.name
+        for column, dtype, offset, length in self.layout:
+            np.ndarray(length, dtype=dtype, buffer=self._block.buf, offset=offset)[:] = frame[column].to_numpy()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_block"]
+        return state
+
+    def load(self) -> pd.DataFrame:
+        """
+        Copy the frame out of shared memory (in a worker) and detach from the block.
+        """
+        block = shared_memory.SharedMemory(name=self.name)
+        try:
+            columns = {column: np.ndarray(length, dtype=dtype, buffer=block.buf, offset=offset).copy()
+                       for column, dtype, offset, length in self.layout}
+        finally:
+            block.close()
+        frame = pd.DataFrame(columns, index=self.index)
+        for column in self.other.columns:
+            frame[column] = self.other[column]
+        return frame[self.columns]
+
+    def release(self):
+        self._block.close()
+        self._block.unlink()
+
+
+def _engine_task(operation: str, data, args: tuple, kwargs: dict, token: CancellationToken = None):
+    if token is None:
+        token = CancellationToken()
+    with token.running():
+        if isinstance(data, SharedFrame):
+            with span("load"):
+                data = data.load()
+        return getattr(Engine, operation)(data, *args, **kwargs)
+
+
+def _timed_engine_task(operation: str, data, args: tuple, kwargs: dict, token: CancellationToken = None):
+    """
+    _engine_task for a request being timed: returns the result with the spans recorded in the worker.
+    """
+    with recording() as timings:
+        result = _engine_task(operation, data, args, kwargs, token)
+    return result, timings.as_dict()
+
+
+def _submit(operation: str, data, args: tuple, kwargs: dict, token: CancellationToken):
+    task = _engine_task if current_timings() is None else _timed_engine_task
+    return get_process_pool().submit(task, operation, data, args, kwargs, token)
+
+
+def _submit_call(operation: str, data: pd.DataFrame, args: tuple, kwargs: dict):
+    """
+    Submit a call to the pool, with its input in shared memory if large.
+
+    The block is released once the call is done, not when its caller stops
+    waiting: a task that timed out may still be queued and read it later.
+    """
+    shared = _shared_input(data)
+    token = CancellationToken(shared=True)
+    try:
+        future = _submit(operation, shared or data, args, kwargs, token)
+    except BaseException:
+        if shared is not None:
+            shared.release()
+        raise
+    future.add_done_callback(_task_done(token, shared))
+    return future, token
+
+
+def _task_done(token: CancellationToken, shared: SharedFrame = None):
+    """
+    Done-callback of a submitted call: removes its flag files and shared input, and retires the
+    pool if a signal interrupted the call, since its worker may have stopped while holding a lock.
+    """
+    def done(future):
+        token.close()
+        if shared is not None:
+            shared.release()
+        if not future.cancelled() and isinstance(future.exception(), OperationInterrupted):
+            retire_process_pool()
+    return done
+
+
+def _engine_result(outcome):
+    """
+    Result of a submitted call, adding the spans a timed one recorded in its worker to the request's.
+    """
+    timings = current_timings()
+    if timings is None:
+        return outcome
+    result, spans = outcome
+    timings.merge(spans)
+    return result
+
+
+def _shared_input(data: pd.DataFrame):
+    return SharedFrame(data) if data.memory_usage(index=False).sum() >= SHARED_MEMORY_MIN_BYTES else None
+
+
+@timed("engine")
+def run_engine(operation: str, data: pd.DataFrame, /, *args, timeout: float = None, **kwargs):
+    """
+    Run Engine.<operation>(data, *args, **kwargs) in the shared process pool.
+
+    CPU-bound calls from concurrent requests then run on separate cores instead of
+    taking turns on the GIL. Frames of SHARED_MEMORY_MIN_BYTES or more are passed
+    through shared memory. Exceptions raised by the Engine are re-raised unchanged.
+    With a pool size of 0 the call runs inline.
+
+    A call that times out, or whose caller's computation is cancelled (see
+    cancellation.check), is cancelled, so that its worker stops working on it
+    (see arun_engine).
+
+    :param operation: str, name of an Engine static method taking a DataFrame first
+    :param data: pandas.DataFrame, the first argument of the method
+    :param timeout: float, seconds to wait (default: the pool's task timeout)
+    :raises EngineTimeoutError: if no result arrives in time
+    :raises OperationCancelled: if the caller's computation is cancelled meanwhile
+    """
+    if pool_size() == 0:
+        return getattr(Engine, operation)(data, *args, **kwargs)
+
+    timeout = task_timeout() if timeout is None else timeout
+    future, token = _submit_call(operation, data, args, kwargs)
+    try:
+        return _engine_result(result_within(future, timeout))
+    except FutureTimeoutError:
+        future.cancel()
+        token.cancel(kill_delay())
+        raise EngineTimeoutError(ENGINE_TIMEOUT.format(operation, timeout))
+    except OperationCancelled:
+        future.cancel()
+        token.cancel(kill_delay())
+        raise
+    except BrokenProcessPool:
+        reset_process_pool()
+        raise RuntimeError(ENGINE_WORKER_DIED.format(operation))
+
+
+@timed("engine")
+async def arun_engine(operation: str, data: pd.DataFrame, /, *args, timeout: float = None, **kwargs):
+    """
+    run_engine for async views: the event loop serves other requests while the pool computes.
+
+    A call that times out or whose caller is cancelled (e.g. the client went
+    away) is stopped, so that its worker is free for other work:
+    the Engine raises OperationCancelled at its next cancellation point, and code
+    between such points is interrupted by a signal, after which the pool is
+    replaced once its tasks are done. Only a hard cancel, or a configured kill
+    delay, kills a worker that still has not stopped (see cancellation).
+
+    With a pool size of 0 the call runs in the compute threads instead.
+    """
+    if pool_size() == 0:
+        return await run_in_thread(getattr(Engine, operation), data, *args, **kwargs)
+
+    timeout = task_timeout() if timeout is None else timeout
+    future, token = _submit_call(operation, data, args, kwargs)
+    try:
+        return _engine_result(await asyncio.wait_for(asyncio.wrap_future(future), timeout))
+    except asyncio.TimeoutError:
+        token.cancel(kill_delay())
+        raise EngineTimeoutError(ENGINE_TIMEOUT.format(operation, timeout))
+    except asyncio.CancelledError:
+        token.cancel(kill_delay())
+        raise
+    except BrokenProcessPool:
+        reset_process_pool()
+        raise RuntimeError(ENGINE_WORKER_DIED.format(operation))
+
+
+async def run_in_thread(func, /, *args, **kwargs):
+    """
+    Await func(*args, **kwargs) computed in a thread of this process, so that it does not block the event loop.
+
+    If the caller is cancelled, func raises OperationCancelled at its next cancellation point.
+    """
+    token = CancellationToken()
+
+    def call():
+        with token.active():
+            return func(*args, **kwargs)
+
+    try:
+        return await sync_to_async(call, thread_sensitive=False, executor=_compute_executor)()
+    except asyncio.CancelledError:
+        token.cancel()
+        raise
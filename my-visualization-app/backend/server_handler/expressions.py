@@ -0,0 +1,193 @@
+import ast
+import operator
+from functools import lru_cache
+
+import numpy as np
+
+COLUMN_FUNCTION = "col"
+EXPRESSION_CACHE_SIZE = 256
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+UNARY_OPERATORS = {
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+    ast.Not: np.logical_not,
+    ast.Invert: np.logical_not,
+}
+COMPARISON_OPERATORS = {
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+BOOLEAN_OPERATORS = {
+    ast.And: np.logical_and,
+    ast.Or: np.logical_or,
+}
+# NumPy functions that may be called in an expression, all applied to whole columns
+FUNCTIONS = {
+    "abs": np.abs,
+    "sqrt": np.sqrt,
+    "square": np.square,
+    "exp": np.exp,
+    "log": np.log,
+    "log2": np.log2,
+    "log10": np.log10,
+    "log1p": np.log1p,
+    "sin": np.sin,
+    "cos": np.cos,
+    "tan": np.tan,
+    "arcsin": np.arcsin,
+    "arccos": np.arccos,
+    "arctan": np.arctan,
+    "arctan2": np.arctan2,
+    "sinh": np.sinh,
+    "cosh": np.cosh,
+    "tanh": np.tanh,
+    "floor": np.floor,
+    "ceil": np.ceil,
+    "round": np.round,
+    "sign": np.sign,
+    "minimum": np.minimum,
+    "maximum": np.maximum,
+    "clip": np.clip,
+    "where": np.where,
+    "isnan": np.isnan,
+    "isfinite": np.isfinite,
+    "hypot": np.hypot,
+    "power": np.power,
+}
+CONSTANTS = {
+    "pi": np.pi,
+    "e": np.e,
+    "nan": np.nan,
+    "inf": np.inf,
+    "True": True,
+    "False": False,
+}
+
+INVALID_EXPRESSION = "Invalid expression '{}': {}"
+UNSUPPORTED_SYNTAX = "unsupported syntax {}"
+UNKNOWN_FUNCTION = "unknown function '{}'"
+INVALID_COLUMN_REFERENCE = "col() takes a single column name string"
+UNKNOWN_COLUMN = "Column '{}' not found in dataset"
+INVALID_OPERANDS = "Cannot evaluate '{}' on these columns: {}"
+
+
+class Expression(object):
+    """
+    An arithmetic expression over dataset columns, compiled once into a tree of
+    NumPy calls so that evaluating it touches whole columns and never single rows.
+
+    Columns are referenced by name, or with col("name") when the name is not a
+    Python identifier or clashes with a constant such as e or pi.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        try:
+            tree = ast.parse(text.strip(), mode="eval")
+            self.columns = set()
+            self._evaluate = self._compile(tree.body)
+        except (SyntaxError, ValueError) as e:
+            raise ValueError(INVALID_EXPRESSION.format(text, e))
+
+    def evaluate(self, columns) -> np.ndarray:
+        """
+        Evaluate the expression.
+
+        :param columns: mapping of column name to numpy.ndarray (e.g. a DataFrame or a dict)
+        :return: numpy.ndarray, or a scalar when no column is referenced
+        :raises ValueError: also when an operation does not apply to a column, e.g. log of text,
+                            or overflows on one of Python numbers
+        """
+        for name in self.columns:
+            if name not in columns:
+                raise ValueError(UNKNOWN_COLUMN.format(name))
+        try:
+            with np.errstate(all="ignore"):
+                return self._evaluate(columns)
+        except (TypeError, OverflowError) as e:
+            raise ValueError(INVALID_OPERANDS.format(self.text, e))
+
+    def _compile(self, node):
+        if isinstance(node, ast.Constant):
+            if not isinstance(node.value, (int, float, bool)):
+                raise ValueError(UNSUPPORTED_SYNTAX.format(repr(node.value)))
+            # Numbers become float64, whose arithmetic is bounded, unlike Python's big integers (e.g. 9**9**9)
+            value = node.value if isinstance(node.value, bool) else np.float64(node.value)
+            return lambda columns: value
+        if isinstance(node, ast.Name):
+            if node.id in CONSTANTS:
+                value = CONSTANTS[node.id]
+                return lambda columns: value
+            return self._column(node.id)
+        if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+            op = BINARY_OPERATORS[type(node.op)]
+            left, right = self._compile(node.left), self._compile(node.right)
+            return lambda columns: op(left(columns), right(columns))
+        if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+            op = UNARY_OPERATORS[type(node.op)]
+            operand = self._compile(node.operand)
+            return lambda columns: op(operand(columns))
+        if isinstance(node, ast.BoolOp) and type(node.op) in BOOLEAN_OPERATORS:
+            op = BOOLEAN_OPERATORS[type(node.op)]
+            values = [self._compile(value) for value in node.values]
+
+            def boolean(columns):
+                result = values[0](columns)
+                for value in values[1:]:
+                    result = op(result, value(columns))
+                return result
+            return boolean
+        if isinstance(node, ast.Compare) and all(type(op) in COMPARISON_OPERATORS for op in node.ops):
+            ops = [COMPARISON_OPERATORS[type(op)] for op in node.ops]
+            operands = [self._compile(node.left)] + [self._compile(comparator) for comparator in node.comparators]
+
+            def compare(columns):
+                values = [operand(columns) for operand in operands]
+                result = ops[0](values[0], values[1])
+                for i in range(1, len(ops)):
+                    result = np.logical_and(result, ops[i](values[i], values[i + 1]))
+                return result
+            return compare
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            if node.func.id == COLUMN_FUNCTION:
+                if len(node.args) != 1 or not isinstance(node.args[0], ast.Constant) or not isinstance(node.args[0].value, str):
+                    raise ValueError(INVALID_COLUMN_REFERENCE)
+                return self._column(node.args[0].value)
+            if node.func.id not in FUNCTIONS:
+                raise ValueError(UNKNOWN_FUNCTION.format(node.func.id))
+            function = FUNCTIONS[node.func.id]
+            args = [self._compile(arg) for arg in node.args]
+            return lambda columns: function(*(arg(columns) for arg in args))
+        raise ValueError(UNSUPPORTED_SYNTAX.format(type(node).__name__))
+
+    def _column(self, name):
+        self.columns.add(name)
+        return lambda columns: np.asarray(columns[name])
+
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def parse_expression(text: str) -> Expression:
+    """
+    Compile an expression, reusing the compiled tree for repeated texts.
+    """
+    return Expression(text)
+
+
+def evaluate_expression(text: str, columns) -> np.ndarray:
+    """
+    Evaluate an expression over a mapping of columns, such as a DataFrame.
+    """
+    return parse_expression(text).evaluate(columns)
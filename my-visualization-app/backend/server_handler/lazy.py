@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+
+from backend.server_handler.expressions import parse_expression
+
+SELECT_OPERATION = "select"
+FILTER_OPERATION = "filter"
+DERIVE_OPERATION = "derive"
+DROP_OPERATION = "drop"
+
+UNKNOWN_OPERATION = "Unknown lazy operation: {}"
+MISSING_COLUMNS = "Columns {} not found in dataset"
+MISSING_EXPRESSION = "Operation '{}' needs an expression"
+MISSING_NAME = "A derived column needs a name"
+FILTER_NOT_BOOLEAN = "Filter expression '{}' does not produce a boolean per row"
+
+
+def normalize_plan(plan: list) -> list:
+    """
+    Validate the structure of a plan, a list of {"op": ..., ...} dicts.
+    """
+    normalized = []
+    for step in plan:
+        op = step.get("op")
+        if op in (SELECT_OPERATION, DROP_OPERATION):
+            normalized.append({"op": op, "columns": list(step.get("columns", []))})
+        elif op == FILTER_OPERATION:
+            if not step.get("expression"):
+                raise ValueError(MISSING_EXPRESSION.format(op))
+            normalized.append({"op": op, "expression": step["expression"]})
+        elif op == DERIVE_OPERATION:
+            if not step.get("name"):
+                raise ValueError(MISSING_NAME)
+            if not step.get("expression"):
+                raise ValueError(MISSING_EXPRESSION.format(op))
+            normalized.append({"op": op, "name": step["name"], "expression": step["expression"]})
+        else:
+            raise ValueError(UNKNOWN_OPERATION.format(op))
+    return normalized
+
+
+def plan_features(features: list, plan: list) -> list:
+    """
+    Column names produced by a plan, computed without touching any data.
+
+    Raises ValueError when a step refers to a column that does not exist at that point.
+    """
+    features = list(features)
+    for step in plan:
+        if step["op"] in (SELECT_OPERATION, DROP_OPERATION):
+            missing = [column for column in step["columns"] if column not in features]
+            if missing:
+                raise ValueError(MISSING_COLUMNS.format(missing))
+            if step["op"] == SELECT_OPERATION:
+                features = list(step["columns"])
+            else:
+                features = [column for column in features if column not in step["columns"]]
+        else:
+            missing = sorted(parse_expression(step["expression"]).columns - set(features))
+            if missing:
+                raise ValueError(MISSING_COLUMNS.format(missing))
+            if step["op"] == DERIVE_OPERATION and step["name"] not in features:
+                features.append(step["name"])
+    return features
+
+
+def optimize_plan(features: list, plan: list):
+    """
+    Rewrite a plan so that it reads and computes as little as possible.
+
+    Selections and drops only change the output schema, so they are folded into
+    a single final projection. Walking the plan backwards gives the columns each
+    step really needs: derived columns nobody reads are removed and only the
+    source columns still needed are loaded (projection pushdown). What remains
+    are filters and derivations, which are fused into one stage evaluated over
+    column arrays without building intermediate DataFrames.
+
+    :param features: list, columns of the source dataset
+    :param plan: list, normalized plan
+    :return: tuple (source columns to load, fused stage, output columns)
+    """
+    output = plan_features(features, plan)
+    needed = set(output)
+    stage = []
+    for step in reversed(plan):
+        if step["op"] == DERIVE_OPERATION:
+            if step["name"] not in needed:
+                continue
+            needed.discard(step["name"])
+            needed |= parse_expression(step["expression"]).columns
+            stage.append(step)
+        elif step["op"] == FILTER_OPERATION:
+            needed |= parse_expression(step["expression"]).columns
+            stage.append(step)
+    stage.reverse()
+    source_columns = [column for column in features if column in needed]
+    return source_columns, stage, output
+
+
+def run_stage(columns: dict, rows: int, stage: list):
+    """
+    Evaluate a fused stage of filters and derivations over a dict of column arrays.
+
+    Every expression works on whole columns; a filter compacts the columns the
+    rest of the stage can still read.
+
+    :return: tuple (columns, number of rows left)
+    """
+    for step in stage:
+        expression = parse_expression(step["expression"])
+        if step["op"] == DERIVE_OPERATION:
+            columns[step["name"]] = np.broadcast_to(expression.evaluate(columns), (rows,)).copy()
+        else:
+            mask = np.broadcast_to(np.asarray(expression.evaluate(columns)), (rows,))
+            if mask.dtype != np.bool_:
+                raise ValueError(FILTER_NOT_BOOLEAN.format(step["expression"]))
+            columns = {name: values[mask] for name, values in columns.items()}
+            rows = int(np.count_nonzero(mask))
+    return columns, rows
+
+
+class LazyFrame(object):
+    """
+    A dataset transformation that is planned now and computed on request.
+
+    :param load: callable(columns) returning a pandas.DataFrame of the source with those columns
+    :param features: list, columns of the source
+    :param plan: list, operations applied to the source
+    """
+
+    def __init__(self, load, features: list, plan: list = None):
+        self.load = load
+        self.source_features = list(features)
+        self.plan = normalize_plan(plan or [])
+        self.columns = plan_features(self.source_features, self.plan)
+
+    def _then(self, step):
+        return LazyFrame(self.load, self.source_features, self.plan + [step])
+
+    def select(self, columns: list):
+        return self._then({"op": SELECT_OPERATION, "columns": columns})
+
+    def drop(self, columns: list):
+        return self._then({"op": DROP_OPERATION, "columns": columns})
+
+    def filter(self, expression: str):
+        return self._then({"op": FILTER_OPERATION, "expression": expression})
+
+    def derive(self, name: str, expression: str):
+        return self._then({"op": DERIVE_OPERATION, "name": name, "expression": expression})
+
+    def collect(self, columns: list = None) -> pd.DataFrame:
+        """
+        Execute the optimized plan.
+
+        :param columns: list, optional subset of the output columns; only what
+                        they depend on is loaded and computed
+        """
+        plan = self.plan if columns is None else self.plan + [{"op": SELECT_OPERATION, "columns": list(columns)}]
+        source_columns, stage, output = optimize_plan(self.source_features, plan)
+        source = self.load(source_columns)
+        arrays = {column: source[column].to_numpy() for column in source_columns}
+        arrays, rows = run_stage(arrays, len(source), stage)
+        return pd.DataFrame({column: arrays[column] for column in output}, index=pd.RangeIndex(rows), columns=output)
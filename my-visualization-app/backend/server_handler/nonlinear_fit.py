@@ -0,0 +1,213 @@
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.server_handler.backends import load_backend
+from backend.server_handler.cancellation import current_token
+
+EXPONENTIAL_MODEL = "exponential"
+LOGISTIC_MODEL = "logistic"
+POWER_MODEL = "power"
+
+MAX_EVALUATIONS_PER_PARAMETER = 100
+SEED_MARGIN = 0.01
+LOGISTIC_MARGIN = 0.05
+MIN_SPAN = 1e-12
+LM_METHOD = "lm"
+TRF_METHOD = "trf"
+
+UNSUPPORTED_MODEL = "Unsupported nonlinear model: {}"
+NOT_ENOUGH_POINTS = "At least {} points are required to fit a {} model."
+POSITIVE_X_REQUIRED = "All x values should be positive for a power law fit."
+NO_CONVERGED_START = "Curve fitting failed: {}"
+
+
+def exponential(x, a, b, c):
+    return a * np.exp(b * x) + c
+
+
+def exponential_jacobian(x, a, b, c):
+    growth = np.exp(b * x)
+    return np.column_stack([growth, a * x * growth, np.ones_like(x)])
+
+
+def exponential_seeds(x, y):
+    """
+    Closed-form starts from a log-linear fit of y - c for offsets just outside the data range.
+    """
+    span = max(np.ptp(y), MIN_SPAN)
+    seeds = []
+    for sign, offset in ((1.0, np.min(y) - SEED_MARGIN * span), (-1.0, np.max(y) + SEED_MARGIN * span)):
+        slope, intercept = np.polyfit(x, np.log(sign * (y - offset)), 1)
+        seeds.append([sign * np.exp(intercept), slope, offset])
+    if np.all(y > 0):
+        slope, intercept = np.polyfit(x, np.log(y), 1)
+        seeds.append([np.exp(intercept), slope, 0.0])
+    return seeds
+
+
+def logistic(x, L, k, x0, d):
+    return d + L / (1.0 + np.exp(-k * (x - x0)))
+
+
+def logistic_jacobian(x, L, k, x0, d):
+    s = 1.0 / (1.0 + np.exp(-k * (x - x0)))
+    slope = L * s * (1.0 - s)
+    return np.column_stack([s, slope * (x - x0), -slope * k, np.ones_like(x)])
+
+
+def logistic_seeds(x, y):
+    """
+    Closed-form starts from a linear fit of the logit of y rescaled into (0, 1).
+    """
+    span = max(np.ptp(y), MIN_SPAN)
+    baseline = np.min(y) - LOGISTIC_MARGIN * span
+    height = span * (1.0 + 2.0 * LOGISTIC_MARGIN)
+    z = (y - baseline) / height
+    slope, intercept = np.polyfit(x, np.log(z / (1.0 - z)), 1)
+    if slope == 0:
+        slope = 1.0 / max(np.ptp(x), MIN_SPAN)
+    midpoint = -intercept / slope
+    return [[height, slope, midpoint, baseline], [height, slope, np.median(x), baseline]]
+
+
+def power(x, a, b):
+    return a * np.power(x, b)
+
+
+def power_jacobian(x, a, b):
+    scaled = np.power(x, b)
+    return np.column_stack([scaled, a * scaled * np.log(x)])
+
+
+def power_seeds(x, y):
+    """
+    Closed-form start from a log-log linear fit on the points of the dominant sign.
+    """
+    sign = 1.0 if np.sum(y > 0) >= np.sum(y < 0) else -1.0
+    mask = sign * y > 0
+    if np.count_nonzero(mask) < 2:
+        return [[sign, 1.0]]
+    slope, intercept = np.polyfit(np.log(x[mask]), np.log(sign * y[mask]), 1)
+    return [[sign * np.exp(intercept), slope]]
+
+
+MODELS = {
+    EXPONENTIAL_MODEL: (exponential, exponential_jacobian, exponential_seeds),
+    LOGISTIC_MODEL: (logistic, logistic_jacobian, logistic_seeds),
+    POWER_MODEL: (power, power_jacobian, power_seeds),
+}
+
+
+def model_function(model: str):
+    """
+    Return the callable f(x, *params) of a registered model.
+    """
+    if model not in MODELS:
+        raise ValueError(UNSUPPORTED_MODEL.format(model))
+    return MODELS[model][0]
+
+
+def model_jacobian(model: str):
+    """
+    Return the analytic Jacobian J(x, *params) of a registered model.
+    """
+    if model not in MODELS:
+        raise ValueError(UNSUPPORTED_MODEL.format(model))
+    return MODELS[model][1]
+
+
+def _solve_from_start(func, jacobian, x, y, start, max_nfev, token=None):
+    def residuals(params):
+        if token is not None:
+            token.check()  # Between evaluations, so that a cancelled fit stops within one
+        return func(x, *params) - y
+
+    def residual_jacobian(params):
+        return jacobian(x, *params)
+
+    method = LM_METHOD if x.size >= len(start) else TRF_METHOD
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        return load_backend("least_squares")(residuals, start, jac=residual_jacobian, method=method, x_scale="jac", max_nfev=max_nfev)
+
+
+def fit_nonlinear(model: str, x: np.ndarray, y: np.ndarray, initial_params: list = None, n_starts: int = None, max_workers: int = None):
+    """
+    Fit a nonlinear model with analytic Jacobians from closed-form starting points.
+
+    Every start is solved independently in a thread pool and the one with the
+    lowest residual cost is kept.
+
+    :param model: str, "exponential", "logistic" or "power"
+    :param x: numpy.ndarray, independent variable
+    :param y: numpy.ndarray, dependent variable
+    :param initial_params: list, optional user supplied start tried alongside the seeds
+    :param n_starts: int, maximum number of starts to run (default: all seeds)
+    :param max_workers: int, number of threads used for the starts
+    :return: tuple (params, covariance, info) where covariance is None when it cannot be
+             estimated and info reports the function and Jacobian evaluations, the
+             optimizer status and whether it converged
+    """
+    if model not in MODELS:
+        raise ValueError(UNSUPPORTED_MODEL.format(model))
+    func, jacobian, seeds = MODELS[model]
+    n_params = func.__code__.co_argcount - 1
+    if x.size < n_params:
+        raise ValueError(NOT_ENOUGH_POINTS.format(n_params, model))
+    if model == POWER_MODEL and np.any(x <= 0):
+        raise ValueError(POSITIVE_X_REQUIRED)
+
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        starts = [np.asarray(start, dtype=np.float64) for start in seeds(x, y)]
+    if initial_params is not None:
+        starts.insert(0, np.asarray(initial_params, dtype=np.float64))
+    starts = [start for start in starts if np.all(np.isfinite(start))][:n_starts]
+
+    max_nfev = MAX_EVALUATIONS_PER_PARAMETER * (n_params + 1)
+    token = current_token()  # The starts run in threads of their own, outside this context
+
+    def attempt(start):
+        try:
+            return _solve_from_start(func, jacobian, x, y, start, max_nfev, token)
+        except (ValueError, np.linalg.LinAlgError) as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max_workers or max(len(starts), 1)) as pool:
+        outcomes = list(pool.map(attempt, starts))
+
+    solutions = [outcome for outcome in outcomes if not isinstance(outcome, Exception) and np.isfinite(outcome.cost)]
+    if not solutions:
+        errors = [str(outcome) for outcome in outcomes if isinstance(outcome, Exception)]
+        raise ValueError(NO_CONVERGED_START.format(errors[0] if errors else "no valid starting point"))
+
+    best = min(solutions, key=lambda solution: solution.cost)
+    covariance = _covariance(best, x.size)
+    info = {
+        "model": model,
+        "nfev": int(best.nfev),
+        "njev": int(best.njev) if best.njev is not None else None,
+        "total_nfev": int(sum(solution.nfev for solution in solutions)),
+        "status": int(best.status),
+        "message": best.message,
+        "converged": bool(best.success and best.status > 0),
+        "n_starts": len(starts),
+        "cost": float(best.cost),
+    }
+    return best.x, covariance, info
+
+
+def _covariance(solution, n_points):
+    """
+    Parameter covariance from the Jacobian at the optimum, as scipy's curve_fit computes it.
+    None when it cannot be estimated, i.e. without residual degrees of freedom or with a
+    rank-deficient Jacobian, where curve_fit returns an infinite matrix (not valid JSON).
+    """
+    n_params = solution.x.size
+    dof = n_points - n_params
+    if dof <= 0:
+        return None
+    _, singular_values, vt = np.linalg.svd(solution.jac, full_matrices=False)
+    threshold = np.finfo(float).eps * max(solution.jac.shape) * singular_values[0]
+    if np.count_nonzero(singular_values > threshold) < n_params:
+        return None
+    covariance = (vt.T / singular_values ** 2) @ vt
+    return covariance * (2.0 * solution.cost / dof)
@@ -0,0 +1,113 @@
+import base64
+
+import numpy as np
+
+from backend.server_handler.backends import load_backend
+from backend.server_handler.cache import LRUCache
+
+ZSCORE_METHOD = "zscore"
+MAD_METHOD = "mad"
+IQR_METHOD = "iqr"
+ISOLATION_FOREST_METHOD = "isolation_forest"
+LOF_METHOD = "lof"
+UNIVARIATE_METHODS = (ZSCORE_METHOD, MAD_METHOD, IQR_METHOD)
+MULTIVARIATE_METHODS = (ISOLATION_FOREST_METHOD, LOF_METHOD)
+
+DEFAULT_THRESHOLDS = {ZSCORE_METHOD: 3.0, MAD_METHOD: 3.5, IQR_METHOD: 1.5}
+MAD_SCALE = 0.6745  # Makes the MAD a consistent estimator of the standard deviation for normal data
+LOWER_QUARTILE = 25
+UPPER_QUARTILE = 75
+OUTLIER_SAMPLE_ROWS = 10000
+OUTLIER_CACHE_SIZE = 32
+LOF_NEIGHBORS = 20
+RANDOM_STATE = 42
+MASK_ENCODING = "packbits-base64"
+
+UNSUPPORTED_OUTLIER_METHOD = "Unsupported outlier detection method: {}. Choose from 'zscore', 'mad', 'iqr', 'isolation_forest' or 'lof'."
+
+_mask_cache = LRUCache(OUTLIER_CACHE_SIZE)
+
+
+def univariate_outliers(X: np.ndarray, method: str, threshold: float = None) -> np.ndarray:
+    """
+    Flag rows where any column is extreme, computed for all columns at once.
+
+    Missing values are never flagged and do not affect the column statistics.
+
+    :param X: numpy.ndarray of shape (n_rows, n_columns)
+    :param method: str, "zscore", "mad" or "iqr"
+    :param threshold: float, cut-off (default: 3 for z-score, 3.5 for MAD, 1.5 IQRs)
+    :return: numpy.ndarray of bool, one flag per row
+    """
+    threshold = DEFAULT_THRESHOLDS[method] if threshold is None else threshold
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if method == ZSCORE_METHOD:
+            scores = np.abs(X - np.nanmean(X, axis=0)) / np.nanstd(X, axis=0)
+            flags = scores > threshold
+        elif method == MAD_METHOD:
+            median = np.nanmedian(X, axis=0)
+            mad = np.nanmedian(np.abs(X - median), axis=0)
+            flags = MAD_SCALE * np.abs(X - median) / mad > threshold
+        else:
+            lower, upper = np.nanpercentile(X, [LOWER_QUARTILE, UPPER_QUARTILE], axis=0)
+            spread = threshold * (upper - lower)
+            flags = (X < lower - spread) | (X > upper + spread)
+    return flags.any(axis=1)
+
+
+def multivariate_outliers(X: np.ndarray, method: str, contamination="auto", sample_rows: int = OUTLIER_SAMPLE_ROWS) -> np.ndarray:
+    """
+    Flag rows with Isolation Forest or LOF fitted on a uniform row sample.
+
+    Fitting is bounded by sample_rows; scoring every row is a vectorized pass
+    (tree traversals or a neighbour query), so the cost grows linearly with the data.
+    Missing values are replaced by the column median.
+
+    :param X: numpy.ndarray of shape (n_rows, n_columns)
+    :param method: str, "isolation_forest" or "lof"
+    :param contamination: "auto" or float, expected share of outliers
+    :param sample_rows: int, maximum number of rows the model is fitted on
+    :return: numpy.ndarray of bool, one flag per row
+    """
+    X = np.where(np.isnan(X), np.nanmedian(X, axis=0), X)
+    rng = np.random.default_rng(RANDOM_STATE)
+    sample = X if len(X) <= sample_rows else X[rng.choice(len(X), size=sample_rows, replace=False)]
+
+    if method == ISOLATION_FOREST_METHOD:
+        model = load_backend("isolation_forest")(contamination=contamination, random_state=RANDOM_STATE, n_jobs=-1)
+    else:
+        model = load_backend("lof")(n_neighbors=min(LOF_NEIGHBORS, len(sample) - 1), contamination=contamination, novelty=True, n_jobs=-1)
+    model.fit(sample)
+    return model.predict(X) == -1
+
+
+def outlier_mask(X: np.ndarray, method: str, threshold: float = None, contamination="auto", sample_rows: int = OUTLIER_SAMPLE_ROWS,
+                 cache_key: str = None, columns: tuple = ()) -> np.ndarray:
+    """
+    Outlier flags of every row, reused for the same dataset version and settings.
+    """
+    if method not in UNIVARIATE_METHODS + MULTIVARIATE_METHODS:
+        raise ValueError(UNSUPPORTED_OUTLIER_METHOD.format(method))
+
+    def build():
+        if method in UNIVARIATE_METHODS:
+            return univariate_outliers(X, method, threshold)
+        return multivariate_outliers(X, method, contamination, sample_rows)
+
+    if cache_key is None:
+        return build()
+    return _mask_cache.get_or_create((cache_key, tuple(columns), method, threshold, contamination, sample_rows), build)
+
+
+def encode_mask(mask: np.ndarray) -> str:
+    """
+    Pack one bit per row (most significant bit first) and encode it as base64.
+    """
+    return base64.b64encode(np.packbits(mask.astype(bool))).decode("ascii")
+
+
+def decode_mask(encoded: str, n_rows: int) -> np.ndarray:
+    """
+    Inverse of encode_mask.
+    """
+    return np.unpackbits(np.frombuffer(base64.b64decode(encoded), dtype=np.uint8), count=n_rows).astype(bool)
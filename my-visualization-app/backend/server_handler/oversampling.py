@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from backend.server_handler.backends import load_backend
+from backend.server_handler.cancellation import check
+
+APPROXIMATE_NN_THRESHOLD = 50000  # Minority classes larger than this use approximate neighbours
+OVERSAMPLE_CHUNK_ROWS = 10000
+DEFAULT_K_NEIGHBORS = 5
+RANDOM_STATE = 42
+
+SMOTE_METHOD = "smote"
+RANDOM_METHOD = "random"
+
+INVALID_OVERSAMPLE_METHOD = "Invalid oversampling method. Choose from 'SMOTE' or 'Random Oversampling'."
+
+
+def neighbors_estimator(n_samples: int, k_neighbors: int, n_jobs: int = -1, approximate: bool = None):
+    """
+    Neighbours object for SMOTE: an exact search parallelised over n_jobs cores, or
+    an approximate one when the class is large (or approximate is True).
+
+    The estimator returns k_neighbors + 1 neighbours, since every point is its own nearest.
+    """
+    if approximate is None:
+        approximate = n_samples > APPROXIMATE_NN_THRESHOLD
+    if approximate:
+        return load_backend("approximate_neighbors")(n_neighbors=k_neighbors + 1, n_jobs=n_jobs)
+    return load_backend("nearest_neighbors")(n_neighbors=k_neighbors + 1, n_jobs=n_jobs)
+
+
+def oversample_targets(class_counts: pd.Series, oversample_factor: float) -> dict:
+    """
+    Number of rows every class should have after oversampling.
+
+    With two classes the minority class is grown to oversample_factor times the
+    majority; with more, every class is grown by oversample_factor (at least one row).
+    """
+    if len(class_counts) == 2:
+        return {class_counts.idxmin(): int(class_counts.max() * oversample_factor)}
+    return {cls: max(int(count * oversample_factor), count + 1) for cls, count in class_counts.items()}
+
+
+def synthetic_chunks(X: np.ndarray, y: np.ndarray, targets: dict, method: str = SMOTE_METHOD, k_neighbors: int = DEFAULT_K_NEIGHBORS,
+                     chunk_rows: int = OVERSAMPLE_CHUNK_ROWS, n_jobs: int = -1, approximate: bool = None, random_state: int = RANDOM_STATE):
+    """
+    Generate synthetic rows class by class, at most chunk_rows at a time.
+
+    SMOTE rows lie on the segment between a sample and one of its k nearest
+    neighbours of the same class; random oversampling repeats existing rows.
+    Only the neighbour table of one class and one chunk of new rows are held
+    in memory at any time.
+
+    :param X: numpy.ndarray, feature matrix of the original rows
+    :param y: numpy.ndarray, class of every row
+    :param targets: dict, class -> number of rows it should have (see oversample_targets)
+    :return: generator of (X_new, y_new) chunks
+    """
+    if method not in (SMOTE_METHOD, RANDOM_METHOD):
+        raise ValueError(INVALID_OVERSAMPLE_METHOD)
+    rng = np.random.default_rng(random_state)
+    for cls, target in targets.items():
+        X_class = X[y == cls]
+        n_new = target - len(X_class)
+        if n_new <= 0 or not len(X_class):
+            continue
+        if method == SMOTE_METHOD and len(X_class) > 1:
+            k = min(k_neighbors, len(X_class) - 1)
+            neighbors = neighbors_estimator(len(X_class), k, n_jobs, approximate).fit(X_class)
+            table = neighbors.kneighbors(X_class, return_distance=False)[:, 1:]
+        for start in range(0, n_new, chunk_rows):
+            check()
+            size = min(chunk_rows, n_new - start)
+            base = rng.integers(len(X_class), size=size)
+            if method == SMOTE_METHOD and len(X_class) > 1:
+                partner = table[base, rng.integers(table.shape[1], size=size)]
+                gap = rng.random(size)[:, None]
+                X_new = X_class[base] + gap * (X_class[partner] - X_class[base])
+            else:
+                X_new = X_class[base]
+            yield X_new, np.full(size, cls, dtype=y.dtype)
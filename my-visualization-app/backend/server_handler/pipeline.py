@@ -0,0 +1,261 @@
+import contextvars
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import pandas as pd
+
+from backend.server_handler.cache import LRUCache
+from backend.server_handler.cancellation import check
+from backend.server_handler.cost_model import estimate_cost
+from backend.server_handler.executor import run_engine, EngineTimeoutError
+
+SOURCE_INPUT = "source"
+PIPELINE_CACHE_SIZE = 16
+MAX_PIPELINE_WORKERS = 4
+CORRELATION_INDEX = "feature"
+
+MISSING_STEPS = "A pipeline needs a non-empty list of steps."
+MISSING_STEP_ID = "Every pipeline step needs an id and an op."
+DUPLICATE_STEP_ID = "Duplicate pipeline step id: {}"
+RESERVED_STEP_ID = "'{}' is reserved for the source dataset."
+UNKNOWN_OPERATION = "Unknown pipeline operation: {}"
+UNKNOWN_INPUT = "Step '{}' reads '{}', which is not an earlier step."
+UNKNOWN_OUTPUT = "Requested output '{}' is not a pipeline step."
+STEP_FAILED = "Step '{}' ({}) failed: {}"
+
+_result_cache = LRUCache(PIPELINE_CACHE_SIZE)
+
+
+def _drop_features(df, params, cache_key):
+    return df.drop(columns=params.get("features", []))
+
+
+def _select_features(df, params, cache_key):
+    return df[params["features"]]
+
+
+def _interpolate(df, params, cache_key):
+    options = dict(
+        kind=params.get("kind", "linear"),
+        num_points=params.get("numPoints") or 100,
+        min_value=params.get("minValue"),
+        max_value=params.get("maxValue"),
+        degree=params.get("degree", 3),
+        cache_key=cache_key
+    )
+    if params.get("y_features"):
+        return run_engine("interpolate_many", df, params["x_feature"], params["y_features"], **options)
+    return run_engine("interpolate", df, params["x_feature"], params["y_feature"], **options)
+
+
+def _extrapolate(df, params, cache_key):
+    return run_engine("extrapolate", df, params["x_feature"], params["y_feature"], params["target_x"],
+                      method=params.get("kind", "linear"), cache_key=cache_key)
+
+
+def _fit_curve(df, params, cache_key):
+    _, _, fitted_data = run_engine("fit_curve", df, params["x_feature"], params["y_feature"],
+                                   method=params.get("type", "linear"), degree=params.get("degree", 2),
+                                   initial_params=params.get("initial_params"))
+    return fitted_data
+
+
+def _dimensional_reduction(df, params, cache_key):
+    return run_engine("dimensional_reduction", df, method=params.get("method", "pca").lower(),
+                      n_components=params.get("n_components", 2))
+
+
+def _correlation(df, params, cache_key):
+    features = params.get("features") or list(df.select_dtypes(include="number").columns)
+    matrix = df[features].corr(method=params.get("method", "pearson"))
+    return matrix.rename_axis(CORRELATION_INDEX).reset_index()
+
+
+def _oversample(df, params, cache_key):
+    return run_engine("oversample_data", df, params["x_feature"], params["y_feature"],
+                      method=params.get("method", "smote"),
+                      oversample_factor=params.get("num_samples", 1))
+
+
+# Every operation maps (DataFrame, params, cache_key) to a new DataFrame; those calling the
+# Engine run it in the process pool, so that branches do not take turns on the GIL
+OPERATIONS = {
+    "drop_features": _drop_features,
+    "select_features": _select_features,
+    "interpolate": _interpolate,
+    "extrapolate": _extrapolate,
+    "fit_curve": _fit_curve,
+    "dimensional_reduction": _dimensional_reduction,
+    "correlation": _correlation,
+    "oversample": _oversample,
+}
+
+
+# Pipeline operation -> cost_model operation; the others cost next to nothing
+COSTED_OPERATIONS = {
+    "interpolate": "interpolate",
+    "extrapolate": "extrapolate",
+    "fit_curve": "fit_curve",
+    "dimensional_reduction": "dimensional_reduction",
+    "correlation": "correlation",
+    "oversample": "oversample_data",
+}
+
+
+def normalize_pipeline(steps: list, outputs: list = None):
+    """
+    Validate a pipeline definition and fill in the implicit inputs.
+
+    A step without "input" reads the step before it (the first one reads the
+    source dataset). Outputs default to the last step.
+
+    :param steps: list of dicts with "id", "op", optional "input" and "params"
+    :param outputs: list of step ids whose results are returned
+    :return: tuple (steps, outputs) in canonical form
+    """
+    if not steps:
+        raise ValueError(MISSING_STEPS)
+    normalized = []
+    seen = set()
+    previous = SOURCE_INPUT
+    for step in steps:
+        step_id, op = step.get("id"), step.get("op")
+        if not step_id or not op:
+            raise ValueError(MISSING_STEP_ID)
+        if step_id == SOURCE_INPUT:
+            raise ValueError(RESERVED_STEP_ID.format(SOURCE_INPUT))
+        if step_id in seen:
+            raise ValueError(DUPLICATE_STEP_ID.format(step_id))
+        if op not in OPERATIONS:
+            raise ValueError(UNKNOWN_OPERATION.format(op))
+        source = step.get("input", previous)
+        if source != SOURCE_INPUT and source not in seen:
+            raise ValueError(UNKNOWN_INPUT.format(step_id, source))
+        normalized.append({"id": step_id, "op": op, "input": source, "params": step.get("params", {})})
+        seen.add(step_id)
+        previous = step_id
+
+    outputs = list(outputs or [previous])
+    for output in outputs:
+        if output not in seen:
+            raise ValueError(UNKNOWN_OUTPUT.format(output))
+    return normalized, outputs
+
+
+def estimate_pipeline_cost(steps: list, n_rows: int, n_features: int):
+    """
+    Estimated seconds and peak bytes of a normalized pipeline, for admission control: the sum over
+    its steps, each costed on the shape of the source (see cost_model.estimate_cost).
+
+    :return: tuple (seconds, bytes), or None if no step has a cost model
+    """
+    total = None
+    for step in steps:
+        operation, params = COSTED_OPERATIONS.get(step["op"]), step["params"]
+        if operation is None:
+            continue
+        try:
+            if operation == "dimensional_reduction":
+                options = dict(method=params.get("method", "pca").lower(), n_components=params.get("n_components", 2))
+            elif operation == "oversample_data":
+                options = dict(repeats=1 + int(params.get("num_samples", 1) or 0))
+            else:
+                options = {}
+            seconds, memory = estimate_cost(operation, n_rows, n_features, **options)
+        except (ValueError, TypeError, AttributeError):
+            continue  # Invalid parameters, which the step reports
+        total = (seconds, memory) if total is None else (total[0] + seconds, total[1] + memory)
+    return total
+
+
+def pipeline_signature(steps: list, outputs: list) -> str:
+    """
+    Stable hash of a normalized pipeline, independent of key order and whitespace.
+    """
+    definition = json.dumps({"steps": steps, "outputs": sorted(outputs)}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(definition.encode("utf-8")).hexdigest()
+
+
+def run_pipeline(source: pd.DataFrame, steps: list, outputs: list = None, cache_key: str = None, max_workers: int = MAX_PIPELINE_WORKERS):
+    """
+    Execute a pipeline of Engine operations over in-memory frames.
+
+    Steps that no output depends on are skipped. A step is submitted as soon as
+    its input is ready, so independent branches run concurrently, and every
+    intermediate frame is released once its last consumer has finished. Once the
+    computation is cancelled (see cancellation.check) no further step starts, and
+    the Engine calls of running steps are stopped.
+
+    :param source: pandas.DataFrame, the source dataset
+    :param steps: list, the pipeline steps (see normalize_pipeline)
+    :param outputs: list, step ids whose results are returned (default: the last step)
+    :param cache_key: str, Dataset.cache_key of the source (None disables caching)
+    :param max_workers: int, number of steps running at once
+    :return: tuple (dict step id -> pandas.DataFrame, bool whether the result came from the cache)
+    """
+    steps, outputs = normalize_pipeline(steps, outputs)
+    signature = pipeline_signature(steps, outputs)
+    if cache_key is not None:
+        cached = _result_cache.get((cache_key, signature))
+        if cached is not None:
+            return cached, True
+
+    by_id = {step["id"]: step for step in steps}
+    needed = set()
+    pending = list(outputs)
+    while pending:
+        step_id = pending.pop()
+        if step_id not in needed:
+            needed.add(step_id)
+            if by_id[step_id]["input"] != SOURCE_INPUT:
+                pending.append(by_id[step_id]["input"])
+    steps = [step for step in steps if step["id"] in needed]
+
+    # Derived frames get a key of their own lineage, so caches below the Engine
+    # (sorted indexes, splines) are shared by pipelines with a common prefix;
+    # this relies on every operation being deterministic (t-SNE and UMAP are seeded)
+    lineage = {SOURCE_INPUT: cache_key}
+    for step in steps:
+        parent = lineage[step["input"]]
+        lineage[step["id"]] = None if parent is None else "{}/{}".format(parent, pipeline_signature([step], []))
+
+    consumers = {step_id: 0 for step_id in needed}
+    for step in steps:
+        if step["input"] != SOURCE_INPUT:
+            consumers[step["input"]] += 1
+
+    frames = {SOURCE_INPUT: source}
+    results = {}
+    waiting = list(steps)
+    running = {}
+
+    def execute(step):
+        try:
+            return OPERATIONS[step["op"]](frames[step["input"]], step["params"], lineage[step["input"]])
+        except EngineTimeoutError:
+            raise
+        except Exception as e:
+            raise ValueError(STEP_FAILED.format(step["id"], step["op"], e))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while waiting or running:
+            for step in [step for step in waiting if step["input"] in frames]:
+                check()
+                waiting.remove(step)
+                # In a copy of this context, so that the step sees the cancellation token
+                running[pool.submit(contextvars.copy_context().run, execute, step)] = step
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                step = running.pop(future)
+                frames[step["id"]] = future.result()
+                if step["id"] in outputs:
+                    results[step["id"]] = frames[step["id"]]
+                if step["input"] != SOURCE_INPUT:
+                    consumers[step["input"]] -= 1
+                    if consumers[step["input"]] == 0:
+                        del frames[step["input"]]
+
+    if cache_key is not None:
+        _result_cache.set((cache_key, signature), results)
+    return results, False
@@ -0,0 +1,370 @@
+import numpy as np
+import pandas as pd
+
+from backend.server_handler.cache import LRUCache
+
+ZONE_ROWS = 8192  # Rows per chunk of the min/max zone map
+INDEX_AFTER_SCANS = 1  # Zone map scans of a column before range predicates build its sorted index
+COLUMN_CACHE_SIZE = 32
+DEFAULT_LIMIT = 1000
+
+COMPARISONS = {"==": np.equal, "!=": np.not_equal, "<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal}
+RANGE_OPERATORS = ("==", "<", "<=", ">", ">=", "between")
+OPERATORS = tuple(COMPARISONS) + ("between", "in", "is_null", "not_null")
+AGGREGATES = ("count", "sum", "mean", "min", "max", "median", "std", "nunique")
+
+UNSUPPORTED_OPERATOR = "Unsupported operator: {}. Choose from " + ", ".join(f"'{op}'" for op in OPERATORS) + "."
+UNSUPPORTED_AGGREGATE = "Unsupported aggregate: {}. Choose from " + ", ".join(f"'{func}'" for func in AGGREGATES) + "."
+
+_column_cache = LRUCache(COLUMN_CACHE_SIZE)
+
+
+class ColumnIndex(object):
+    """
+    Values of one column with a min/max zone map per chunk of rows and, once the
+    column has been filtered repeatedly, a sorted order.
+
+    A range predicate on a sorted column is two binary searches. Before that,
+    chunks whose [min, max] cannot satisfy it are skipped, so data that is
+    roughly ordered (time stamps, ids) is scanned only where it can match.
+    Only numeric columns are indexed; missing values never satisfy a range.
+    """
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+        self.numeric = values.dtype.kind in "iuf"
+        self.scans = 0
+        self._zones = None
+        self._order = None
+        self._sorted_values = None
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def missing(self) -> np.ndarray:
+        if self.values.dtype.kind == "f":
+            return np.isnan(self.values)
+        if self.numeric:
+            return np.zeros(len(self.values), dtype=bool)
+        return pd.isna(self.values)
+
+    @property
+    def zones(self):
+        """
+        Smallest and largest value of every chunk of ZONE_ROWS rows (+inf/-inf for an all-missing chunk).
+        """
+        if self._zones is None:
+            if not len(self.values):
+                return np.zeros(0), np.zeros(0)
+            starts = np.arange(0, len(self.values), ZONE_ROWS)
+            missing = self.missing
+            self._zones = (np.minimum.reduceat(np.where(missing, np.inf, self.values), starts),
+                           np.maximum.reduceat(np.where(missing, -np.inf, self.values), starts))
+        return self._zones
+
+    @property
+    def is_sorted(self) -> bool:
+        return self._order is not None
+
+    def build_order(self):
+        present = np.flatnonzero(~self.missing)
+        order = present[np.argsort(self.values[present], kind="stable")]
+        self._sorted_values = self.values[order]
+        self._order = order
+
+    def ordered_rows(self, descending: bool = False) -> np.ndarray:
+        """
+        All rows ordered by value, missing values last.
+        """
+        if not self.is_sorted:
+            self.build_order()
+        order = self._order[::-1] if descending else self._order
+        return np.concatenate([order, np.flatnonzero(self.missing)])
+
+    def range_rows(self, low=None, high=None, low_inclusive=True, high_inclusive=True) -> np.ndarray:
+        """
+        Rows with low <= value <= high (bounds may be exclusive or None), in ascending row order.
+        """
+        if not self.is_sorted:
+            if self.scans < INDEX_AFTER_SCANS:
+                self.scans += 1
+                return self.scan_rows(low, high, low_inclusive, high_inclusive)
+            self.build_order()
+        start = 0 if low is None else np.searchsorted(self._sorted_values, low, side="left" if low_inclusive else "right")
+        stop = len(self._sorted_values) if high is None else np.searchsorted(self._sorted_values, high, side="right" if high_inclusive else "left")
+        return np.sort(self._order[start:max(start, stop)])
+
+    def scan_rows(self, low=None, high=None, low_inclusive=True, high_inclusive=True) -> np.ndarray:
+        """
+        Rows in the range, evaluated only on chunks whose zone map overlaps it.
+        """
+        zone_min, zone_max = self.zones
+        overlaps = np.ones(len(zone_min), dtype=bool)
+        if low is not None:
+            overlaps &= zone_max >= low if low_inclusive else zone_max > low
+        if high is not None:
+            overlaps &= zone_min <= high if high_inclusive else zone_min < high
+        rows = [start + np.flatnonzero(range_mask(self.values[start:start + ZONE_ROWS], low, high, low_inclusive, high_inclusive))
+                for start in np.flatnonzero(overlaps) * ZONE_ROWS]
+        return np.concatenate(rows) if rows else np.zeros(0, dtype=np.intp)
+
+
+def range_mask(values: np.ndarray, low=None, high=None, low_inclusive=True, high_inclusive=True) -> np.ndarray:
+    mask = np.ones(len(values), dtype=bool)
+    if low is not None:
+        mask &= values >= low if low_inclusive else values > low
+    if high is not None:
+        mask &= values <= high if high_inclusive else values < high
+    return mask
+
+
+def predicate_range(op: str, value):
+    """
+    A range predicate as (low, high, low_inclusive, high_inclusive).
+    """
+    if op == "between":
+        return value[0], value[1], True, True
+    if op == "==":
+        return value, value, True, True
+    if op in ("<", "<="):
+        return None, value, True, op == "<="
+    return value, None, op == ">=", True
+
+
+def predicate_mask(values: np.ndarray, op: str, value) -> np.ndarray:
+    if op == "is_null":
+        return np.asarray(pd.isna(values))
+    if op == "not_null":
+        return ~np.asarray(pd.isna(values))
+    if op == "in":
+        return pd.Series(values).isin(value).to_numpy()
+    if op == "between":
+        return range_mask(values, value[0], value[1])
+    return np.asarray(COMPARISONS[op](values, value), dtype=bool)
+
+
+def column_values(series: pd.Series) -> np.ndarray:
+    """
+    A column as a NumPy array: int or float for numeric columns (NaN for missing values), object otherwise.
+    """
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        if series.isna().any() or not pd.api.types.is_integer_dtype(series):
+            return series.to_numpy(dtype=np.float64, na_value=np.nan)
+        return series.to_numpy()
+    return series.to_numpy(dtype=object)
+
+
+def column_indexes(load, columns: list, cache_key: str = None) -> dict:
+    """
+    ColumnIndex of every column, loading only the columns not cached for this dataset version.
+
+    :param load: callable, list of columns -> pandas.DataFrame with those columns
+    """
+    indexes = {} if cache_key is None else {column: _column_cache.get((cache_key, column)) for column in columns}
+    missing = [column for column in columns if indexes.get(column) is None]
+    if missing:
+        frame = load(missing)
+        for column in missing:
+            indexes[column] = ColumnIndex(column_values(frame[column]))
+            if cache_key is not None:
+                _column_cache.set((cache_key, column), indexes[column])
+    return indexes
+
+
+def _list_of(value, kinds, message: str) -> list:
+    """
+    value (None: empty) if it is a list of instances of kinds.
+
+    :raises ValueError: with message otherwise
+    """
+    value = value or []
+    if not isinstance(value, list) or not all(isinstance(item, kinds) for item in value):
+        raise ValueError(message)
+    return value
+
+
+def normalize_query(features: list, query: dict) -> dict:
+    """
+    Validate a query and fill in its defaults.
+
+    :raises ValueError: for a malformed or inapplicable query
+    """
+    where = _list_of(query.get("where"), dict, 'where must be a list of {"column", "op", "value"} predicates')
+    group_by = _list_of(query.get("group_by"), str, "group_by must be a list of column names")
+    aggregates = []
+    for aggregate in _list_of(query.get("aggregates"), dict, 'aggregates must be a list of {"column", "func"} objects'):
+        func = aggregate.get("func", "count")
+        if func not in AGGREGATES:
+            raise ValueError(UNSUPPORTED_AGGREGATE.format(func))
+        column = aggregate.get("column")
+        aggregates.append({"column": column, "func": func, "as": aggregate.get("as") or (f"{func}_{column}" if column else func)})
+    sort = [{"column": key, "descending": False} if isinstance(key, str) else {"column": key.get("column"), "descending": bool(key.get("descending", False))}
+            for key in _list_of(query.get("sort"), (str, dict), 'sort must be a list of column names or {"column", "descending"} objects')]
+    grouped = bool(group_by or aggregates)
+    columns = group_by + [aggregate["as"] for aggregate in aggregates] if grouped else \
+        (_list_of(query.get("columns"), str, "columns must be a list of column names") or list(features))
+
+    for predicate in where:
+        op, value = predicate.get("op"), predicate.get("value")
+        if op not in OPERATORS:
+            raise ValueError(UNSUPPORTED_OPERATOR.format(op))
+        if op in ("between", "in") and not isinstance(value, list):
+            raise ValueError(f"Operator '{op}' expects a list value")
+        if op == "between" and (len(value) != 2 or None in value):
+            raise ValueError("Operator 'between' expects a list of two bounds")
+        if op in COMPARISONS and value is None:
+            raise ValueError(f"Operator '{op}' needs a value; use 'is_null' or 'not_null' for missing values")
+    referenced = [predicate.get("column") for predicate in where] + group_by + [aggregate["column"] for aggregate in aggregates if aggregate["column"]]
+    if not grouped:
+        referenced += columns + [key["column"] for key in sort]
+    missing = sorted({str(column) for column in referenced if column not in features})
+    if missing:
+        raise ValueError(f"Columns {missing} not found in dataset")
+    unknown_sort = [key["column"] for key in sort if key["column"] not in columns] if grouped else []
+    if unknown_sort:
+        raise ValueError(f"Cannot sort grouped results by {unknown_sort}")
+
+    limit, offset = query.get("limit", DEFAULT_LIMIT), query.get("offset", 0)
+    if not isinstance(limit, int) or not isinstance(offset, int) or limit < 0 or offset < 0:
+        raise ValueError("limit and offset must be non-negative integers")
+    return {"where": where, "group_by": group_by, "aggregates": aggregates, "sort": sort, "columns": columns,
+            "grouped": grouped, "limit": limit, "offset": offset,
+            "load": list(dict.fromkeys(referenced))}
+
+
+def filter_rows(indexes: dict, where: list):
+    """
+    Rows matching every predicate, in ascending order (None when there are no predicates).
+
+    Range predicates on numeric columns go through the column index or its zone map;
+    the remaining predicates are evaluated only on the rows that are still candidates.
+    """
+    ranges = [p for p in where if p["op"] in RANGE_OPERATORS and indexes[p["column"]].numeric]
+    others = [p for p in where if p not in ranges]
+    ranges.sort(key=lambda p: not indexes[p["column"]].is_sorted)  # Binary searches first
+
+    rows = None
+    for predicate in ranges:
+        index = indexes[predicate["column"]]
+        bounds = predicate_range(predicate["op"], predicate["value"])
+        if any(bound is not None and not isinstance(bound, (int, float)) for bound in bounds[:2]):
+            raise ValueError(f"Column '{predicate['column']}' is numeric, got {predicate['value']!r}")
+        if rows is None or index.is_sorted:
+            matched = index.range_rows(*bounds)
+            rows = matched if rows is None else np.intersect1d(rows, matched, assume_unique=True)
+        else:
+            rows = rows[range_mask(index.values[rows], *bounds)]
+    for predicate in others:
+        values = indexes[predicate["column"]].values
+        try:
+            mask = predicate_mask(values if rows is None else values[rows], predicate["op"], predicate.get("value"))
+        except TypeError:
+            raise ValueError(f"Cannot compare column '{predicate['column']}' with {predicate.get('value')!r}")
+        rows = np.flatnonzero(mask) if rows is None else rows[mask]
+    return rows
+
+
+def sort_rows(indexes: dict, rows, sort: list, count: int) -> np.ndarray:
+    """
+    The first count rows in sort order (all rows, in row order, when sort is empty).
+    """
+    n_rows = len(next(iter(indexes.values()))) if indexes else 0
+    if not sort:
+        return np.arange(min(count, n_rows)) if rows is None else rows[:count]
+    key = sort[0]
+    index = indexes[key["column"]]
+    if len(sort) == 1 and index.numeric:
+        if rows is None:
+            return index.ordered_rows(key["descending"])[:count]
+        values = index.values[rows]
+        if key["descending"]:
+            # Missing values (NaN) stay last; ~ reverses integers without the overflow of negating them
+            values = ~values if values.dtype.kind in "iu" else -values
+        if count < len(rows):
+            top = np.argpartition(values, count)[:count]
+            return rows[top[np.argsort(values[top], kind="stable")]]
+        return rows[np.argsort(values, kind="stable")]
+    frame = pd.DataFrame({k["column"]: indexes[k["column"]].values if rows is None else indexes[k["column"]].values[rows] for k in sort})
+    positions = frame.sort_values([k["column"] for k in sort], ascending=[not k["descending"] for k in sort],
+                                  kind="stable", na_position="last").index.to_numpy()[:count]
+    return positions if rows is None else rows[positions]
+
+
+def group_rows(indexes: dict, rows, spec: dict) -> pd.DataFrame:
+    """
+    Aggregates of the matching rows, one row per group (a single row without group_by).
+    """
+    needed = dict.fromkeys(spec["group_by"] + [aggregate["column"] for aggregate in spec["aggregates"] if aggregate["column"]])
+    frame = pd.DataFrame({column: indexes[column].values if rows is None else indexes[column].values[rows] for column in needed})
+    if not spec["group_by"]:
+        return pd.DataFrame({aggregate["as"]: [len(frame) if not aggregate["column"] else frame[aggregate["column"]].agg(aggregate["func"])]
+                             for aggregate in spec["aggregates"]})
+    grouped = frame.groupby(spec["group_by"], dropna=False, sort=False)
+    named = {aggregate["as"]: pd.NamedAgg(aggregate["column"] or spec["group_by"][0], "size" if not aggregate["column"] else aggregate["func"])
+             for aggregate in spec["aggregates"]}
+    result = grouped.agg(**named).reset_index() if named else grouped.size().reset_index()[spec["group_by"]]
+    return result[spec["columns"]]
+
+
+def run_query(load, features: list, query: dict, cache_key: str = None) -> dict:
+    """
+    Filter, sort, group and page a dataset.
+
+    Example query:
+        {"where": [{"column": "x", "op": ">=", "value": 0}, {"column": "label", "op": "in", "value": ["a", "b"]}],
+         "sort": [{"column": "y", "descending": true}], "columns": ["x", "y"], "limit": 10}
+    or, with group_by, {"group_by": ["label"], "aggregates": [{"column": "y", "func": "mean"}]}.
+
+    Only the referenced columns are loaded, and they are kept per dataset version so
+    that later queries reuse their zone maps and sorted indexes. A sort with a limit
+    returns the top rows without sorting all matches.
+
+    :param load: callable, list of columns -> pandas.DataFrame with those columns of the dataset
+    :param features: list, the columns of the dataset
+    :param query: dict, see above; operators are ==, !=, <, <=, >, >=, between, in, is_null and not_null
+    :param cache_key: str, Dataset.cache_key of the dataset (None disables caching)
+    :return: dict with the result columns and records, the number of matching rows and of result rows
+    """
+    return execute_query(*load_query(load, features, query, cache_key))
+
+
+def load_query(load, features: list, query: dict, cache_key: str = None):
+    """
+    Validate a query and load the columns it reads: the part of run_query that may query the database.
+
+    :return: tuple (normalized query, dict column -> ColumnIndex, number of records), see execute_query
+    """
+    spec = normalize_query(features, query)
+    indexes = column_indexes(load, spec["load"], cache_key)
+    n_records = len(next(iter(indexes.values()))) if indexes else len(load([]))
+    return spec, indexes, n_records
+
+
+def execute_query(spec: dict, indexes: dict, n_records: int) -> dict:
+    """
+    Filter, sort, group and page the columns load_query loaded, without touching the database.
+    """
+    rows = filter_rows(indexes, spec["where"])
+    n_matched = n_records if rows is None else len(rows)
+    limit, offset = spec["limit"], spec["offset"]
+
+    if spec["grouped"]:
+        result = group_rows(indexes, rows, spec)
+        if spec["sort"]:
+            result = result.sort_values([key["column"] for key in spec["sort"]], ascending=[not key["descending"] for key in spec["sort"]],
+                                        kind="stable", na_position="last")
+        n_results = len(result)
+        page = result.iloc[offset:offset + limit]
+    else:
+        selected = sort_rows(indexes, rows, spec["sort"], offset + limit)[offset:]
+        n_results = n_matched
+        page = pd.DataFrame({column: indexes[column].values[selected] for column in spec["columns"]})
+
+    return {
+        "columns": list(spec["columns"]),
+        "records": page.astype(object).where(page.notna(), None).to_dict(orient="records"),
+        "num_records": n_records,
+        "num_matched": n_matched,
+        "num_results": n_results
+    }
@@ -0,0 +1,238 @@
+import asyncio
+import concurrent.futures
+import contextlib
+import functools
+import heapq
+import itertools
+import os
+import threading
+
+from backend.server_handler.cost_model import estimate_cost
+from backend.server_handler.timing import span
+
+INTERACTIVE_SECONDS = 0.5  # Operations expected to finish faster are interactive and run first
+DEFAULT_MAX_QUEUE = 32  # Waiting operations before new ones are turned away
+DEFAULT_MAX_WAIT = 60  # Seconds an operation may wait for admission
+MEMORY_BUDGET_SHARE = 0.5  # Default memory budget as a share of the physical memory
+RETRY_AFTER_SECONDS = 5  # Suggested to clients turned away because the server is busy
+MEBIBYTE = 1 << 20
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+OPERATION_TOO_LARGE = ("{} needs about {:.0f} MiB, more than the server's budget of {:.0f} MiB. "
+                       "Try fewer rows or columns, or a faster method.")
+QUEUE_FULL = "The server is busy: {} operations are waiting. Try again shortly."
+ADMISSION_TIMEOUT = "{} waited {} seconds without the server having capacity for it. Try again later."
+
+
+class AdmissionError(Exception):
+    """
+    The scheduler turned an operation away; status is the HTTP status to answer with
+    and retry_after the seconds after which trying again may succeed (None: it will not).
+    """
+    status = 503
+    retry_after = None
+
+
+class SchedulerBusyError(AdmissionError):
+    retry_after = RETRY_AFTER_SECONDS
+
+
+class QueueFullError(SchedulerBusyError):
+    status = 429
+
+
+def physical_memory() -> int:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return 8 << 30
+
+
+class Ticket(object):
+    def __init__(self, operation: str, seconds: float, memory: int):
+        self.operation = operation
+        self.seconds = seconds
+        self.memory = memory
+        self.kind = INTERACTIVE if seconds <= INTERACTIVE_SECONDS else BATCH
+        self.granted = concurrent.futures.Future()
+
+
+class Scheduler(object):
+    """
+    Admission control in front of the Engine.
+
+    Every operation states its estimated seconds and peak memory (see
+    cost_model.estimate_cost). It starts once the memory of all running
+    operations stays within the budget; batch operations additionally need
+    one of batch_slots. Waiting operations are admitted interactive first,
+    then in arrival order. An operation larger than the whole budget, one
+    arriving at a full queue and one waiting longer than max_wait are
+    turned away with an AdmissionError.
+
+    The budgets apply to one server process; callers in any thread or event
+    loop of it share them.
+    """
+
+    def __init__(self, memory_budget: int = None, batch_slots: int = None, max_queue: int = DEFAULT_MAX_QUEUE,
+                 max_wait: float = DEFAULT_MAX_WAIT):
+        self.memory_budget = memory_budget or int(physical_memory() * MEMORY_BUDGET_SHARE)
+        self.batch_slots = max(batch_slots or os.cpu_count() or 1, 1)
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.memory_in_use = 0
+        self.running = {INTERACTIVE: 0, BATCH: 0}
+        self._queue = []
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+
+    @contextlib.asynccontextmanager
+    async def admit(self, operation: str, seconds: float, memory: int):
+        """
+        Async context in which an admitted operation runs; its share is freed on leaving it.
+
+        :param operation: str, name of the operation, for messages
+        :param seconds: float, estimated run time
+        :param memory: int, estimated peak bytes
+        :raises AdmissionError: if the operation is turned away
+        """
+        ticket = await self.acquire(operation, seconds, memory)
+        try:
+            yield
+        finally:
+            self.release(ticket)
+
+    async def acquire(self, operation: str, seconds: float, memory: int) -> Ticket:
+        """
+        Wait until the operation is admitted, for one that outlives the caller's context (see admit
+        for the parameters); its share is freed by passing the returned ticket to release once.
+
+        :raises AdmissionError: if the operation is turned away
+        """
+        ticket = self._submit(Ticket(operation, seconds, memory))
+        try:
+            with span("queue"):
+                await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(ticket.granted)), self.max_wait)
+        except asyncio.TimeoutError:
+            self._withdraw(ticket)
+            raise SchedulerBusyError(ADMISSION_TIMEOUT.format(operation, self.max_wait))
+        except asyncio.CancelledError:
+            self._withdraw(ticket)
+            raise
+        return ticket
+
+    def release(self, ticket: Ticket):
+        self._release(ticket)
+
+    def depth(self) -> dict:
+        """
+        Queue depth and budget use, e.g. for a status endpoint.
+        """
+        with self._lock:
+            queued = {INTERACTIVE: 0, BATCH: 0}
+            for _, _, ticket in self._queue:
+                queued[ticket.kind] += 1
+            return {
+                "queued": queued,
+                "running": dict(self.running),
+                "memory_in_use_mb": round(self.memory_in_use / MEBIBYTE, 1),
+                "memory_budget_mb": round(self.memory_budget / MEBIBYTE, 1),
+                "batch_slots": self.batch_slots,
+                "max_queue": self.max_queue
+            }
+
+    def _submit(self, ticket: Ticket) -> Ticket:
+        if ticket.memory > self.memory_budget:
+            raise AdmissionError(OPERATION_TOO_LARGE.format(
+                ticket.operation, ticket.memory / MEBIBYTE, self.memory_budget / MEBIBYTE))
+        with self._lock:
+            if len(self._queue) >= self.max_queue:
+                raise QueueFullError(QUEUE_FULL.format(len(self._queue)))
+            heapq.heappush(self._queue, (ticket.kind != INTERACTIVE, next(self._order), ticket))
+            self._dispatch()
+        return ticket
+
+    def _fits(self, ticket: Ticket) -> bool:
+        return (self.memory_in_use + ticket.memory <= self.memory_budget
+                and (ticket.kind == INTERACTIVE or self.running[BATCH] < self.batch_slots))
+
+    def _dispatch(self):
+        # Strictly in priority order, so that large operations are not starved by smaller later ones
+        while self._queue and self._fits(self._queue[0][2]):
+            _, _, ticket = heapq.heappop(self._queue)
+            self.memory_in_use += ticket.memory
+            self.running[ticket.kind] += 1
+            ticket.granted.set_result(True)
+
+    def _release(self, ticket: Ticket):
+        with self._lock:
+            self.memory_in_use -= ticket.memory
+            self.running[ticket.kind] -= 1
+            self._dispatch()
+
+    def _withdraw(self, ticket: Ticket):
+        with self._lock:
+            if not ticket.granted.done():
+                self._queue = [entry for entry in self._queue if entry[2] is not ticket]
+                heapq.heapify(self._queue)
+                ticket.granted.cancel()
+                self._dispatch()
+                return
+        self._release(ticket)  # Admitted just as the caller gave up
+
+
+_scheduler = {"instance": Scheduler()}
+
+
+def configure_scheduler(memory_budget: int = None, batch_slots: int = None, max_queue: int = DEFAULT_MAX_QUEUE,
+                        max_wait: float = DEFAULT_MAX_WAIT) -> Scheduler:
+    """
+    Replace the scheduler of this process (see Scheduler for the parameters).
+    """
+    _scheduler["instance"] = Scheduler(memory_budget, batch_slots, max_queue, max_wait)
+    return _scheduler["instance"]
+
+
+def get_scheduler() -> Scheduler:
+    return _scheduler["instance"]
+
+
+@contextlib.asynccontextmanager
+async def admitted(operation: str, data, **params):
+    """
+    Async context in which operation on data runs once the scheduler admits it, e.g.
+
+        async with admitted("correlation", df):
+            matrix = await run_in_thread(df.corr)
+
+    :param operation: str, name of the Engine operation (see cost_model.estimate_cost)
+    :param data: pandas.DataFrame, its input, whose shape the estimate is based on
+    :param params: method, n_components or repeats for the estimate
+    """
+    estimate = _estimate(operation, data, **params)
+    if estimate is None:
+        yield
+    else:
+        async with get_scheduler().admit(operation, *estimate):
+            yield
+
+
+async def admission(operation: str, data, **params):
+    """
+    Wait until operation on data is admitted, like admitted, for an operation that continues after
+    the view returns, e.g. one generating a streamed response.
+
+    :return: callable freeing the operation's share, to be called once it is done
+    """
+    estimate = _estimate(operation, data, **params)
+    if estimate is None:
+        return lambda: None
+    scheduler = get_scheduler()
+    return functools.partial(scheduler.release, await scheduler.acquire(operation, *estimate))
+
+
+def _estimate(operation: str, data, **params):
+    try:
+        return estimate_cost(operation, *data.shape, **params)
+    except ValueError:
+        return None  # An unknown method, which the Engine reports
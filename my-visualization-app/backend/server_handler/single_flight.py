@@ -0,0 +1,204 @@
+import asyncio
+import concurrent.futures
+import contextlib
+import fcntl
+import glob
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+import uuid
+
+from backend.server_handler.column_store import make_private_directory
+
+LOCK_POLL_INTERVAL = 0.05  # Seconds between attempts to take the lock another process holds
+RESULT_TTL = 60  # Seconds after which results and waiter marks left behind, e.g. by a killed process, are removed
+LOCK_SUFFIX = ".lock"
+RESULT_SUFFIX = ".result"
+WAITER_SUFFIX = ".waiter-"
+
+_MISSING = object()
+
+_flights = {"directory": None}
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+_leaders = set()
+
+
+def configure_single_flight(directory: str = None):
+    """
+    Coalesce identical computations across the server processes through lock files in
+    directory, which must be private (None: only within this process).
+    """
+    if directory is not None:
+        make_private_directory(directory)
+    _flights["directory"] = directory
+
+
+def flight_key(cache_key: str, operation: str, **params) -> str:
+    """
+    Identifies one computation: the dataset version, the operation and its parameters.
+    """
+    return f"{cache_key}|{operation}|{json.dumps(params, sort_keys=True, default=str)}"
+
+
+class _Flight(object):
+    def __init__(self):
+        self.outcome = concurrent.futures.Future()
+        self.waiters = 0
+        self.leader = None
+        self.loop = None
+
+
+async def single_flight(key: str, compute):
+    """
+    Run compute() once for all concurrent callers with the same key and share its result (or exception).
+
+    Within a process, callers in any thread or event loop wait for the first
+    caller's computation. Across processes, the first one to take the key's
+    lock file computes; processes that found it locked mark themselves as
+    waiting, and only for them is the result published, which the last of
+    them removes once it has read it. A caller that is cancelled
+    (e.g. the client went away) does not stop the computation the others
+    wait for; once all of them are cancelled, the computation is too.
+
+    :param key: str, see flight_key
+    :param compute: async callable returning a picklable result
+    """
+    with _in_flight_lock:
+        flight = _in_flight.get(key)
+        if flight is None:
+            flight = _in_flight[key] = _Flight()
+            flight.loop = asyncio.get_running_loop()
+            flight.leader = asyncio.ensure_future(_lead(key, compute, flight))
+            _leaders.add(flight.leader)  # The event loop only keeps weak references to tasks
+            flight.leader.add_done_callback(_leaders.discard)
+        flight.waiters += 1
+    waiter = asyncio.wrap_future(flight.outcome)
+    try:
+        return await asyncio.shield(waiter)
+    except asyncio.CancelledError:
+        waiter.add_done_callback(_discard_outcome)
+        _leave(key, flight)
+        raise
+
+
+def _leave(key, flight):
+    with _in_flight_lock:
+        flight.waiters -= 1
+        if flight.waiters or flight.outcome.done():
+            return
+        if _in_flight.get(key) is flight:
+            del _in_flight[key]  # Later callers start afresh rather than wait for a cancelled computation
+    try:
+        flight.loop.call_soon_threadsafe(flight.leader.cancel)
+    except RuntimeError:
+        pass  # The loop of the leader is closed, and with it the computation
+
+
+def _discard_outcome(waiter):
+    if not waiter.cancelled():
+        waiter.exception()  # Retrieved, so an error the cancelled caller no longer waits for is not logged
+
+
+async def _lead(key, compute, flight):
+    try:
+        result = await _compute_on_host(key, compute)
+    except BaseException as e:
+        flight.outcome.set_exception(e)
+    else:
+        flight.outcome.set_result(result)
+    finally:
+        with _in_flight_lock:
+            if _in_flight.get(key) is flight:
+                del _in_flight[key]
+
+
+async def _compute_on_host(key, compute):
+    directory = _flights["directory"]
+    if directory is None:
+        return await compute()
+
+    path = os.path.join(directory, hashlib.sha256(key.encode("utf-8")).hexdigest())
+    descriptor = os.open(path + LOCK_SUFFIX, os.O_CREAT | os.O_RDWR, 0o600)
+    waiter = None
+    try:
+        if not _try_lock(descriptor):
+            # Another process computes it: wait for its result
+            waiter = path + WAITER_SUFFIX + uuid.uuid4().hex
+            os.close(os.open(waiter, os.O_CREAT | os.O_WRONLY, 0o600))
+            marked = time.monotonic()
+            # Polled rather than blocking, so that waiting holds no thread
+            while not _try_lock(descriptor):
+                await asyncio.sleep(LOCK_POLL_INTERVAL)
+                if time.monotonic() - marked > RESULT_TTL / 2:
+                    os.utime(waiter)  # Still waiting, so not expired
+                    marked = time.monotonic()
+        os.utime(descriptor)
+        if waiter is not None:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(waiter)
+            waiter = None
+            result = _read_result(path + RESULT_SUFFIX)
+            if not _has_waiters(path):
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(path + RESULT_SUFFIX)
+            if result is not _MISSING:
+                return result
+        result = await compute()
+        _expire_results(directory)
+        if _has_waiters(path):
+            _write_result(path + RESULT_SUFFIX, result)
+        return result
+    finally:
+        if waiter is not None:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(waiter)
+        os.close(descriptor)  # Releases the lock
+
+
+def _try_lock(descriptor) -> bool:
+    try:
+        fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except BlockingIOError:
+        return False
+
+
+def _has_waiters(path) -> bool:
+    return bool(glob.glob(glob.escape(path + WAITER_SUFFIX) + "*"))
+
+
+def _read_result(path):
+    try:
+        with open(path, "rb") as file:
+            if time.time() - os.fstat(file.fileno()).st_mtime > RESULT_TTL:
+                return _MISSING
+            return pickle.load(file)
+    except FileNotFoundError:
+        return _MISSING
+
+
+def _write_result(path, result):
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(descriptor, "wb") as file:
+        pickle.dump(result, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, path)
+
+
+def _expire_results(directory):
+    """
+    Remove results, waiter marks and lock files nobody used for RESULT_TTL seconds. Removing
+    a lock file another process is just taking can at worst make both compute the same result.
+    """
+    deadline = time.time() - RESULT_TTL
+    with os.scandir(directory) as scan:
+        for entry in scan:
+            try:
+                if entry.stat().st_mtime < deadline:
+                    os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
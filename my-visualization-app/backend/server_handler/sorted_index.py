@@ -0,0 +1,100 @@
+import numpy as np
+
+from backend.server_handler.backends import load_backend
+from backend.server_handler.cache import LRUCache
+
+INDEX_CACHE_SIZE = 32
+SPLINE_CACHE_SIZE = 64
+CUBIC_METHOD = "cubic"
+EXTRAPOLATE_FILL = "extrapolate"
+
+_index_cache = LRUCache(INDEX_CACHE_SIZE)
+_spline_cache = LRUCache(SPLINE_CACHE_SIZE)
+
+
+class SortedIndex(object):
+    """
+    Stable sort order of one x column with its duplicate groups.
+
+    Rows with a non-finite x are left out. Aggregating any y column over the
+    groups is O(n), so the O(n log n) sort is paid once per x column.
+    """
+
+    def __init__(self, x: np.ndarray):
+        x = np.asarray(x, dtype=np.float64)
+        rows = np.flatnonzero(np.isfinite(x))
+        self.order = rows[np.argsort(x[rows], kind="stable")]
+        sorted_x = x[self.order]
+        self.starts = np.flatnonzero(np.r_[True, sorted_x[1:] != sorted_x[:-1]]) if sorted_x.size else np.zeros(0, dtype=np.intp)
+        self.unique_x = sorted_x[self.starts]
+
+    def aggregate(self, y: np.ndarray):
+        """
+        Mean of y for every distinct x, ignoring missing y values.
+
+        :return: tuple (x, y) with strictly increasing x
+        """
+        if not self.starts.size:
+            return self.unique_x, np.zeros(0)
+        sorted_y = np.asarray(y, dtype=np.float64)[self.order]
+        valid = np.isfinite(sorted_y)
+        sums = np.add.reduceat(np.where(valid, sorted_y, 0.0), self.starts)
+        counts = np.add.reduceat(valid.astype(np.int64), self.starts)
+        keep = counts > 0
+        return self.unique_x[keep], sums[keep] / counts[keep]
+
+    def aggregate_many(self, Y: np.ndarray) -> np.ndarray:
+        """
+        Mean of every column of Y for every distinct x, for columns without missing values.
+
+        :return: numpy.ndarray of shape (len(unique_x), Y.shape[1])
+        """
+        sorted_Y = np.asarray(Y, dtype=np.float64)[self.order]
+        counts = np.diff(np.r_[self.starts, sorted_Y.shape[0]])
+        return np.add.reduceat(sorted_Y, self.starts, axis=0) / counts[:, None]
+
+
+def get_sorted_index(x: np.ndarray, cache_key: str = None, column: str = None) -> SortedIndex:
+    """
+    Return the sorted index of an x column, reusing it for the same dataset version.
+
+    :param x: numpy.ndarray, the x column values
+    :param cache_key: str, Dataset.cache_key of the source dataset (None disables caching)
+    :param column: str, name of the x column
+    """
+    if cache_key is None:
+        return SortedIndex(x)
+    return _index_cache.get_or_create((cache_key, column), lambda: SortedIndex(x))
+
+
+def sorted_xy(x: np.ndarray, y: np.ndarray, cache_key: str = None, x_feature: str = None):
+    """
+    Strictly increasing x with duplicate-averaged y, ready for interpolation.
+    """
+    return get_sorted_index(x, cache_key, x_feature).aggregate(y)
+
+
+def get_spline(x: np.ndarray, y: np.ndarray, k: int, s: float, cache_key: str = None, x_feature: str = None, y_feature: str = None):
+    """
+    UnivariateSpline through (x, y), reused across calls for the same dataset version and columns.
+    """
+    def build():
+        x_sorted, y_sorted = sorted_xy(x, y, cache_key, x_feature)
+        return load_backend("univariate_spline")(x_sorted, y_sorted, k=min(k, len(x_sorted) - 1), s=s)
+
+    if cache_key is None:
+        return build()
+    return _spline_cache.get_or_create((cache_key, x_feature, y_feature, k, s), build)
+
+
+def get_cubic_interpolator(x: np.ndarray, y: np.ndarray, cache_key: str = None, x_feature: str = None, y_feature: str = None):
+    """
+    Cubic interp1d through (x, y) that extrapolates, reused for the same dataset version and columns.
+    """
+    def build():
+        x_sorted, y_sorted = sorted_xy(x, y, cache_key, x_feature)
+        return load_backend("interp1d")(x_sorted, y_sorted, kind=CUBIC_METHOD, fill_value=EXTRAPOLATE_FILL, assume_sorted=True)
+
+    if cache_key is None:
+        return build()
+    return _spline_cache.get_or_create((cache_key, x_feature, y_feature, CUBIC_METHOD), build)
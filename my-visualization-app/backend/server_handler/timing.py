@@ -0,0 +1,115 @@
+import asyncio
+import contextlib
+import contextvars
+import functools
+import threading
+import time
+
+_timings = contextvars.ContextVar("timings", default=None)
+
+
+class Timings(object):
+    """
+    Durations of the phases of one request, by span name. Spans of the same name add up,
+    e.g. a view serialising in two steps; spans may nest ("dataframe" includes "decode").
+    """
+
+    def __init__(self):
+        self.spans = {}
+        self._lock = threading.Lock()  # Spans are also recorded from compute threads
+
+    def add(self, name: str, seconds: float, count: int = 1):
+        with self._lock:
+            total, calls = self.spans.get(name, (0.0, 0))
+            self.spans[name] = (total + seconds, calls + count)
+
+    def merge(self, spans: dict):
+        """
+        Add the spans another process recorded (see as_dict).
+        """
+        for name, (seconds, count) in spans.items():
+            self.add(name, seconds, count)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return dict(self.spans)
+
+    def milliseconds(self) -> dict:
+        return {name: round(seconds * 1000, 3) for name, (seconds, _) in self.as_dict().items()}
+
+    def header(self) -> str:
+        """
+        Value of a Server-Timing header, e.g. "db;dur=1.2, engine;dur=35.0".
+        """
+        return ", ".join(f"{name};dur={ms:.1f}" for name, ms in self.milliseconds().items())
+
+
+class _Span(object):
+    __slots__ = ("timings", "name", "start")
+
+    def __init__(self, timings, name):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timings.add(self.name, time.perf_counter() - self.start)
+
+
+_NOT_RECORDING = contextlib.nullcontext()
+
+
+def span(name: str):
+    """
+    Context timing one phase of the current request, e.g.
+
+        with span("db"):
+            dataset = await aget_object_or_404(Dataset, id=dataset_id)
+
+    Outside a sampled request it does nothing, at the cost of one context variable lookup.
+    """
+    timings = _timings.get()
+    return _NOT_RECORDING if timings is None else _Span(timings, name)
+
+
+def timed(name: str):
+    """
+    Decorator recording every call of a function, or coroutine function, as a span.
+    """
+    def decorate(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def timed_call(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def timed_call(*args, **kwargs):
+                with span(name):
+                    return func(*args, **kwargs)
+        return timed_call
+    return decorate
+
+
+def current_timings():
+    """
+    The Timings of the request being sampled in this context, or None.
+    """
+    return _timings.get()
+
+
+@contextlib.contextmanager
+def recording():
+    """
+    Context in which spans are recorded into the Timings it yields.
+    """
+    timings = Timings()
+    reset = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(reset)
+
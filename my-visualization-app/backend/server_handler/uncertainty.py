@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+from backend.server_handler.backends import load_backend
+from backend.server_handler.cancellation import check
+from backend.server_handler.nonlinear_fit import fit_nonlinear, model_function, model_jacobian
+from backend.server_handler.worker_pool import map_in_pool, pool_size
+
+LINEAR_METHOD = "linear"
+POLYNOMIAL_METHOD = "polynomial"
+
+DEFAULT_CONFIDENCE_LEVEL = 0.95
+BOOTSTRAP_SEED = 42
+MAX_BOOTSTRAP_SAMPLES = 2000  # Refits one request may ask for; every refit is a full fit
+PERCENT = 100
+
+INVALID_CONFIDENCE_LEVEL = "Confidence level must be between 0 and 1."
+INVALID_BOOTSTRAP_SAMPLES = "Bootstrap samples must be an integer between 0 and {}."
+
+
+def bootstrap_sample_count(samples) -> int:
+    """
+    The number of bootstrap refits a request asked for (None: 0).
+
+    :raises ValueError: unless it is an integer between 0 and MAX_BOOTSTRAP_SAMPLES
+    """
+    count = 0 if samples is None else samples
+    if isinstance(count, bool) or not isinstance(count, (int, np.integer)) or not 0 <= count <= MAX_BOOTSTRAP_SAMPLES:
+        raise ValueError(INVALID_BOOTSTRAP_SAMPLES.format(MAX_BOOTSTRAP_SAMPLES))
+    return int(count)
+
+
+def predict(method: str, params, x: np.ndarray) -> np.ndarray:
+    """
+    Evaluate a fitted curve at x.
+    """
+    if method in (LINEAR_METHOD, POLYNOMIAL_METHOD):
+        return np.polyval(params, x)
+    with np.errstate(over="ignore"):
+        return model_function(method)(x, *params)
+
+
+def parameter_jacobian(method: str, params, x: np.ndarray) -> np.ndarray:
+    """
+    Derivatives of the fitted curve with respect to its parameters, one row per x.
+    """
+    if method in (LINEAR_METHOD, POLYNOMIAL_METHOD):
+        return np.vander(x, len(params))
+    with np.errstate(over="ignore", invalid="ignore"):
+        return model_jacobian(method)(x, *params)
+
+
+def compute_bands(method: str, params, covariance, x: np.ndarray, y: np.ndarray, x_fit: np.ndarray, confidence_level: float = DEFAULT_CONFIDENCE_LEVEL, bootstrap_samples: int = 0) -> pd.DataFrame:
+    """
+    Confidence and prediction bands of a fitted curve over the x_fit grid.
+
+    The variance of the fitted mean is diag(J C J^T), evaluated row by row with
+    einsum so the full len(x_fit) x len(x_fit) matrix is never formed. Prediction
+    bands add the residual variance. Optional residual-bootstrap percentile bands
+    are refitted in the shared process pool with a fixed seed.
+
+    :param method: str, the fit method used to obtain params
+    :param params: numpy.ndarray, fitted parameters
+    :param covariance: numpy.ndarray, parameter covariance (bands are NaN when None)
+    :param x: numpy.ndarray, observed x values
+    :param y: numpy.ndarray, observed y values
+    :param x_fit: numpy.ndarray, grid on which the bands are evaluated
+    :param confidence_level: float, coverage of the bands (default: 0.95)
+    :param bootstrap_samples: int, number of bootstrap refits (0 disables them)
+    :return: pandas.DataFrame with x and the lower/upper bounds of each band
+    """
+    if not 0 < confidence_level < 1:
+        raise ValueError(INVALID_CONFIDENCE_LEVEL)
+    bootstrap_samples = bootstrap_sample_count(bootstrap_samples)
+
+    params = np.asarray(params, dtype=np.float64)
+    fitted = predict(method, params, x)
+    residuals = y - fitted
+    dof = max(x.size - params.size, 1)
+    residual_variance = np.sum(residuals ** 2) / dof
+    t_value = load_backend("t_distribution").ppf((1 + confidence_level) / 2, dof)
+
+    y_fit = predict(method, params, x_fit)
+    if covariance is None:
+        mean_variance = np.full(x_fit.size, np.nan)
+    else:
+        jacobian = parameter_jacobian(method, params, x_fit)
+        mean_variance = np.einsum("ij,jk,ik->i", jacobian, np.asarray(covariance, dtype=np.float64), jacobian)
+    confidence_width = t_value * np.sqrt(np.maximum(mean_variance, 0))
+    prediction_width = t_value * np.sqrt(np.maximum(mean_variance, 0) + residual_variance)
+
+    bands = pd.DataFrame({
+        "x": x_fit,
+        "confidence_lower": y_fit - confidence_width,
+        "confidence_upper": y_fit + confidence_width,
+        "prediction_lower": y_fit - prediction_width,
+        "prediction_upper": y_fit + prediction_width,
+    })
+
+    if bootstrap_samples:
+        curves = bootstrap_curves(method, params, x, fitted, residuals, x_fit, bootstrap_samples)
+        tail = (1 - confidence_level) / 2 * PERCENT
+        bands["bootstrap_lower"] = np.nanpercentile(curves, tail, axis=0)
+        bands["bootstrap_upper"] = np.nanpercentile(curves, PERCENT - tail, axis=0)
+
+    return bands
+
+
+def bootstrap_curves(method, params, x, fitted, residuals, x_fit, samples) -> np.ndarray:
+    """
+    Refit the curve on residual-resampled data and evaluate every refit on x_fit.
+
+    Samples are split into one chunk per worker, each with its own child seed of
+    BOOTSTRAP_SEED, so results do not depend on scheduling.
+    """
+    chunks = np.array_split(np.arange(samples), max(min(samples, pool_size()), 1))
+    seeds = np.random.SeedSequence(BOOTSTRAP_SEED).spawn(len(chunks))
+    tasks = [(method, params, x, fitted, residuals, x_fit, len(chunk), seed) for chunk, seed in zip(chunks, seeds)]
+    return np.vstack(map_in_pool(_bootstrap_chunk, tasks))
+
+
+def _bootstrap_chunk(task) -> np.ndarray:
+    method, params, x, fitted, residuals, x_fit, samples, seed = task
+    rng = np.random.default_rng(seed)
+    curves = np.full((samples, x_fit.size), np.nan)
+    for i in range(samples):
+        check()
+        y_star = fitted + rng.choice(residuals, size=residuals.size, replace=True)
+        try:
+            if method in (LINEAR_METHOD, POLYNOMIAL_METHOD):
+                refit = np.polyfit(x, y_star, len(params) - 1)
+            else:
+                refit, _, _ = fit_nonlinear(method, x, y_star, initial_params=params, n_starts=1)
+            curves[i] = predict(method, refit, x_fit)
+        except (ValueError, np.linalg.LinAlgError):
+            continue
+    return curves
@@ -0,0 +1,128 @@
+import logging
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from backend.server_handler.backends import BACKENDS, load_backend
+
+WARMUP_ROWS = 200  # Enough rows to run every kernel; compilation time does not depend on the data size
+WARMUP_FEATURES = 4
+WARMUP_NEIGHBORS = 5
+WARMUP_EPOCHS = 10
+RANDOM_STATE = 42
+NUMBA_CACHE_VARIABLE = "NUMBA_CACHE_DIR"
+
+UNKNOWN_WARMUP_TASK = "Unknown warm-up task: {}. Choose from {}."
+
+logger = logging.getLogger("backend.warmup")
+
+_warmup_lock = threading.Lock()
+_completed = {}
+
+
+def synthetic_data() -> np.ndarray:
+    return np.random.default_rng(RANDOM_STATE).normal(size=(WARMUP_ROWS, WARMUP_FEATURES))
+
+
+def warm_imports():
+    """
+    Import every registered scientific backend.
+    """
+    for name in BACKENDS:
+        load_backend(name)
+
+
+def warm_umap():
+    """
+    Compile the UMAP kernels. Inputs below a few thousand rows use an exact neighbour
+    search and larger ones NN-descent, so both paths are run once.
+    """
+    X = synthetic_data()
+    for force_approximation in (False, True):
+        reducer = load_backend("umap")(n_components=2, n_neighbors=WARMUP_NEIGHBORS, n_epochs=WARMUP_EPOCHS,
+                                       force_approximation_algorithm=force_approximation)
+        reducer.fit_transform(X)
+
+
+def warm_approximate_neighbors():
+    """
+    Compile the pynndescent index build and query used for SMOTE on large classes.
+    """
+    X = synthetic_data()
+    neighbors = load_backend("approximate_neighbors")(n_neighbors=WARMUP_NEIGHBORS + 1).fit(X)
+    neighbors.kneighbors(X)
+    neighbors.kneighbors()
+
+
+WARMUP_TASKS = {
+    "imports": warm_imports,
+    "umap": warm_umap,
+    "approximate_neighbors": warm_approximate_neighbors,
+}
+
+
+def configure_numba_cache(cache_dir: str = None) -> str:
+    """
+    Store numba compiled functions on disk so that new processes load them instead of compiling.
+
+    UMAP and pynndescent compile their kernels with cache=True, so after the first
+    warm-up every later process (worker restarts, autoscaling) only reads the cache.
+    An existing NUMBA_CACHE_DIR environment variable takes precedence.
+
+    Only called where warm-up runs, so the directory is not created by every process that loads Django.
+
+    :param cache_dir: str, directory for the cache, created if missing (None leaves numba's default)
+    :return: str, the cache directory in use or None
+    """
+    if cache_dir and not os.environ.get(NUMBA_CACHE_VARIABLE):
+        os.makedirs(cache_dir, exist_ok=True)
+        os.environ[NUMBA_CACHE_VARIABLE] = str(cache_dir)
+        if "numba" in sys.modules:  # numba reads the variable when it is imported
+            sys.modules["numba"].config.CACHE_DIR = str(cache_dir)
+    return os.environ.get(NUMBA_CACHE_VARIABLE)
+
+
+def warm_up(tasks=None) -> dict:
+    """
+    Run warm-up tasks so the first user request does not pay imports and JIT compilation.
+
+    Tasks already completed in this process are not repeated; concurrent callers
+    wait for the running warm-up.
+
+    :param tasks: list, names from WARMUP_TASKS (default: all of them)
+    :return: dict, task name -> seconds it took (0.0 if it had already run)
+    """
+    tasks = list(WARMUP_TASKS) if tasks is None else list(tasks)
+    unknown = [task for task in tasks if task not in WARMUP_TASKS]
+    if unknown:
+        raise ValueError(UNKNOWN_WARMUP_TASK.format(unknown, list(WARMUP_TASKS)))
+
+    timings = {}
+    with _warmup_lock:
+        for task in tasks:
+            if task in _completed:
+                timings[task] = 0.0
+                continue
+            start = time.perf_counter()
+            WARMUP_TASKS[task]()
+            timings[task] = _completed[task] = time.perf_counter() - start
+    return timings
+
+
+def start_warm_up(tasks=None) -> threading.Thread:
+    """
+    Run warm_up in a daemon thread so the server accepts requests meanwhile, and log the timings.
+    """
+    def run():
+        try:
+            timings = warm_up(tasks)
+            logger.info("Warm-up finished: %s", ", ".join(f"{task} {seconds:.2f} s" for task, seconds in timings.items()))
+        except Exception:
+            logger.exception("Warm-up failed")
+
+    thread = threading.Thread(target=run, name="warmup", daemon=True)
+    thread.start()
+    return thread
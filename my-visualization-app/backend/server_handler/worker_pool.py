@@ -0,0 +1,160 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError, wait
+
+from backend.server_handler.cancellation import CHECK_INTERVAL, check, install_interrupt_handler
+
+# Workers are forked from a clean server process: forking the request process
+# directly can deadlock once BLAS/OpenMP or numba threads have been started.
+POOL_START_METHOD = "forkserver"
+DEFAULT_TASK_TIMEOUT = 300  # Seconds an Engine call may run in the pool
+
+ENGINE_TIMEOUT = "{} did not finish within {} seconds. Try a smaller dataset or a faster method."
+
+_pool = None
+_pool_lock = threading.Lock()
+_config = {"size": None, "task_timeout": DEFAULT_TASK_TIMEOUT, "warmup_tasks": None}
+_in_worker = False
+
+
+class EngineTimeoutError(TimeoutError):
+    """
+    An Engine call did not finish within the pool's task timeout.
+    """
+
+
+def configure_pool(size: int = None, task_timeout: float = DEFAULT_TASK_TIMEOUT, warmup_tasks: list = None):
+    """
+    Configure the shared pool; a pool created before is shut down and recreated on next use.
+
+    :param size: int, number of worker processes (None: one per core, 0: run everything inline)
+    :param task_timeout: float, seconds an Engine call may take (None: no limit)
+    :param warmup_tasks: list, warm-up tasks every worker runs when it starts (see warmup.WARMUP_TASKS)
+    """
+    global _pool
+    with _pool_lock:
+        _config.update(size=size, task_timeout=task_timeout, warmup_tasks=warmup_tasks)
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = None
+
+
+def pool_size() -> int:
+    """
+    Number of worker processes in the shared pool (0 when Engine calls run inline).
+    """
+    return (os.cpu_count() or 1) if _config["size"] is None else _config["size"]
+
+
+def task_timeout():
+    return _config["task_timeout"]
+
+
+def _init_worker(warmup_tasks):
+    global _in_worker
+    _in_worker = True
+    install_interrupt_handler()
+    if warmup_tasks:
+        from backend.server_handler.warmup import warm_up
+        warm_up(warmup_tasks)
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Return the process pool shared by all Engine calls, creating it on first use.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            context = multiprocessing.get_context(POOL_START_METHOD)
+            _pool = ProcessPoolExecutor(max_workers=max(pool_size(), 1), mp_context=context,
+                                        initializer=_init_worker, initargs=(_config["warmup_tasks"],))
+        return _pool
+
+
+def start_process_pool():
+    """
+    Start the workers ahead of the first request, so that their start-up and warm-up
+    run in the background.
+    """
+    if pool_size() > 0:
+        pool = get_process_pool()
+        for _ in range(pool_size()):
+            pool.submit(int)
+
+
+def reset_process_pool():
+    """
+    Discard the pool, e.g. after a worker died, so that the next call starts a new one.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def retire_process_pool():
+    """
+    Let the current pool finish the tasks it was given and start a new one for further calls,
+    e.g. after a worker was interrupted (see cancellation.OperationInterrupted).
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = None
+
+
+def result_within(future, timeout: float = None):
+    """
+    The result of a pool future, looking in between whether the computation waiting for it
+    was cancelled (see cancellation.check).
+
+    :param timeout: float, seconds to wait (None: no limit)
+    :raises concurrent.futures.TimeoutError: if the future is not done in time
+    :raises OperationCancelled: if the waiting computation was cancelled
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        check()
+        remaining = CHECK_INTERVAL if deadline is None else min(CHECK_INTERVAL, deadline - time.monotonic())
+        if wait([future], timeout=max(remaining, 0)).done:
+            return future.result()
+        if deadline is not None and time.monotonic() >= deadline:
+            raise FutureTimeoutError()
+
+
+def map_in_pool(func, tasks: list) -> list:
+    """
+    Apply a picklable module-level function to every task in the shared process pool.
+
+    A single task is run inline, since dispatching it would only add overhead, and so
+    is everything inside a worker or with the pool disabled; a cancelled computation
+    then stops between tasks. In the pool, all tasks together may take the pool's task
+    timeout, and a cancelled computation stops waiting; either way the tasks not
+    started yet are cancelled.
+
+    :raises EngineTimeoutError: if the tasks are not done in time
+    :raises OperationCancelled: if the computation waiting for them was cancelled
+    """
+    if len(tasks) <= 1 or _in_worker or pool_size() == 0:
+        results = []
+        for task in tasks:
+            check()
+            results.append(func(task))
+        return results
+
+    timeout = task_timeout()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    pool = get_process_pool()
+    futures = [pool.submit(func, task) for task in tasks]
+    try:
+        return [result_within(future, None if deadline is None else deadline - time.monotonic()) for future in futures]
+    except FutureTimeoutError:
+        raise EngineTimeoutError(ENGINE_TIMEOUT.format(func.__name__, timeout))
+    finally:
+        for future in futures:
+            future.cancel()  # Only those still queued, after a failure
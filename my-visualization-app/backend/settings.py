@@ -50,6 +50,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api.middleware.server_timing_middleware.ServerTimingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -119,3 +120,59 @@ STATIC_URL = 'static/'
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Persistent cache of the numba kernels compiled by UMAP and pynndescent, used by
+# the processes that warm up (WARMUP_ON_STARTUP, "python manage.py warmup")
+NUMBA_CACHE_DIR = str(BASE_DIR / ".numba_cache")
+
+# Import the scientific backends and compile the numba kernels in a background thread
+# when the server starts (see also "python manage.py warmup")
+WARMUP_ON_STARTUP = False
+WARMUP_TASKS = ["imports", "umap", "approximate_neighbors"]
+
+# Process pool running CPU-bound Engine calls (None: one worker per core, 0: run them
+# on the request thread) and the seconds a call may take before the request fails
+ENGINE_POOL_SIZE = None
+ENGINE_TASK_TIMEOUT = 300
+
+# Host-wide store of dataset columns in shared memory, mapped read-only by every
+# server process (None: a private directory in /dev/shm; False disables it)
+COLUMN_STORE_DIR = None
+COLUMN_STORE_MAX_BYTES = 2 << 30
+
+# Lock files through which server processes coalesce identical computations
+# (None: a private directory in /dev/shm; False: coalesce within each process only)
+SINGLE_FLIGHT_DIR = None
+
+# Admission control of heavy operations, per server process: divide the budgets
+# among the processes when running several (None: half of the physical memory,
+# and one batch slot per worker of the Engine pool)
+SCHEDULER_MEMORY_BUDGET_MB = None
+SCHEDULER_BATCH_SLOTS = None
+SCHEDULER_MAX_QUEUE = 32  # Waiting operations before new ones get 429 Too Many Requests
+SCHEDULER_MAX_WAIT = 60  # Seconds an operation may wait before it gets 503 Service Unavailable
+
+# Flag files through which any server process cancels a request (X-Operation-Id header,
+# /api/cancel/) and pool workers notice it (None: a private directory in /dev/shm;
+# False: a cancel reaches only the process receiving it and pool tasks are not stopped)
+CANCELLATION_DIR = None
+# Seconds a cancelled pool task may take to stop before its worker is killed, which also fails
+# the pool tasks of other requests (None: only when the cancel asks for it with "hard": true)
+ENGINE_KILL_AFTER = None
+
+# Keeps the files of the stores above out of a running server's directories during tests
+TEST_RUNNER = "backend.api.tests.runner.PrivateStoreRunner"
+
+# Share of requests whose phases are timed and reported in a Server-Timing header
+# and a log line (0: none, 1: all)
+SERVER_TIMING_SAMPLE_RATE = 0
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "backend.timing": {"handlers": ["console"], "level": "INFO", "propagate": False},
+        "backend.warmup": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}
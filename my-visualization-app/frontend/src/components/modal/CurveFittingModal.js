@@ -1,10 +1,11 @@
 import React, { useState, useEffect } from "react";
-import { Modal, Button, Input, Select, message } from "antd";
+import { Modal, Button, Input, Select, Checkbox, message } from "antd";
 import GraphManager from "../graph/GraphManager";
 
 const CurveFittingModal = ({ visible, onCancel, graph }) => {
 
   const [degree, setDegree] = useState(2);
+  const [autoDegree, setAutoDegree] = useState(false);
   const [fitType, setFitType] = useState("polynomial");
   const [loading, setLoading] = useState(false);
   const [selectedX, setSelectedX] = useState("");
@@ -32,7 +33,7 @@ const CurveFittingModal = ({ visible, onCancel, graph }) => {
         xColumn: selectedX,
         yColumn: selectedY,
         type: fitType,
-        degree: fitType === "polynomial" ? degree : undefined,
+        degree: fitType === "polynomial" ? (autoDegree ? "auto" : degree) : undefined,
         datasetId: graph.graphDatasetId,
       },
     };
@@ -53,7 +54,8 @@ const CurveFittingModal = ({ visible, onCancel, graph }) => {
       console.log("test:", resultData.generated_data);
 
       GraphManager.applyCurveFitting(graph.graphId, resultData.generated_data);
-      message.success("Curve fitting completed!");
+      const selection = resultData.fit_info && resultData.fit_info.degree_selection;
+      message.success(selection ? `Curve fitting completed with degree ${selection.degree}!` : "Curve fitting completed!");
       onCancel();
     } catch (error) {
       message.error(`Error: ${error.message}`);
@@ -85,17 +87,25 @@ const CurveFittingModal = ({ visible, onCancel, graph }) => {
             <Select.Option value="linear">Linear</Select.Option>
             <Select.Option value="polynomial">Polynomial</Select.Option>
             <Select.Option value="exponential">Exponential</Select.Option>
+            <Select.Option value="logistic">Logistic</Select.Option>
+            <Select.Option value="power">Power Law</Select.Option>
           </Select>
 
           {fitType === "polynomial" && (
-            <Input
-              type="number"
-              value={degree}
-              onChange={(e) => setDegree(Number(e.target.value))}
-              min={1}
-              max={10}
-              style={{ marginTop: "10px" }}
-            />
+            <>
+              <Input
+                type="number"
+                value={degree}
+                onChange={(e) => setDegree(Number(e.target.value))}
+                min={1}
+                max={10}
+                disabled={autoDegree}
+                style={{ marginTop: "10px" }}
+              />
+              <Checkbox checked={autoDegree} onChange={(e) => setAutoDegree(e.target.checked)} style={{ marginTop: "10px" }}>
+                Choose degree automatically (cross-validation)
+              </Checkbox>
+            </>
           )}
 
           <Button type="primary" onClick={handleFit} block style={{ marginTop: "10px" }} loading={loading}>
@@ -88,14 +88,16 @@ const DimReductionModal = ({visible, onClose, onUpdateDataset, logAction, datase
             return;
         }
 
+        // The server reuses the embedding it has just shown and stores it itself,
+        // so the records are not sent back
         const requestData = {
-            dataset_id: datasetManager.getCurrentDatasetId(),
-            features: reducedData.features,
-            records: reducedData.records,
-            new_dataset_name: datasetManager.getDatasetNameById(datasetManager.getCurrentDatasetId()) + "_Dim_Reduced_" + method
+            dataset_id: datasetId || datasetManager.getCurrentDatasetId(),
+            method,
+            n_components: nComponents,
+            materialize_as: datasetManager.getDatasetNameById(datasetManager.getCurrentDatasetId()) + "_Dim_Reduced_" + method
         };
 
-        const result = await fetch("http://127.0.0.1:8000/api/create_dataset/", {
+        const result = await fetch("http://127.0.0.1:8000/api/dimensional_reduction/", {
             method: "POST",
             headers: {
                 "Content-Type": "application/json",
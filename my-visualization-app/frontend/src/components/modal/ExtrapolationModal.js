@@ -44,25 +44,27 @@ const ExtrapolationModal = ({visible, onCancel, uiController, logAction, onUpdat
         }
     }, [inputMode, minValue, maxValue, numPoints]);
 
+    const buildRequestData = () => ({
+        dataset_id: currentDatasetId,
+        x_feature: xColumn,
+        y_feature: yColumn,
+        kind: method,
+        params: {
+            extrapolateRange: extrapolateRange
+                .split(",")
+                .map(val => val.trim())
+                .map(val => parseFloat(val))
+                .filter(val => !isNaN(val))
+        }
+    });
+
     const handleExtrapolate = async () => {
         if (!currentDatasetId || !xColumn || !yColumn || !extrapolateRange) {
             alert("Please select a dataset, two columns and extrapolation range.");
             return;
         }
 
-        const requestData = {
-            dataset_id: currentDatasetId,
-            x_feature: xColumn,
-            y_feature: yColumn,
-            kind: method,
-            params: {
-                extrapolateRange: extrapolateRange
-                    .split(",")
-                    .map(val => val.trim())
-                    .map(val => parseFloat(val))
-                    .filter(val => !isNaN(val))
-            }
-        };
+        const requestData = buildRequestData();
         try {
             const result = await fetch("http://127.0.0.1:8000/api/extrapolate/", {
                 method: "POST",
@@ -168,14 +170,13 @@ const ExtrapolationModal = ({visible, onCancel, uiController, logAction, onUpdat
 
     // apply result
     const handleApplyExtrapolate = async () => {
+        // The server stores the result itself, so the records are not sent back
         const requestData = {
-            dataset_id: currentDatasetId,
-            features: [xColumn, yColumn],
-            records: extrapolatedData,
-            new_dataset_name:datasetManager.getDatasetNameById(datasetManager.getCurrentDatasetId())+ "_Extrapolated_" + method
+            ...buildRequestData(),
+            materialize_as: datasetManager.getDatasetNameById(datasetManager.getCurrentDatasetId())+ "_Extrapolated_" + method
             + datasetManager.getSuffix(datasetManager.getDatasetNameById(datasetManager.getCurrentDatasetId()))
         };
-        const result = await fetch("http://127.0.0.1:8000/api/create_dataset/", {
+        const result = await fetch("http://127.0.0.1:8000/api/extrapolate/", {
             method: "POST",
             headers: {
                 "Content-Type": "application/json",
@@ -35,21 +35,23 @@ const InterpolationModal = ({visible, onCancel, uiController, logAction, onUpdat
         fetchColumns();
     }, [currentDatasetId]); // Dependent on `currentDatasetId`, triggered on change
 
+    const buildRequestData = () => ({
+        dataset_id: currentDatasetId,
+        x_feature: xColumn,
+        y_feature: yColumn,
+        kind: method,
+        numPoints: numPoints,
+        minValue: minValue,
+        maxValue: maxValue,
+    });
+
     const handleInterpolate = async () => {
         if (!currentDatasetId || !xColumn || !yColumn) {
             alert("Please select a dataset and two columns.");
             return;
         }
 
-        const requestData = {
-            dataset_id: currentDatasetId,
-            x_feature: xColumn,
-            y_feature: yColumn,
-            kind: method,
-            numPoints: numPoints,
-            minValue: minValue,
-            maxValue: maxValue,
-        };
+        const requestData = buildRequestData();
         try {
             const result = await fetch("http://127.0.0.1:8000/api/interpolate/", {
                 method: "POST",
@@ -74,14 +76,13 @@ const InterpolationModal = ({visible, onCancel, uiController, logAction, onUpdat
 
     // apply result
     const handleApplyInterpolate = async () => {
+        // The server stores the result itself, so the records are not sent back
         const requestData = {
-            dataset_id: currentDatasetId,
-            features: [xColumn, yColumn],
-            records: interpolatedData,
-            new_dataset_name: datasetManager.getDatasetNameById(datasetManager.getCurrentDatasetId())+"_Interpolated_" + method
+            ...buildRequestData(),
+            materialize_as: datasetManager.getDatasetNameById(datasetManager.getCurrentDatasetId())+"_Interpolated_" + method
             + datasetManager.getSuffix(datasetManager.getDatasetNameById(datasetManager.getCurrentDatasetId()))
         };
-        const result = await fetch("http://127.0.0.1:8000/api/create_dataset/", {
+        const result = await fetch("http://127.0.0.1:8000/api/interpolate/", {
             method: "POST",
             headers: {
                 "Content-Type": "application/json",
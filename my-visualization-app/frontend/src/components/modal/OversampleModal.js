@@ -40,6 +40,16 @@ const OversampleModal = ({ visible, onCancel, uiController ,logAction, onUpdateD
     fetchColumns();
   }, [currentDatasetId]); // Dependent on `currentDatasetId`, triggered on change
 
+  const buildRequestData = () => ({
+    datasetId: currentDatasetId,
+    params:{
+      xColumn: xColumn,
+      yColumn: yColumn,
+      method: method,
+      factor: factor
+    }
+  });
+
   const handleOversample = async () => {
     if (!currentDatasetId || !xColumn || !yColumn) {
       alert("Please select a dataset and two columns.");
@@ -48,15 +58,7 @@ const OversampleModal = ({ visible, onCancel, uiController ,logAction, onUpdateD
     if(factor <= VALID_OVERSAMPLE_FACTOR || factor > 10) {
       alert("Please give a valid oversample factor. The oversample factor should be between 1 and 10! The output dataset is the dataset oversampled with factor 2.")
     }
-    const requestData = {
-      datasetId: currentDatasetId,
-      params:{
-        xColumn: xColumn,
-        yColumn: yColumn,
-        method: method,
-        factor: factor
-      }
-    }
+    const requestData = buildRequestData();
     console.log("Request data:", requestData);
     setLoading(true);
     try {
@@ -111,14 +113,13 @@ const OversampleModal = ({ visible, onCancel, uiController ,logAction, onUpdateD
 
     // apply result
     const handleApply = async () => {
+        // The server stores the result itself, so the records are not sent back
         const requestData = {
-            dataset_id: datasetManager.getCurrentDatasetId(), 
-            features: oversampledFeature,
-            records: oversampledRecord,
-            new_dataset_name: datasetManager.getDatasetNameById(datasetManager.getCurrentDatasetId()) + "_Oversampled_" + method + "_" + factor
+            ...buildRequestData(),
+            materialize_as: datasetManager.getDatasetNameById(datasetManager.getCurrentDatasetId()) + "_Oversampled_" + method + "_" + factor
             + datasetManager.getSuffix(datasetManager.getDatasetNameById(datasetManager.getCurrentDatasetId()))
           };
-          const result = await fetch("http://127.0.0.1:8000/api/create_dataset/", {
+          const result = await fetch("http://127.0.0.1:8000/api/oversample_data/", {
               method: "POST",
               headers: {
                 "Content-Type": "application/json",